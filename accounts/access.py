@@ -0,0 +1,76 @@
+"""Per-request role and scope of the signed-in user.
+
+``AccessMiddleware`` sets ``request.access``, built lazily from
+``request.user.staff`` (loaded with the user by ``StaffModelBackend``), so
+views and templates can ask "HOD? school-wide? which department?" without
+repeating ``hasattr(user, "staff")`` checks or running queries.
+"""
+from django.utils.functional import SimpleLazyObject
+
+OWN = "own"
+DEPARTMENT = "department"
+SCHOOL = "school"
+
+
+class Access:
+    def __init__(self, staff=None):
+        self.staff = staff
+        self.is_hod = bool(staff and staff.is_hod)
+        self.is_pc = bool(staff and staff.is_pc)
+        self.is_vp = bool(staff and staff.is_vp)
+        self.department_id = staff.department_id if staff else None
+
+    @classmethod
+    def for_user(cls, user):
+        if not user.is_authenticated:
+            return cls()
+        return cls(getattr(user, "staff", None))
+
+    @property
+    def is_staff(self):
+        return self.staff is not None
+
+    @property
+    def is_school_wide(self):
+        """Program coordinators and vice principals see every department."""
+        return self.is_pc or self.is_vp
+
+    @property
+    def department(self):
+        return self.staff.department if self.staff else None
+
+    @property
+    def scope(self):
+        """Whose reflections the user reads: HOD first, then PC/VP, else their own."""
+        if self.staff is None:
+            return None
+        if self.is_hod:
+            return DEPARTMENT
+        if self.is_school_wide:
+            return SCHOOL
+        return OWN
+
+    def can_view(self, teacher):
+        """Whether ``teacher``'s reflections fall inside this user's scope."""
+        scope = self.scope
+        if scope == SCHOOL:
+            return True
+        if scope == DEPARTMENT:
+            return teacher.department_id == self.department_id
+        if scope == OWN:
+            return teacher.pk == self.staff.pk
+        return False
+
+    def __repr__(self):
+        return f"<Access {self.scope or 'anonymous'} staff={getattr(self.staff, 'pk', None)}>"
+
+
+class AccessMiddleware:
+    """Attach ``request.access``; must come after AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.access = SimpleLazyObject(lambda: Access.for_user(request.user))
+        return self.get_response(request)
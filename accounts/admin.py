@@ -1,8 +1,13 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.translation import gettext_lazy as _
 
 from .models import CustomUser, Department, Staff, Role
+from .roster import RosterError, import_roster, read_roster, validate_roster
 
 
 class CustomUserAdmin(BaseUserAdmin):
@@ -39,8 +44,22 @@ class RoleAdmin(admin.ModelAdmin):
     search_fields = ("name",)
 
 
+class RosterImportForm(forms.Form):
+    roster = forms.FileField(help_text="CSV with email, fname, mname, lname, staff_id, department, role, is_hod, is_pc, is_vp, password")
+    default_password = forms.CharField(
+        required=False,
+        widget=forms.PasswordInput,
+        help_text="For rows without a password. Leave blank to require a password reset.",
+    )
+    create_missing = forms.BooleanField(
+        required=False, help_text="Create departments and roles that do not exist yet."
+    )
+
+
 @admin.register(Staff)
 class StaffAdmin(admin.ModelAdmin):
+    change_list_template = "admin/accounts/staff/change_list.html"
+
     list_display = (
         "full_name",
         "staff_id",
@@ -55,6 +74,50 @@ class StaffAdmin(admin.ModelAdmin):
     ordering = ("fname", "lname")
     autocomplete_fields = ("user", "department")
 
+    def get_urls(self):
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_roster_view),
+                name="accounts_staff_import",
+            ),
+        ] + super().get_urls()
+
+    def import_roster_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect("admin:accounts_staff_changelist")
+
+        form = RosterImportForm(request.POST or None, request.FILES or None)
+        errors = []
+        if request.method == "POST" and form.is_valid():
+            try:
+                rows = validate_roster(
+                    read_roster(form.cleaned_data["roster"].file),
+                    create_missing=form.cleaned_data["create_missing"],
+                )
+            except RosterError as exc:
+                errors = exc.errors
+            else:
+                # Hash in this process: a worker pool per web request would fork the
+                # server. Large rosters belong to the import_staff command.
+                staff = import_roster(
+                    rows, default_password=form.cleaned_data["default_password"] or None, workers=1
+                )
+                self.message_user(request, f"{len(staff)} staff imported.", messages.SUCCESS)
+                return redirect("admin:accounts_staff_changelist")
+
+        return TemplateResponse(
+            request,
+            "admin/accounts/staff/import_roster.html",
+            {
+                **self.admin_site.each_context(request),
+                "opts": self.model._meta,
+                "title": "Import staff roster",
+                "form": form,
+                "errors": errors,
+            },
+        )
+
 
 # Register CustomUser separately
 admin.site.register(CustomUser, CustomUserAdmin)
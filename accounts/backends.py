@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class StaffModelBackend(ModelBackend):
+    """ModelBackend that loads the user's staff row, department and role with the user.
+
+    ``AuthenticationMiddleware`` calls ``get_user`` once per request, so
+    ``request.user.staff`` (and ``request.access``) need no further queries.
+    """
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related(
+                "staff__department", "staff__role"
+            ).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
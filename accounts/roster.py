@@ -0,0 +1,202 @@
+"""Bulk staff roster import.
+
+Used by the ``import_staff`` command and the Staff admin's "Import roster"
+page. The whole file is validated before anything is written; users and their
+``Staff`` rows are then created with ``bulk_create`` in chunked transactions.
+
+Password hashing (PBKDF2) is what makes one-by-one ``create_user`` slow, so:
+
+- per-row passwords are hashed in a process pool, one salt per user;
+- a shared default password is hashed once and reused;
+- rows with neither get an unusable password (set it via password reset).
+"""
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.dispatch import Signal
+
+from .models import CustomUser, Department, Role, Staff
+
+REQUIRED_COLUMNS = ("email", "fname", "lname", "staff_id", "department")
+FLAG_COLUMNS = ("is_hod", "is_pc", "is_vp")
+TRUE = {"1", "true", "yes", "y", "x"}
+FALSE = {"", "0", "false", "no", "n"}
+
+# Sent after an import, with ``staff`` (the created Staff rows).
+roster_imported = Signal()
+
+
+class RosterError(Exception):
+    """The roster did not validate; ``errors`` lists ``(line, message)`` pairs."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            "\n".join(f"line {line}: {message}" if line else message for line, message in errors)
+        )
+
+
+def read_roster(fh):
+    """Rows of a roster CSV (text or bytes file) as dicts, with their line numbers."""
+    if isinstance(fh.read(0), bytes):
+        fh = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(fh)
+    columns = [name.strip() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise RosterError([(None, f"missing column(s): {', '.join(missing)}")])
+    reader.fieldnames = columns
+    return [
+        (reader.line_num, {key: (value or "").strip() for key, value in row.items() if key})
+        for row in reader
+    ]
+
+
+def validate_roster(rows, create_missing=False):
+    """Check every row; return them ready for ``import_roster`` or raise RosterError.
+
+    Departments and roles are resolved by name with one query each, and
+    existing emails and staff ids are checked with one query each.
+    """
+    errors = []
+    seen_emails, seen_ids = {}, {}
+    for line, row in rows:
+        for name in REQUIRED_COLUMNS:
+            if not row.get(name):
+                errors.append((line, f"{name} is required"))
+        row["email"] = CustomUser.objects.normalize_email(row.get("email", "")).lower()
+        if row["email"]:
+            try:
+                validate_email(row["email"])
+            except ValidationError:
+                errors.append((line, f"invalid email {row['email']!r}"))
+        for name in FLAG_COLUMNS:
+            value = row.get(name, "").lower()
+            if value not in TRUE | FALSE:
+                errors.append((line, f"{name} must be yes/no, got {row[name]!r}"))
+            row[name] = value in TRUE
+        # Emails and staff ids are unique regardless of case.
+        for key, seen in (("email", seen_emails), ("staff_id", seen_ids)):
+            folded = row[key].lower()
+            if folded and folded in seen:
+                errors.append((line, f"duplicate {key} {row[key]!r} (also on line {seen[folded]})"))
+            seen.setdefault(folded, line)
+
+    for model, key, seen, message in (
+        (CustomUser, "email", seen_emails, "a user with email {!r} already exists"),
+        (Staff, "staff_id", seen_ids, "staff_id {!r} already exists"),
+    ):
+        existing = (
+            model.objects.annotate(folded=Lower(key))
+            .filter(folded__in=list(seen))
+            .values_list("folded", key)
+        )
+        for folded, value in existing:
+            errors.append((seen[folded], message.format(value)))
+
+    departments = resolve_names(Department, rows, "department", create_missing, errors)
+    roles = resolve_names(Role, rows, "role", create_missing, errors)
+    if errors:
+        raise RosterError(sorted(errors, key=lambda error: error[0] or 0))
+
+    for _, row in rows:
+        row["department"] = departments[row["department"]]
+        row["role"] = roles.get(row.get("role"))
+    return [row for _, row in rows]
+
+
+def resolve_names(model, rows, column, create_missing, errors):
+    """Map the names used in ``column`` to instances, in one query."""
+    lines = {}
+    for line, row in rows:
+        if row.get(column):
+            lines.setdefault(row[column], line)
+    found = {obj.name: obj for obj in model.objects.filter(name__in=list(lines))}
+    missing = [name for name in lines if name not in found]
+    if missing and not create_missing:
+        for name in missing:
+            errors.append((lines[name], f"unknown {column} {name!r}"))
+    # With create_missing, unknown names stay strings until import_roster creates them.
+    return found | {name: name for name in missing}
+
+
+def _init_worker(settings_module):
+    # Spawned (non-fork) workers start without configured settings.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def hash_passwords(passwords, default=None, workers=None):
+    """Hash ``passwords`` (None = use ``default`` or leave unusable), in order."""
+    shared = make_password(default) if default else make_password(None)
+    todo = [i for i, password in enumerate(passwords) if password]
+    hashed = [shared] * len(passwords)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(todo)),
+            initializer=_init_worker,
+            initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"),),
+        ) as pool:
+            results = pool.map(make_password, [passwords[i] for i in todo], chunksize=16)
+            for i, value in zip(todo, results):
+                hashed[i] = value
+    else:
+        for i in todo:
+            hashed[i] = make_password(passwords[i])
+    return hashed
+
+
+def import_roster(rows, default_password=None, batch_size=500, workers=None):
+    """Create users and staff for validated ``rows``; returns the Staff rows."""
+    new_departments = {row["department"] for row in rows if isinstance(row["department"], str)}
+    new_roles = {row["role"] for row in rows if isinstance(row.get("role"), str)}
+
+    passwords = hash_passwords(
+        [row.get("password") or None for row in rows], default=default_password, workers=workers
+    )
+
+    # Names create_missing let through are created first, in one insert each.
+    departments, roles = {}, {}
+    if new_departments or new_roles:
+        with transaction.atomic():
+            departments = {
+                d.name: d for d in Department.objects.bulk_create(Department(name=n) for n in new_departments)
+            }
+            roles = {r.name: r for r in Role.objects.bulk_create(Role(name=n) for n in new_roles)}
+
+    # Each chunk commits on its own so the SQLite write lock is only held
+    # briefly; everything was validated and hashed before the first write.
+    created = []
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        with transaction.atomic():
+            users = CustomUser.objects.bulk_create(
+                CustomUser(email=row["email"], password=password)
+                for row, password in zip(chunk, passwords[start:start + batch_size])
+            )
+            created += Staff.objects.bulk_create(
+                Staff(
+                    user=user,
+                    fname=row["fname"],
+                    mname=row.get("mname") or None,
+                    lname=row["lname"],
+                    staff_id=row["staff_id"],
+                    department=departments.get(row["department"], row["department"]),
+                    role=roles.get(row["role"], row["role"]),
+                    is_hod=row["is_hod"],
+                    is_pc=row["is_pc"],
+                    is_vp=row["is_vp"],
+                )
+                for user, row in zip(users, chunk)
+            )
+    roster_imported.send(sender=Staff, staff=created)
+    return created
@@ -1,3 +1,172 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .access import DEPARTMENT, OWN, SCHOOL
+from .backends import StaffModelBackend
+from .models import CustomUser, Department, Role, Staff
+from .roster import RosterError, hash_passwords, import_roster, read_roster, validate_roster
+
+HEADER = "email,fname,mname,lname,staff_id,department,role,is_hod,is_pc,is_vp,password\n"
+
+
+def roster(*lines):
+    return io.StringIO(HEADER + "".join(line + "\n" for line in lines))
+
+# Staff writes bump dashboard cache versions; keep them out of the live cache.
+LOCAL_CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"} for alias in ("default", "shared")
+}
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"], CACHES=LOCAL_CACHES
+)
+class RosterImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Sciences")
+        cls.role = Role.objects.create(name="Teacher")
+
+    def test_imports_users_and_staff_in_bulk(self):
+        rows = validate_roster(read_roster(roster(
+            "Ada@School.com,Ada,,Lovelace,T001,Sciences,Teacher,yes,,,secret1",
+            "alan@school.com,Alan,M,Turing,T002,Sciences,,,,,",
+        )))
+
+        with self.assertNumQueries(4):  # one chunk: savepoint, users, staff, release
+            import_roster(rows, default_password="welcome", workers=1)
+
+        ada = Staff.objects.get(staff_id="T001")
+        self.assertEqual(ada.user.email, "ada@school.com")
+        self.assertTrue(ada.is_hod)
+        self.assertEqual(ada.role, self.role)
+        self.assertTrue(check_password("secret1", ada.user.password))
+        alan = CustomUser.objects.get(email="alan@school.com")
+        self.assertTrue(check_password("welcome", alan.password))
+
+    def test_whole_file_is_validated_before_writing(self):
+        CustomUser.objects.create(email="taken@school.com")
+        with self.assertRaises(RosterError) as ctx:
+            validate_roster(read_roster(roster(
+                "ok@school.com,Ok,,Row,T010,Sciences,,,,,",
+                "taken@school.com,Taken,,Email,T011,Sciences,,,,,",
+                "not-an-email,Bad,,Email,T012,Arts,,maybe,,,",
+                "ok@school.com,Dup,,Row,T010,Sciences,,,,,",
+            )))
+
+        lines = {line for line, _ in ctx.exception.errors}
+        self.assertEqual(lines, {3, 4, 5})
+        self.assertIn("unknown department 'Arts'", str(ctx.exception))
+        self.assertEqual(Staff.objects.count(), 0)
+
+    def test_existing_emails_and_staff_ids_match_regardless_of_case(self):
+        user = CustomUser.objects.create(email="Taken@School.com")
+        Staff.objects.create(user=user, fname="Taken", lname="User", staff_id="t040", department=self.department)
+        with self.assertRaises(RosterError) as ctx:
+            validate_roster(read_roster(roster(
+                "taken@school.com,Taken,,Again,T041,Sciences,,,,,",
+                "other@school.com,Other,,User,T040,Sciences,,,,,",
+                "third@school.com,Third,,User,T042,Sciences,,,,,",
+                "fourth@school.com,Fourth,,User,t042,Sciences,,,,,",
+            )))
+
+        self.assertEqual({line for line, _ in ctx.exception.errors}, {2, 3, 5})
+        self.assertIn("'Taken@School.com' already exists", str(ctx.exception))
+        self.assertIn("staff_id 't040' already exists", str(ctx.exception))
+
+    def test_create_missing_departments_and_roles(self):
+        rows = validate_roster(
+            read_roster(roster("new@school.com,New,,Dept,T020,Arts,Coordinator,,yes,,")),
+            create_missing=True,
+        )
+        import_roster(rows, workers=1)
+
+        staff = Staff.objects.get(staff_id="T020")
+        self.assertEqual((staff.department.name, staff.role.name), ("Arts", "Coordinator"))
+        self.assertFalse(staff.user.has_usable_password())
+
+    def test_hashes_in_a_process_pool(self):
+        hashed = hash_passwords(["a", None, "b"], workers=2)
+        self.assertTrue(check_password("a", hashed[0]))
+        self.assertFalse(hashed[1].startswith("md5$"))
+        self.assertTrue(check_password("b", hashed[2]))
+
+    def test_command_and_admin_page(self):
+        path = self.tmp_roster("cmd@school.com,Cmd,,Line,T030,Sciences,,,,,")
+        call_command("import_staff", path, "--workers", "1", stdout=io.StringIO())
+        self.assertTrue(Staff.objects.filter(staff_id="T030").exists())
+        with self.assertRaises(CommandError):
+            call_command("import_staff", path, "--workers", "1", stdout=io.StringIO())
+
+        admin = CustomUser.objects.create(email="admin@school.com", is_admin=True, is_staff=True)
+        self.client.force_login(admin)
+        upload = io.BytesIO((
+            HEADER
+            + "web@school.com,Web,,Upload,T031,Sciences,,,,,secret1\n"
+            + "net@school.com,Net,,Upload,T032,Sciences,,,,,secret2\n"
+        ).encode())
+        upload.name = "roster.csv"
+        # The admin page hashes in the request's own process.
+        with mock.patch("accounts.roster.ProcessPoolExecutor", side_effect=AssertionError("pool started")):
+            response = self.client.post(reverse("admin:accounts_staff_import"), {"roster": upload})
+        self.assertRedirects(response, reverse("admin:accounts_staff_changelist"))
+        self.assertTrue(Staff.objects.filter(staff_id="T031").exists())
+
+    def tmp_roster(self, *lines):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as fh:
+            fh.write(roster(*lines).getvalue())
+        self.addCleanup(os.unlink, fh.name)
+        return fh.name
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class AccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Sciences")
+        cls.role = Role.objects.create(name="Teacher")
+        cls.staff = {}
+        for name, flags in {"teacher": {}, "hod": {"is_hod": True}, "pc": {"is_pc": True}}.items():
+            user = CustomUser.objects.create(email=f"{name}@school.com")
+            cls.staff[name] = Staff.objects.create(
+                user=user, fname=name, lname="Test", staff_id=name,
+                department=cls.department, role=cls.role, **flags,
+            )
+
+    def test_user_staff_department_and_role_load_in_one_query(self):
+        with self.assertNumQueries(1):
+            user = StaffModelBackend().get_user(self.staff["hod"].user_id)
+            self.assertEqual(user.staff.department.name, "Sciences")
+            self.assertEqual(user.staff.role.name, "Teacher")
+
+    def test_request_access_scope(self):
+        for name, scope in (("teacher", OWN), ("hod", DEPARTMENT), ("pc", SCHOOL)):
+            self.client.force_login(self.staff[name].user)
+            response = self.client.get(reverse("reflections_list"))
+            self.assertEqual(response.wsgi_request.access.scope, scope)
+
+    def test_pages_skip_the_staff_lookup(self):
+        def count():
+            self.client.force_login(self.staff["hod"].user)
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(reverse("department_members"))
+            return len(ctx.captured_queries)
+
+        with override_settings(AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"]):
+            before = count()
+        self.assertLess(count(), before)
+
+    def test_sessions_from_the_plain_model_backend_stay_logged_in(self):
+        self.client.force_login(self.staff["hod"].user, backend="django.contrib.auth.backends.ModelBackend")
+        response = self.client.get(reverse("department_members"))
+        self.assertEqual(response.status_code, 200)
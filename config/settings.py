@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -22,8 +23,12 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-t(v5#ps--z!#orro=!rl#b)aif9$0$6%)fcb$(s!b+7ru6qy14'
 
+# Production profile: DJANGO_PRODUCTION=1 turns DEBUG off (with DEBUG on,
+# every SQL string is kept in connection.queries) and keeps DB connections open.
+PRODUCTION = os.environ.get('DJANGO_PRODUCTION', '0') == '1'
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('DJANGO_DEBUG', '0' if PRODUCTION else '1') == '1'
 
 ALLOWED_HOSTS = ["pages123.pythonanywhere.com", '127.0.0.1']
 
@@ -54,10 +59,12 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'perf.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.access.AccessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -101,10 +108,80 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',  # Database file will be created in your project root
+        # Reuse a connection across requests; health checks replace dead ones.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600 if PRODUCTION else 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds to wait for the write lock before "database is locked".
+            'timeout': 20,
+        },
+        'TEST': {
+            # A file rather than :memory:, so concurrency tests see real locking.
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# SQLite tuning for several concurrent workers: the pragmas below (WAL mode is
+# persistent and adds -wal/-shm files next to the database) and write locks
+# taken at BEGIN. On in production; PERF_SQLITE_TUNING=1 turns it on elsewhere.
+PERF_SQLITE_TUNING = os.environ.get('PERF_SQLITE_TUNING', '1' if PRODUCTION else '0') == '1'
+
+if PERF_SQLITE_TUNING:
+    # A deferred transaction that reads first and then writes cannot wait for
+    # the lock and fails at once.
+    DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# Applied to every new SQLite connection when PERF_SQLITE_TUNING is on (perf/db.py).
+PERF_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # readers no longer block the writer
+    'synchronous': 'NORMAL',  # fsync at checkpoints only; safe with WAL
+    'busy_timeout': 20000,  # ms
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -20000,  # negative = KiB, ~20 MB page cache
+    'temp_store': 'MEMORY',
+}
+
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Seen by every worker process on the host. Swap in Redis or Memcached
+    # when workers run on more than one machine.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('PERF_CACHE_DIR', BASE_DIR / '.cache'),
+        # Namespaces this project's keys when the directory (or a Redis or
+        # Memcached server swapped in for it) is shared with anything else.
+        'KEY_PREFIX': os.environ.get('PERF_CACHE_PREFIX', 'veep'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Dashboard payloads are cached per role and scope (see perf/caching.py).
+# Writes invalidate them by bumping a version stored in the same cache, so
+# this alias must be shared between workers: a process-local backend such as
+# LocMemCache would leave the other workers serving stale dashboards. Each
+# worker's in-memory catalog snapshot (perf/catalog.py) is checked against a
+# version kept here too, so admin edits to domains, components and years only
+# reach every worker through a shared alias.
+PERF_DASHBOARD_CACHE = 'shared'
+PERF_DASHBOARD_TIMEOUT = 60 * 5
 
+# ReflectionWizard keeps its in-progress steps here (perf/wizard.py). Like the
+# dashboard cache, this must be shared between workers: consecutive steps are
+# routinely served by different processes.
+PERF_WIZARD_CACHE = 'shared'
+PERF_WIZARD_TIMEOUT = 60 * 60 * 2
+
+# Month an academic year starts in. Reflections are filed under the year their
+# date falls in when no year is active, and when backfilling old rows.
+PERF_ACADEMIC_YEAR_START_MONTH = 9
 
 
 # Password validation
@@ -147,6 +224,30 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Static pipeline (perf/staticfiles.py). In production, collectstatic writes
+# hashed names plus .gz variants, and plugins that no template uses are
+# left out. Run collectstatic with DJANGO_PRODUCTION=1 so the manifest exists.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': (
+            'perf.staticfiles.CompressedManifestStaticFilesStorage'
+            if PRODUCTION
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+STATICFILES_FINDERS = [
+    'perf.staticfiles.PrunedPluginsFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+]
+PERF_STATIC_TEMPLATE_DIRS = [
+    BASE_DIR / 'perf' / 'templates',
+    BASE_DIR / 'accounts' / 'templates',
+]
+# Serve STATIC_ROOT from Django with far-future caching when nothing in front does.
+PERF_SERVE_STATIC = os.environ.get('PERF_SERVE_STATIC', '1' if PRODUCTION else '0') == '1'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -155,8 +256,62 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+# Loads staff, department and role together with the user, once per request.
+# ModelBackend stays listed so sessions that recorded it as their backend
+# remain valid; StaffModelBackend comes first, so new logins use it.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.StaffModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 
 
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'  # where to go after login
 LOGOUT_REDIRECT_URL = '/login/'  # where to go after logout
+
+
+# Per-request SQL instrumentation (perf/middleware.py)
+# Logs slow / N+1 requests as JSON lines. On by default only with DEBUG;
+# Server-Timing headers are sent to every client, so they stay DEBUG-only
+# unless PERF_SERVER_TIMING=1.
+
+PERF_SQL_INSTRUMENTATION = {
+    'ENABLED': os.environ.get('PERF_SQL_INSTRUMENTATION', '1' if DEBUG else '0') == '1',
+    'SLOW_REQUEST_MS': int(os.environ.get('PERF_SLOW_REQUEST_MS', 500)),
+    'DUPLICATE_THRESHOLD': 3,
+    'LOG_ALL': False,
+    'SERVER_TIMING': os.environ.get('PERF_SERVER_TIMING', '1' if DEBUG else '0') == '1',
+}
+
+# Preload URLs, templates and the reflection catalog when a worker boots
+# (perf/warmup.py, called from config/wsgi.py and config/asgi.py).
+
+PERF_WARMUP = os.environ.get('PERF_WARMUP', '1') == '1'
+
+PERF_SQL_LOG = os.environ.get('PERF_SQL_LOG', BASE_DIR / 'perf_sql.log')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'perf_sql': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': PERF_SQL_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'perf.sql': {
+            'handlers': ['perf_sql'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -1,5 +1,10 @@
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from perf import staticfiles
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -7,3 +12,8 @@ urlpatterns = [
 
     
 ]
+
+if settings.PERF_SERVE_STATIC:
+    urlpatterns += [
+        re_path(r"^%s(?P<path>.+)$" % re.escape(settings.STATIC_URL.lstrip("/")), staticfiles.serve),
+    ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Needs the app registry that get_wsgi_application() just set up.
+from perf.warmup import warm_up  # noqa: E402
+
+warm_up()
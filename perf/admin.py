@@ -1,6 +1,7 @@
 from django.contrib import admin
 from import_export.admin import ImportExportModelAdmin
 from .models import Domain, Component, SelfReflection, ReflectionDomain, GrowthPlan, Observation, AcademicYear
+from . import search
 
 
 admin.site.register(Observation)
@@ -29,12 +30,33 @@ class GrowthPlanInline(admin.StackedInline):
     filter_horizontal = ("components_addressed",)
 
 
+class FullTextSearchMixin:
+    """Also match the admin search box against the FTS index (perf/search.py)."""
+
+    full_text_search = None  # search.matching_reflections or search.matching_plans
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        matches = self.full_text_search(search_term) if search_term else None
+        if matches is not None:
+            results |= queryset.filter(pk__in=matches)
+        return results, may_have_duplicates
+
+
 @admin.register(SelfReflection)
-class SelfReflectionAdmin(ImportExportModelAdmin):  # import-export enabled
-    list_display = ("teacher", "date_created")
-    search_fields = ("teacher__user__username", "teacher__user__first_name", "teacher__user__last_name")
+class SelfReflectionAdmin(FullTextSearchMixin, ImportExportModelAdmin):  # import-export enabled
+    list_display = ("teacher", "academic_year", "date_created")
+    list_filter = ("academic_year",)
+    search_fields = ("teacher__fname", "teacher__lname", "teacher__staff_id", "teacher__user__email")
+    full_text_search = staticmethod(search.matching_reflections)
     inlines = [ReflectionDomainInline, GrowthPlanInline]
 
+    def get_readonly_fields(self, request, obj=None):
+        # The rollups count a reflection under the year it was filed in.
+        if obj is not None:
+            return ("academic_year",)
+        return ()
+
 
 @admin.register(Component)
 class ComponentAdmin(ImportExportModelAdmin):  # import-export enabled
@@ -52,10 +74,11 @@ class AcademicYearAdmin(ImportExportModelAdmin):  # import-export enabled
 
 
 @admin.register(GrowthPlan)
-class GrowthPlanAdmin(ImportExportModelAdmin):  # import-export enabled
+class GrowthPlanAdmin(FullTextSearchMixin, ImportExportModelAdmin):  # import-export enabled
     list_display = ("goal_statement", "reflection", "evaluator_name", "date", "academic_year")
     list_filter = ("date", "academic_year")
     search_fields = ("goal_statement", "evaluator_name")
+    full_text_search = staticmethod(search.matching_plans)
     filter_horizontal = ("components_addressed",)
 
 
@@ -0,0 +1,242 @@
+"""Dashboard analytics.
+
+Every dashboard payload is built from a fixed handful of grouped queries so
+page cost does not grow with the number of reflections in scope. Dashboards
+cover one academic year, so they only touch that year's rows as history
+accumulates (``year`` is only ``None`` before any year has been set up). Department
+and school figures, teacher profiles and the member directory are read from
+the rollup tables maintained by ``perf.rollups``; department and school figures
+cover active teachers only.
+"""
+from django.db.models import Count, F, Prefetch, Sum
+from django.db.models.functions import Coalesce
+
+from accounts.models import Staff as Teacher
+from .models import (
+    SelfReflection,
+    ReflectionDomain,
+    GrowthPlan,
+    DepartmentRollup,
+    ComponentRollup,
+    TeacherRollup,
+)
+from .catalog import get_catalog
+
+RECENT_REFLECTIONS = 5
+TOP_COMPONENTS = 5
+
+StrengthLink = ReflectionDomain.strengths.through
+GrowthLink = ReflectionDomain.growths.through
+
+
+def _component_counts(link_model, reflections):
+    """Selections per component (with its domain) for the given reflections."""
+    return list(
+        link_model.objects.filter(reflectiondomain__reflection__in=reflections)
+        .values("component_id", "component__name", "component__domain__name")
+        .annotate(total=Count("id"))
+        .order_by("-total", "component__name")
+    )
+
+
+def _domain_counts(component_rows):
+    """Roll component counts up to their domain, largest first."""
+    totals = {}
+    for row in component_rows:
+        name = row["component__domain__name"]
+        totals[name] = totals.get(name, 0) + row["total"]
+    return [
+        {"domain__name": name, "total": total}
+        for name, total in sorted(totals.items(), key=lambda item: -item[1])
+    ]
+
+
+def _top_components(component_rows):
+    return [
+        {
+            "id": row["component_id"],
+            "name": row["component__name"],
+            "domain__name": row["component__domain__name"],
+            "total": row["total"],
+            "count": row["total"],
+        }
+        for row in component_rows[:TOP_COMPONENTS]
+    ]
+
+
+def recent_reflections(reflections, limit=RECENT_REFLECTIONS):
+    """Latest reflections with everything the dashboard tables render."""
+    return list(
+        reflections.select_related("teacher", "teacher__department")
+        .prefetch_related(
+            Prefetch(
+                "growth_plans",
+                queryset=GrowthPlan.objects.select_related("observation").order_by("id"),
+            )
+        )
+        .order_by("-date_created", "-id")[:limit]
+    )
+
+
+def _rollup_component_rows(rollups, field):
+    """Component rows shaped like ``_component_counts`` from rollup counters."""
+    rows = (
+        rollups.values("component_id", "component__name", "component__domain__name")
+        .annotate(total=Sum(field))
+        .filter(total__gt=0)
+        .order_by("-total", "component__name")
+    )
+    return list(rows)
+
+
+def scope_summary(staff, department_rollups, component_rollups, reflections):
+    """Dashboard figures for a scope, read from its rollup rows.
+
+    ``reflections`` is only used for the short list of recent reflections.
+    """
+    total_teachers = staff.count()
+    totals = department_rollups.aggregate(
+        reflections=Sum("reflection_count"),
+        teachers=Sum("teachers_with_reflections"),
+        plans=Sum("growth_plan_count"),
+        observed=Sum("observed_plan_count"),
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    strength_rows = _rollup_component_rows(component_rollups, "strength_count")
+    growth_rows = _rollup_component_rows(component_rollups, "growth_count")
+
+    teachers_with_reflections = totals["teachers"]
+    reflection_completion = (
+        (teachers_with_reflections / total_teachers) * 100 if total_teachers > 0 else 0
+    )
+
+    return {
+        "total_teachers": total_teachers,
+        "teachers_with_reflections": teachers_with_reflections,
+        "total_reflections": totals["reflections"],
+        "reflection_completion": round(reflection_completion, 1),
+        "completed_growth_plans": totals["plans"],
+        "obs_pending": totals["plans"] - totals["observed"],
+        "obs_completed": totals["observed"],
+        "strength_counts": _domain_counts(strength_rows),
+        "growth_counts": _domain_counts(growth_rows),
+        "component_strength_counts": _top_components(strength_rows),
+        "component_growth_counts": _top_components(growth_rows),
+        "reflections": recent_reflections(reflections),
+    }
+
+
+def _for_year(rollups, year):
+    return rollups if year is None else rollups.filter(academic_year=year)
+
+
+def department_summary(department, year):
+    """Dashboard payload for an HOD: one department's staff and reflections."""
+    return scope_summary(
+        Teacher.objects.filter(department=department, is_active=True),
+        _for_year(DepartmentRollup.objects.filter(department=department), year),
+        _for_year(ComponentRollup.objects.filter(department=department), year),
+        SelfReflection.objects.for_year(year).for_department(department).filter(teacher__is_active=True),
+    )
+
+
+def school_summary(year):
+    """Dashboard payload for PC/VP users across every department."""
+    return scope_summary(
+        Teacher.objects.filter(is_active=True),
+        _for_year(DepartmentRollup.objects.all(), year),
+        _for_year(ComponentRollup.objects.all(), year),
+        SelfReflection.objects.for_year(year).filter(teacher__is_active=True),
+    )
+
+
+def teacher_summary(teacher, year):
+    """Dashboard payload for a single teacher's own reflections."""
+    reflections = SelfReflection.objects.for_year(year).for_teacher(teacher)
+    domain_totals = ReflectionDomain.objects.for_year(year).for_teacher(teacher).aggregate(
+        domains=Count("domain", distinct=True)
+    )
+    plan_totals = GrowthPlan.objects.for_year(year).for_teacher(teacher).aggregate(
+        total=Count("id"), observed=Count("observation")
+    )
+    strength_rows = _component_counts(StrengthLink, reflections)
+    growth_rows = _component_counts(GrowthLink, reflections)
+
+    return {
+        "total_reflections": reflections.count(),
+        "domains_covered": domain_totals["domains"],
+        "strengths_count": sum(row["total"] for row in strength_rows),
+        "growths_count": sum(row["total"] for row in growth_rows),
+        "total_growth_plans": plan_totals["total"],
+        "observed_plans": plan_totals["observed"],
+        "top_strengths": _top_components(strength_rows),
+        "top_growths": _top_components(growth_rows),
+    }
+
+
+# === Teacher profile ===
+
+def _vector_components(vector, components):
+    """Top component rows, shaped like ``_top_components``, from a summary vector."""
+    rows = []
+    for key, total in vector.items():
+        component = components.get(int(key))
+        if component is not None:
+            rows.append(
+                {
+                    "id": component.pk,
+                    "name": component.name,
+                    "domain__name": component.domain.name,
+                    "total": total,
+                    "count": total,
+                }
+            )
+    rows.sort(key=lambda row: (-row["total"], row["name"]))
+    return rows[:TOP_COMPONENTS]
+
+
+def teacher_profile(teacher):
+    """Profile figures for one teacher from their summary row: one query."""
+    summary = TeacherRollup.objects.filter(teacher=teacher).first() or TeacherRollup(teacher=teacher)
+    components = get_catalog().components
+    return {
+        "summary": summary,
+        "total_reflections": summary.reflection_count,
+        "strength_components": _vector_components(summary.strength_counts, components),
+        "growth_components": _vector_components(summary.growth_counts, components),
+    }
+
+
+# === Member directory ===
+
+# ?sort= keys for the directory; "-key" reverses. The pk keeps pages stable.
+DIRECTORY_SORTS = {
+    "name": (F("fname").asc(), F("lname").asc()),
+    "department": (F("department__name").asc(), F("fname").asc()),
+    "reflections": (F("reflection_count").asc(),),
+    "latest": (F("latest_reflection").asc(nulls_first=True),),
+    "plans": (F("growth_plan_count").asc(),),
+    # Plans still waiting for an observation.
+    "pending": ((F("growth_plan_count") - F("observed_plan_count")).asc(),),
+}
+
+
+def member_directory(staff, sort="name"):
+    """Staff rows with their reflection activity, as one query.
+
+    The figures come from each teacher's summary row (``TeacherRollup``),
+    joined in, so the page costs the same however much history there is.
+    """
+    directory = staff.select_related("department", "role", "user").annotate(
+        reflection_count=Coalesce(F("rollup__reflection_count"), 0),
+        latest_reflection=F("rollup__latest_reflection"),
+        growth_plan_count=Coalesce(F("rollup__growth_plan_count"), 0),
+        observed_plan_count=Coalesce(F("rollup__observed_plan_count"), 0),
+    )
+
+    key = sort.lstrip("-")
+    order = [expression.copy() for expression in DIRECTORY_SORTS.get(key, DIRECTORY_SORTS["name"])]
+    if sort.startswith("-") and key in DIRECTORY_SORTS:
+        for expression in order:
+            expression.reverse_ordering()
+    return directory.order_by(*order, "pk")
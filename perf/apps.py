@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class PerfConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'perf'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import db, signals  # noqa: F401
+
+        connection_created.connect(db.configure_sqlite, dispatch_uid="perf_sqlite_pragmas")
@@ -0,0 +1,92 @@
+"""Versioned caching for computed pages.
+
+Cached values are filed under a *scope* such as ``("department", 3)``,
+``("teacher", 12)`` or ``("school",)``. Each scope has a version number stored
+in the cache itself; keys embed the current version, so bumping it on write
+makes every older entry for that scope unreachable without having to find and
+delete it. The cache alias comes from ``PERF_DASHBOARD_CACHE``.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+SCHOOL = ("school",)
+
+
+def get_cache():
+    return caches[getattr(settings, "PERF_DASHBOARD_CACHE", "default")]
+
+
+def department_scope(department_id):
+    return ("department", department_id)
+
+
+def teacher_scope(teacher_id):
+    return ("teacher", teacher_id)
+
+
+def _version_key(scope):
+    return "perf:version:" + ":".join(str(part) for part in scope)
+
+
+def _fresh_version():
+    # Seeded from the clock rather than 1, so a version key that was evicted
+    # cannot come back with a number that older payloads were stored under.
+    return int(time.time() * 1000)
+
+
+def get_version(scope, cache=None):
+    cache = cache or get_cache()
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump(*scopes):
+    """Invalidate everything cached under ``scopes``.
+
+    Inside a transaction the versions are bumped again on commit: until then
+    other workers still read the old rows and could file a payload built from
+    them under the version bumped here.
+    """
+    _bump(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(scopes))
+
+
+def _bump(scopes):
+    cache = get_cache()
+    for scope in scopes:
+        if scope is None or None in scope:
+            continue
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), _fresh_version(), timeout=None)
+
+
+def bump_owner(teacher_id=None, department_id=None):
+    """Invalidate the scopes a write to one teacher's data can affect."""
+    bump(
+        teacher_scope(teacher_id) if teacher_id else None,
+        department_scope(department_id) if department_id else None,
+        SCHOOL,
+    )
+
+
+def get_or_build(name, scope, builder):
+    """Return the cached value for ``name`` in ``scope``, building it on a miss."""
+    cache = get_cache()
+    key = "perf:{}:{}:v{}".format(
+        name, ":".join(str(part) for part in scope), get_version(scope, cache)
+    )
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, getattr(settings, "PERF_DASHBOARD_TIMEOUT", 300))
+    return value
@@ -0,0 +1,79 @@
+"""Process-wide cache of the reflection catalog.
+
+Domains, components and academic years change a few times a year but are read
+on every wizard step and edit page. Each worker process keeps one in-memory
+snapshot and rebuilds it when the catalog version, stored in the
+``PERF_DASHBOARD_CACHE`` alias (see ``caching``), moves on. That alias must be
+shared between processes, or other workers keep serving their old snapshot.
+Saving or deleting a ``Domain``, ``Component`` or ``AcademicYear`` bumps that
+version (see ``signals``), so every worker picks up admin changes on its next
+read.
+
+Snapshot instances are shared between requests and threads: treat them as
+read-only.
+"""
+import threading
+
+from . import caching
+from .models import AcademicYear, Domain, Component
+
+SCOPE = ("catalog",)
+
+
+class Catalog:
+    def __init__(self, version):
+        self.version = version
+        self.domains = {domain.pk: domain for domain in Domain.objects.order_by("id")}
+
+        self.components = {}
+        self.by_domain = {domain_id: [] for domain_id in self.domains}
+        for component in Component.objects.order_by("domain_id", "id"):
+            # Component.__str__ reads its domain; point it at the shared instance.
+            component.domain = self.domains[component.domain_id]
+            self.components[component.pk] = component
+            self.by_domain[component.domain_id].append(component)
+
+        self.by_role = {}
+        for domain in self.domains.values():
+            self.by_role.setdefault(domain.role_id, []).append(domain)
+
+        self.years = list(AcademicYear.objects.order_by("-start_year", "-end_year"))
+        self.active_year = next((year for year in self.years if year.is_active), None)
+
+    def domains_for_role(self, role_id):
+        return self.by_role.get(role_id, [])
+
+    def components_for(self, domain_id):
+        return self.by_domain.get(domain_id, [])
+
+    def components_in(self, ids):
+        """Catalog components for ``ids``, in catalog order; unknown ids are skipped."""
+        ids = set(ids)
+        return [component for pk, component in self.components.items() if pk in ids]
+
+
+_lock = threading.Lock()
+_current = None
+
+
+def get_catalog():
+    """The current catalog snapshot, rebuilt if another process invalidated it."""
+    global _current
+    version = caching.get_version(SCOPE)
+    catalog = _current
+    if catalog is None or catalog.version != version:
+        with _lock:
+            if _current is None or _current.version != version:
+                _current = Catalog(version)
+            catalog = _current
+    return catalog
+
+
+def invalidate():
+    caching.bump(SCOPE)
+
+
+def reset():
+    """Drop this process's snapshot (tests roll the database back under it)."""
+    global _current
+    _current = None
@@ -0,0 +1,17 @@
+"""SQLite connection tuning.
+
+``configure_sqlite`` runs on ``connection_created`` and, when
+``PERF_SQLITE_TUNING`` is on, applies ``PERF_SQLITE_PRAGMAS`` to each new
+connection. With ``CONN_MAX_AGE`` set that happens once per worker connection,
+not once per request.
+"""
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite" or not getattr(settings, "PERF_SQLITE_TUNING", False):
+        return
+    pragmas = getattr(settings, "PERF_SQLITE_PRAGMAS", {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
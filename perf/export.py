@@ -0,0 +1,185 @@
+"""Streaming school-wide reflection export (CSV and NDJSON).
+
+Reflections are read with ``.iterator(chunk_size=...)``. Django runs the
+prefetches once per chunk, so memory holds one chunk at a time however much
+history there is, and the response starts as soon as the first chunk is read.
+Domain and component names come from the in-memory catalog rather than joins.
+"""
+import csv
+import json
+
+from django.db.models import Prefetch
+
+from .catalog import get_catalog
+from .models import SelfReflection, ReflectionDomain, GrowthPlan, Component
+
+CHUNK_SIZE = 500
+
+CSV_HEADER = [
+    "reflection_id",
+    "date_created",
+    "teacher",
+    "staff_id",
+    "department",
+    "domains",
+    "strengths",
+    "growths",
+    "next_steps",
+    "growth_plan_id",
+    "academic_year",
+    "goal_statement",
+    "components_addressed",
+    "indicators_of_success",
+    "actions",
+    "timelines",
+    "resources",
+    "evaluator_name",
+    "plan_date",
+    "hod_comment",
+    "coordinator_comment",
+    "prin_comment",
+]
+
+OBSERVATION_FIELDS = ("hod_comment", "coordinator_comment", "prin_comment")
+
+
+def export_queryset():
+    component_ids = Component.objects.only("id")
+    return (
+        SelfReflection.objects.select_related("teacher__department")
+        .prefetch_related(
+            Prefetch("reflection_domains", queryset=ReflectionDomain.objects.order_by("id")),
+            Prefetch("reflection_domains__strengths", queryset=component_ids),
+            Prefetch("reflection_domains__growths", queryset=component_ids),
+            Prefetch(
+                "growth_plans",
+                queryset=GrowthPlan.objects.select_related("academic_year", "observation").order_by("id"),
+            ),
+            Prefetch("growth_plans__components_addressed", queryset=component_ids),
+        )
+        .order_by("date_created", "id")
+    )
+
+
+def iter_reflections(queryset=None, chunk_size=CHUNK_SIZE):
+    """One nested dict per reflection, oldest first."""
+    catalog = get_catalog()
+
+    def names(components):
+        return [
+            str(catalog.components.get(component.pk, component.pk))
+            for component in components.all()
+        ]
+
+    queryset = export_queryset() if queryset is None else queryset
+    for reflection in queryset.iterator(chunk_size=chunk_size):
+        teacher = reflection.teacher
+        yield {
+            "id": reflection.pk,
+            "date_created": reflection.date_created.isoformat(),
+            "teacher": str(teacher),
+            "staff_id": teacher.staff_id,
+            "department": teacher.department.name if teacher.department else None,
+            "domains": [
+                {
+                    "domain": str(catalog.domains.get(rd.domain_id, rd.domain_id)),
+                    "strengths": names(rd.strengths),
+                    "growths": names(rd.growths),
+                    "next_steps": rd.next_steps,
+                }
+                for rd in reflection.reflection_domains.all()
+            ],
+            "growth_plans": [
+                {
+                    "id": plan.pk,
+                    "academic_year": str(plan.academic_year),
+                    "goal_statement": plan.goal_statement,
+                    "components_addressed": names(plan.components_addressed),
+                    "indicators_of_success": plan.indicators_of_success,
+                    "actions": plan.actions,
+                    "timelines": plan.timelines,
+                    "resources": plan.resources,
+                    "evaluator_name": plan.evaluator_name,
+                    "date": plan.date.isoformat(),
+                    "observation": (
+                        {field: getattr(plan.observation, field) for field in OBSERVATION_FIELDS}
+                        if hasattr(plan, "observation")
+                        else None
+                    ),
+                }
+                for plan in reflection.growth_plans.all()
+            ],
+        }
+
+
+def ndjson_lines(reflections):
+    for reflection in reflections:
+        yield json.dumps(reflection, ensure_ascii=False) + "\n"
+
+
+# Spreadsheets run cells starting with these as formulas; free text such as
+# goal statements and HOD comments must come out as text.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class Echo:
+    """File-like object whose ``write`` hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(reflections):
+    """One CSV row per growth plan; reflections without a plan get one row."""
+    writer = csv.writer(Echo())
+
+    def row(cells):
+        return writer.writerow([escape_cell(cell) for cell in cells])
+
+    yield row(CSV_HEADER)
+    for reflection in reflections:
+        domains = reflection["domains"]
+        base = [
+            reflection["id"],
+            reflection["date_created"],
+            reflection["teacher"],
+            reflection["staff_id"],
+            reflection["department"],
+            "; ".join(d["domain"] for d in domains),
+            "; ".join(name for d in domains for name in d["strengths"]),
+            "; ".join(name for d in domains for name in d["growths"]),
+            "; ".join(f"{d['domain']}: {d['next_steps']}" for d in domains if d["next_steps"]),
+        ]
+        for plan in reflection["growth_plans"] or [None]:
+            if plan is None:
+                yield row(base + [""] * (len(CSV_HEADER) - len(base)))
+                continue
+            observation = plan["observation"] or {}
+            yield row(
+                base
+                + [
+                    plan["id"],
+                    plan["academic_year"],
+                    plan["goal_statement"],
+                    "; ".join(plan["components_addressed"]),
+                    plan["indicators_of_success"],
+                    plan["actions"],
+                    plan["timelines"],
+                    plan["resources"],
+                    plan["evaluator_name"],
+                    plan["date"],
+                ]
+                + [observation.get(field) for field in OBSERVATION_FIELDS]
+            )
+
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", csv_lines),
+    "ndjson": ("application/x-ndjson; charset=utf-8", ndjson_lines),
+}
@@ -1,15 +1,48 @@
 from django import forms
-from .models import ReflectionDomain, GrowthPlan, Component
+from .models import ReflectionDomain, GrowthPlan
 from .models import Observation
+from .catalog import get_catalog
+
+
+class ComponentChoiceField(forms.TypedMultipleChoiceField):
+    """Pick components from the in-memory catalog.
+
+    Choices are set from a list of catalog ``Component`` instances and the
+    cleaned value is a list of those instances, so neither rendering nor
+    validating the field queries the database.
+    """
+
+    def __init__(self, components=(), **kwargs):
+        super().__init__(coerce=int, **kwargs)
+        self.components = components
+
+    @property
+    def components(self):
+        return list(self._components.values())
+
+    @components.setter
+    def components(self, components):
+        self._components = {component.pk: component for component in components}
+        self.choices = [(pk, str(component)) for pk, component in self._components.items()]
+
+    def prepare_value(self, value):
+        if value is None:
+            return value
+        return [getattr(item, "pk", item) for item in value]
+
+    def clean(self, value):
+        return [self._components[pk] for pk in super().clean(value)]
+
+    def has_changed(self, initial, data):
+        return super().has_changed(self.prepare_value(initial), data)
+
 
 class ReflectionDomainForm(forms.ModelForm):
-    strengths = forms.ModelMultipleChoiceField(
-        queryset=Component.objects.none(),
+    strengths = ComponentChoiceField(
         required=False,
         widget=forms.CheckboxSelectMultiple(attrs={"class": "form-check-input"})
     )
-    growths = forms.ModelMultipleChoiceField(
-        queryset=Component.objects.none(),
+    growths = ComponentChoiceField(
         required=False,
         widget=forms.CheckboxSelectMultiple(attrs={"class": "form-check-input"})
     )
@@ -25,8 +58,9 @@ class ReflectionDomainForm(forms.ModelForm):
         domain = kwargs.pop("domain", None)
         super().__init__(*args, **kwargs)
         if domain:
-            self.fields["strengths"].queryset = Component.objects.filter(domain=domain)
-            self.fields["growths"].queryset = Component.objects.filter(domain=domain)
+            components = get_catalog().components_for(domain.pk)
+            self.fields["strengths"].components = components
+            self.fields["growths"].components = components
 
     def clean(self):
         cleaned_data = super().clean()
@@ -39,6 +73,10 @@ class ReflectionDomainForm(forms.ModelForm):
 
 
 class GrowthPlanForm(forms.ModelForm):
+    components_addressed = ComponentChoiceField(
+        widget=forms.CheckboxSelectMultiple(attrs={"class": "form-check-input"})
+    )
+
     class Meta:
         model = GrowthPlan
         fields = [
@@ -55,7 +93,6 @@ class GrowthPlanForm(forms.ModelForm):
         widgets = {
             "academic_year": forms.Select(attrs={"class": "form-control"}),
             "goal_statement": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
-            "components_addressed": forms.CheckboxSelectMultiple(attrs={"class": "form-check-input"}),
             "indicators_of_success": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
             "actions": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
             "timelines": forms.TextInput(attrs={"class": "form-control"}),
@@ -67,8 +104,9 @@ class GrowthPlanForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         growth_components = kwargs.pop("growth_components", None)
         super().__init__(*args, **kwargs)
-        if growth_components is not None:
-            self.fields["components_addressed"].queryset = growth_components
+        if growth_components is None:
+            growth_components = get_catalog().components.values()
+        self.fields["components_addressed"].components = growth_components
 
 
 
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from perf import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute every teacher's profile summary (counts, component vectors, latest activity)"
+
+    def handle(self, *args, **kwargs):
+        teachers = rollups.rebuild_teachers()
+        rollups.bump_caches()
+        self.stdout.write(self.style.SUCCESS(f"✅ Backfilled summaries for {teachers} teachers"))
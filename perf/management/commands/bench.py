@@ -0,0 +1,193 @@
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from perf.models import SelfReflection
+from perf.seeding import seed_school, throwaway_caches, view_urls
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic school in a throwaway database and time every perf view "
+        "as a teacher, HOD and PC (p50/p95 latency, queries, peak memory)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teachers", type=int, default=50)
+        parser.add_argument("--reflections-per-teacher", type=int, default=5)
+        parser.add_argument("--departments", type=int, default=8)
+        parser.add_argument("--domains", type=int, default=4)
+        parser.add_argument("--components", type=int, default=5, help="Components per domain")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Keep caches between requests instead of clearing them before each one",
+        )
+        parser.add_argument("--output", help="Write results to this JSON file")
+        parser.add_argument("--compare", help="Baseline JSON from a previous run")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed p95 slowdown against the baseline, as a fraction (0.2 = 20%%)",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with throwaway_caches():
+                started = time.perf_counter()
+                sample = self.seed(options)
+                seed_seconds = time.perf_counter() - started
+                self.stdout.write(f"Seeded {SelfReflection.objects.count()} reflections in {seed_seconds:.1f}s")
+                results = self.run(sample, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "meta": {
+                "created": timezone.now().isoformat(),
+                "seed_seconds": round(seed_seconds, 2),
+                **{
+                    key: options[key]
+                    for key in (
+                        "teachers",
+                        "reflections_per_teacher",
+                        "departments",
+                        "domains",
+                        "components",
+                        "iterations",
+                        "seed",
+                        "warm_cache",
+                    )
+                },
+            },
+            "results": results,
+        }
+        self.print_table(results)
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Results written to {options['output']}"))
+
+        if options["compare"]:
+            self.compare(results, options["compare"], options["threshold"])
+
+    # === Data ===
+
+    def seed(self, options):
+        return seed_school(
+            teachers=options["teachers"],
+            reflections_per_teacher=options["reflections_per_teacher"],
+            departments=options["departments"],
+            domains=options["domains"],
+            components=options["components"],
+            seed=options["seed"],
+        )
+
+    # === Measurement ===
+
+    def targets(self, sample):
+        for name, url in view_urls(sample):
+            if url is None:
+                self.stdout.write(self.style.WARNING(f"⚠️ No sample arguments for {name}, skipping"))
+                continue
+            yield name, url
+
+    def run(self, sample, options):
+        # Failing views are recorded by status code; keep their tracebacks out of the report.
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+        results = {}
+        targets = list(self.targets(sample))
+        for role, staff in sample["roles"].items():
+            client = Client(raise_request_exception=False)
+            client.force_login(staff.user)
+            for name, url in targets:
+                results[f"{role}:{name}"] = self.measure(client, url, options)
+        return results
+
+    def measure(self, client, url, options):
+        def request():
+            if not options["warm_cache"]:
+                for cache in caches.all():
+                    cache.clear()
+            response = client.get(url)
+            if response.streaming:
+                # Streamed views do their queries while the body is read.
+                b"".join(response.streaming_content)
+            return response
+
+        request()  # warm-up: imports, template loading
+        timings, queries = [], 0
+        for _ in range(options["iterations"]):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - start) * 1000)
+            queries = len(ctx.captured_queries)
+
+        tracemalloc.start()
+        request()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            "url": url,
+            "status": response.status_code,
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "queries": queries,
+            "peak_kb": round(peak / 1024, 1),
+        }
+
+    # === Reporting ===
+
+    def print_table(self, results):
+        self.stdout.write(f"{'view':40} {'status':>6} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'peak KB':>9}")
+        for key, row in results.items():
+            self.stdout.write(
+                f"{key:40} {row['status']:>6} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+                f"{row['queries']:>8} {row['peak_kb']:>9}"
+            )
+
+    def compare(self, results, baseline_path, threshold):
+        with open(baseline_path) as fh:
+            baseline = json.load(fh)["results"]
+
+        regressions = []
+        for key, row in results.items():
+            base = baseline.get(key)
+            if not base:
+                continue
+            if row["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(f"{key}: p95 {base['p95_ms']}ms → {row['p95_ms']}ms")
+            if row["queries"] > base["queries"]:
+                regressions.append(f"{key}: queries {base['queries']} → {row['queries']}")
+
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"✅ No regressions against {baseline_path}"))
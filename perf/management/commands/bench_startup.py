@@ -0,0 +1,87 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: boot the WSGI application the way a server
+# worker would, then time the first and second request through it.
+CHILD = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+start = time.perf_counter()
+from config.wsgi import application
+boot = time.perf_counter() - start
+
+def request(path):
+    environ = {"PATH_INFO": path}
+    setup_testing_defaults(environ)
+    status = []
+    start = time.perf_counter()
+    body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+    return (time.perf_counter() - start) * 1000, status[0]
+
+first_ms, status = request(sys.argv[1])
+second_ms, _ = request(sys.argv[1])
+print(json.dumps({"boot_ms": boot * 1000, "first_ms": first_ms, "second_ms": second_ms, "status": status}))
+"""
+
+FIELDS = ("process_ms", "boot_ms", "first_ms", "second_ms")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker cold start (process start, WSGI import) and first-request "
+        "latency, with and without the warm-up hook"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Fresh processes per mode")
+        parser.add_argument("--path", default="/login/", help="Path requested after boot")
+        parser.add_argument("--output", help="Write results to this JSON file")
+
+    def handle(self, *args, **options):
+        results = {}
+        for mode, flag in (("cold", "0"), ("warm-up", "1")):
+            runs = [self.run_child(options["path"], flag) for _ in range(options["runs"])]
+            results[mode] = {
+                field: round(statistics.median(run[field] for run in runs), 1) for field in FIELDS
+            }
+            results[mode]["status"] = runs[-1]["status"]
+
+        self.stdout.write(f"{'mode':10} " + " ".join(f"{field:>11}" for field in FIELDS) + "   status")
+        for mode, row in results.items():
+            self.stdout.write(
+                f"{mode:10} " + " ".join(f"{row[field]:>11}" for field in FIELDS) + f"   {row['status']}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump({"path": options["path"], "runs": options["runs"], "results": results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Results written to {options['output']}"))
+
+    def run_child(self, path, warmup):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE,
+            PERF_WARMUP=warmup,
+        )
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD, path],
+            env=env,
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if proc.returncode:
+            raise CommandError(f"Startup run failed:\n{proc.stderr}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["process_ms"] = elapsed
+        return result
@@ -0,0 +1,120 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from perf.middleware import fingerprint
+from perf.seeding import seed_school, throwaway_caches, view_urls
+
+# EXPLAIN QUERY PLAN details worth a second look.
+FULL_SCAN = "SCAN"
+TEMP_BTREE = "USE TEMP B-TREE"
+
+
+class StatementRecorder:
+    """``execute_wrapper`` hook that keeps each distinct SELECT with its parameters."""
+
+    def __init__(self):
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith("SELECT"):
+            key, _ = fingerprint(sql)
+            self.statements.setdefault(key, (sql, params))
+        return execute(sql, params, many, context)
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def problems(plan):
+    """Plan lines that read a whole table or sort through a temporary B-tree."""
+    flagged = []
+    for detail in plan:
+        # "SCAN t USING [COVERING] INDEX i" walks an index in order; only a bare
+        # "SCAN t" reads every row of the table.
+        if detail.startswith(FULL_SCAN) and " USING " not in detail:
+            flagged.append(detail)
+        elif detail.startswith(TEMP_BTREE):
+            flagged.append(detail)
+    return flagged
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic school in a throwaway database, request every perf view "
+        "as a teacher, HOD and PC, and run EXPLAIN QUERY PLAN on each distinct "
+        "SELECT to flag full table scans and temporary B-trees"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teachers", type=int, default=50)
+        parser.add_argument("--reflections-per-teacher", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--all", action="store_true", help="Print every plan, not only flagged ones")
+        parser.add_argument(
+            "--fail-on-flags",
+            action="store_true",
+            help="Exit with an error if any statement is flagged (for CI)",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("explain_views reads SQLite's EXPLAIN QUERY PLAN output.")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with throwaway_caches():
+                sample = seed_school(
+                    teachers=options["teachers"],
+                    reflections_per_teacher=options["reflections_per_teacher"],
+                    seed=options["seed"],
+                )
+                flagged = self.report(sample, options["all"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS("✅ No full scans or temp B-trees"))
+        elif options["fail_on_flags"]:
+            raise CommandError(f"{flagged} flagged statement(s)")
+        else:
+            self.stdout.write(self.style.WARNING(f"⚠️ {flagged} flagged statement(s)"))
+
+    def report(self, sample, show_all):
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+        urls = [(name, url) for name, url in view_urls(sample) if url]
+        seen, flagged = set(), 0
+        for role, staff in sample["roles"].items():
+            client = Client(raise_request_exception=False)
+            client.force_login(staff.user)
+            for name, url in urls:
+                recorder = StatementRecorder()
+                with connection.execute_wrapper(recorder):
+                    response = client.get(url)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+
+                for key, (sql, params) in recorder.statements.items():
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    plan = explain(sql, params)
+                    issues = problems(plan)
+                    if not (issues or show_all):
+                        continue
+                    flagged += bool(issues)
+                    style = self.style.WARNING if issues else self.style.HTTP_INFO
+                    self.stdout.write(style(f"{role}:{name} [{key}]"))
+                    self.stdout.write(f"  {sql[:400]}")
+                    for detail in plan:
+                        marker = "!" if detail in issues else " "
+                        self.stdout.write(f"  {marker} {detail}")
+        return flagged
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from perf import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard rollup tables from reflections, growth plans and observations"
+
+    def handle(self, *args, **kwargs):
+        departments, components, teachers = rollups.rebuild()
+        rollups.bump_caches()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Rebuilt rollups: {departments} departments, "
+                f"{components} department components, {teachers} teachers"
+            )
+        )
@@ -1,26 +1,53 @@
 # reflections/management/commands/seed_test_data.py
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
-from django.utils import timezone
+from django.db import transaction
 from faker import Faker
 import random
+import time
 
 from accounts.models import CustomUser, Staff, Role, Department
-from perf.models import (
-    AcademicYear,
-    SelfReflection,
-    ReflectionDomain,
-    GrowthPlan,
-    Domain,
-    Component,
-)
+from perf.models import AcademicYear, Domain
+from perf.seeding import seed_reflections, text_pool
 
-fake = Faker()
+IB_DEPARTMENTS = [
+    "Studies in Language and Literature",
+    "Language Acquisition",
+    "Individuals and Societies",
+    "Sciences",
+    "Mathematics",
+    "The Arts",
+    "Physical and Health Education",
+    "Design",
+]
 
 
 class Command(BaseCommand):
     help = "Seed IB test users (teachers, HODs, coordinator, principal) and performance reflection data"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument("--teachers", type=int, default=100, help="Number of teachers to create")
+        parser.add_argument(
+            "--reflections-per-teacher", type=int, default=5, help="Reflections (each with a growth plan) per teacher"
+        )
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data")
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="Rows per bulk insert / transaction chunk"
+        )
+        parser.add_argument("--password", default="password123", help="Password shared by every seeded user")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rng = random.Random(options["seed"])
+        fake = Faker()
+        if options["seed"] is not None:
+            fake.seed_instance(options["seed"])
+        batch_size = options["batch_size"]
+
+        # Hash once: every seeded account shares the same password, and a full
+        # PBKDF2 run per user would dominate seeding time.
+        password = make_password(options["password"])
+
         # === Roles ===
         teacher_role, _ = Role.objects.get_or_create(name="Teacher")
         hod_role, _ = Role.objects.get_or_create(name="Head of Department")
@@ -28,90 +55,96 @@ class Command(BaseCommand):
         principal_role, _ = Role.objects.get_or_create(name="Principal")
 
         # === IB Departments ===
-        departments = []
-        ib_departments = [
-            "Studies in Language and Literature",
-            "Language Acquisition",
-            "Individuals and Societies",
-            "Sciences",
-            "Mathematics",
-            "The Arts",
-            "Physical and Health Education",
-            "Design",
-        ]
-        for dept_name in ib_departments:
-            dept, _ = Department.objects.get_or_create(name=dept_name)
-            departments.append(dept)
+        existing = {d.name: d for d in Department.objects.filter(name__in=IB_DEPARTMENTS)}
+        Department.objects.bulk_create(
+            [Department(name=name) for name in IB_DEPARTMENTS if name not in existing]
+        )
+        departments = list(Department.objects.filter(name__in=IB_DEPARTMENTS))
+
+        # === Staff ===
+        def create_staff(rows):
+            """Bulk-create users and their staff records from (email, staff kwargs) pairs."""
+            for start in range(0, len(rows), batch_size):
+                chunk = rows[start:start + batch_size]
+                with transaction.atomic():
+                    users = CustomUser.objects.bulk_create(
+                        [CustomUser(email=email, password=password) for email, _ in chunk]
+                    )
+                    Staff.objects.bulk_create(
+                        [Staff(user=user, **fields) for user, (_, fields) in zip(users, chunk)]
+                    )
 
-        # === Create Teachers ===
-        teachers = []
         if not Staff.objects.filter(role=teacher_role).exists():
-            for i in range(100):
-                email = f"teacher{i+1}@school.com"
-                user = CustomUser.objects.create_user(email=email, password="password123")
-                staff = Staff.objects.create(
-                    user=user,
-                    fname=fake.first_name(),
-                    mname=fake.first_name() if random.random() > 0.5 else "",
-                    lname=fake.last_name(),
-                    staff_id=f"TCHR{i+1:03d}",
-                    role=teacher_role,
-                    department=random.choice(departments),
-                )
-                teachers.append(staff)
-            self.stdout.write(self.style.SUCCESS("✅ 20 Teachers created"))
+            create_staff(
+                [
+                    (
+                        f"teacher{i+1}@school.com",
+                        dict(
+                            fname=fake.first_name(),
+                            mname=fake.first_name() if rng.random() > 0.5 else "",
+                            lname=fake.last_name(),
+                            staff_id=f"TCHR{i+1:03d}",
+                            role=teacher_role,
+                            department=rng.choice(departments),
+                        ),
+                    )
+                    for i in range(options["teachers"])
+                ]
+            )
+            self.stdout.write(self.style.SUCCESS(f"✅ {options['teachers']} Teachers created"))
         else:
-            teachers = list(Staff.objects.filter(role=teacher_role))
             self.stdout.write(self.style.WARNING("⚠️ Teachers already exist, skipping."))
+        teachers = list(Staff.objects.filter(role=teacher_role))
 
         # === Create HODs for Each Department ===
-        for dept in departments:
-            if not Staff.objects.filter(department=dept, is_hod=True).exists():
-                hod_user = CustomUser.objects.create_user(
-                    email=f"hod_{dept.name.replace(' ', '_').lower()}@test.com",
-                    password="password123",
-                )
-                Staff.objects.create(
-                    user=hod_user,
+        with_hod = set(Staff.objects.filter(is_hod=True).values_list("department_id", flat=True))
+        hods = [
+            (
+                f"hod_{dept.name.replace(' ', '_').lower()}@test.com",
+                dict(
                     fname=fake.first_name(),
                     lname=fake.last_name(),
                     staff_id=f"HOD_{dept.id:03d}",
                     role=hod_role,
                     department=dept,
                     is_hod=True,
-                )
-                self.stdout.write(self.style.SUCCESS(f"✅ HOD created for {dept.name}"))
+                ),
+            )
+            for dept in departments
+            if dept.id not in with_hod
+        ]
+        create_staff(hods)
+        for _, fields in hods:
+            self.stdout.write(self.style.SUCCESS(f"✅ HOD created for {fields['department'].name}"))
 
         # === Coordinator ===
         if not Staff.objects.filter(role=coord_role).exists():
-            coord_user = CustomUser.objects.create_user(
-                email="coordinator@test.com", password="password123"
-            )
-            Staff.objects.create(
-                user=coord_user,
-                fname=fake.first_name(),
-                lname=fake.last_name(),
-                staff_id="COORD001",
-                role=coord_role,
-                department=random.choice(departments),
-                is_pc=True,
-            )
+            create_staff([(
+                "coordinator@test.com",
+                dict(
+                    fname=fake.first_name(),
+                    lname=fake.last_name(),
+                    staff_id="COORD001",
+                    role=coord_role,
+                    department=rng.choice(departments),
+                    is_pc=True,
+                ),
+            )])
             self.stdout.write(self.style.SUCCESS("✅ Coordinator created"))
 
         # === Principal ===
         if not Staff.objects.filter(role=principal_role).exists():
-            prin_user = CustomUser.objects.create_user(
-                email="principal@test.com", password="password123"
-            )
-            Staff.objects.create(
-                user=prin_user,
-                fname=fake.first_name(),
-                lname=fake.last_name(),
-                staff_id="PRIN001",
-                role=principal_role,
-                department=random.choice(departments),
-                is_vp=True,
-            )
+            create_staff([(
+                "principal@test.com",
+                dict(
+                    fname=fake.first_name(),
+                    lname=fake.last_name(),
+                    staff_id="PRIN001",
+                    role=principal_role,
+                    department=rng.choice(departments),
+                    is_vp=True,
+                ),
+            )])
             self.stdout.write(self.style.SUCCESS("✅ Principal created"))
 
         # === Academic Year ===
@@ -120,47 +153,26 @@ class Command(BaseCommand):
         )
 
         # === Domains & Components ===
-        domains = Domain.objects.prefetch_related("components").all()
-        if not domains.exists():
+        domains = [
+            (domain, list(domain.components.all()))
+            for domain in Domain.objects.prefetch_related("components")
+        ]
+        if not domains:
             self.stdout.write(self.style.ERROR("❌ No domains found. Please seed domains/components first."))
             return
 
         # === Reflections & Growth Plans (no observations) ===
-        for teacher in teachers:
-            for r in range(5):  # create 5 reflections for each teacher
-                reflection = SelfReflection.objects.create(teacher=teacher)
-
-                # Attach 2 random domains
-                for domain in random.sample(list(domains), k=min(2, domains.count())):
-                    components = list(domain.components.all())
-                    if not components:
-                        continue
-
-                    strengths = random.sample(components, k=min(2, len(components)))
-                    growths = random.sample(components, k=min(2, len(components)))
-
-                    rd = ReflectionDomain.objects.create(
-                        reflection=reflection,
-                        domain=domain,
-                        next_steps=fake.sentence(),
-                    )
-                    rd.strengths.set(strengths)
-                    rd.growths.set(growths)
-
-                # Growth Plan
-                gp = GrowthPlan.objects.create(
-                    reflection=reflection,
-                    academic_year=year,
-                    goal_statement=fake.paragraph(nb_sentences=2),
-                    indicators_of_success=fake.sentence(),
-                    actions=fake.paragraph(nb_sentences=3),
-                    timelines="One term",
-                    resources=fake.sentence(),
-                    evaluator_name=random.choice(["HOD Smith", "Coordinator Jane", "Principal Lee"]),
-                    date=timezone.now().date(),
-                )
-                gp.components_addressed.set(
-                    random.sample(list(Component.objects.all()), k=min(3, Component.objects.count()))
-                )
-
-        self.stdout.write(self.style.SUCCESS("🎉 IB Staff, 5 reflections + growth plans per teacher seeded (no observations)!"))
+        total = seed_reflections(
+            teachers,
+            domains,
+            year,
+            options["reflections_per_teacher"],
+            rng,
+            text_pool(fake),
+            batch_size=batch_size,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🎉 IB Staff, {total} reflections + growth plans seeded (no observations) "
+            f"in {time.perf_counter() - started:.1f}s!"
+        ))
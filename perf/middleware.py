@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("perf.sql")
+
+DEFAULTS = {
+    # Off unless turned on in settings (the default settings follow DEBUG).
+    "ENABLED": False,
+    # Requests slower than this are always logged.
+    "SLOW_REQUEST_MS": 500,
+    # The same statement run this many times in one request is reported as N+1.
+    "DUPLICATE_THRESHOLD": 3,
+    # Log every request, not only slow ones and ones with duplicates.
+    "LOG_ALL": False,
+    # Server-Timing headers are visible to every client, anonymous ones included.
+    "SERVER_TIMING": False,
+}
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "PERF_SQL_INSTRUMENTATION", {})}
+
+
+def fingerprint(sql):
+    """Normalise a statement so repeats that differ only in parameters match."""
+    sql = _WHITESPACE.sub(" ", _IN_LIST.sub("IN (...)", sql)).strip()
+    return hashlib.md5(sql.encode(), usedforsecurity=False).hexdigest()[:12], sql
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` hook that times every statement.
+
+    Works with ``DEBUG=False``: nothing is read from ``connection.queries``.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+            key, normalised = fingerprint(sql)
+            entry = self.statements.setdefault(key, {"sql": normalised, "count": 0})
+            entry["count"] += 1
+
+    def duplicates(self, threshold):
+        return sorted(
+            (
+                {"fingerprint": key, "count": entry["count"], "sql": entry["sql"][:300]}
+                for key, entry in self.statements.items()
+                if entry["count"] >= threshold
+            ),
+            key=lambda item: -item["count"],
+        )
+
+
+class QueryInstrumentationMiddleware:
+    """Report per-request query count, DB time and repeated statements.
+
+    Figures are added as ``Server-Timing`` headers and, for slow requests or
+    requests with N+1 patterns, written as one JSON line to the ``perf.sql``
+    logger (a rotating file in the default settings).
+
+    A streaming response's headers go out before its body is generated, so
+    its ``Server-Timing`` covers the view alone; the log line is written once
+    the body has been consumed and includes the queries made while streaming.
+    Async streaming bodies are not measured.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = get_config()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with recording(recorder):
+            response = self.get_response(request)
+
+        if self.config["SERVER_TIMING"]:
+            self.add_server_timing(response, recorder, start)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.record_stream(
+                response.streaming_content, request, response, recorder, start
+            )
+        else:
+            self.log(request, response, recorder, start)
+        return response
+
+    def record_stream(self, content, request, response, recorder, start):
+        # Wrap each chunk separately: the server interleaves other work between them.
+        try:
+            while True:
+                with recording(recorder):
+                    chunk = next(content, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self.log(request, response, recorder, start)
+
+    def add_server_timing(self, response, recorder, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.duration * 1000
+        timings = [
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries"',
+            f"app;dur={total_ms - db_ms:.1f}",
+        ]
+        duplicates = recorder.duplicates(self.config["DUPLICATE_THRESHOLD"])
+        if duplicates:
+            timings.append(f'dup;desc="{len(duplicates)} repeated statements"')
+        existing = response.get("Server-Timing")
+        response["Server-Timing"] = ", ".join(([existing] if existing else []) + timings)
+
+    def log(self, request, response, recorder, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        duplicates = recorder.duplicates(self.config["DUPLICATE_THRESHOLD"])
+        slow = total_ms >= self.config["SLOW_REQUEST_MS"]
+        if slow or duplicates or self.config["LOG_ALL"]:
+            logger.info(
+                json.dumps(
+                    {
+                        "ts": time.time(),
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "duration_ms": round(total_ms, 1),
+                        "db_ms": round(recorder.duration * 1000, 1),
+                        "queries": recorder.count,
+                        "slow": slow,
+                        "duplicates": duplicates,
+                    }
+                )
+            )
+
+
+@contextmanager
+def recording(recorder):
+    """Route every connection's statements through ``recorder`` for the block."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('perf', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DepartmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reflection_count', models.IntegerField(default=0)),
+                ('teachers_with_reflections', models.IntegerField(default=0)),
+                ('growth_plan_count', models.IntegerField(default=0)),
+                ('observed_plan_count', models.IntegerField(default=0)),
+                ('department', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rollup', to='accounts.department')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TeacherRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reflection_count', models.IntegerField(default=0)),
+                ('growth_plan_count', models.IntegerField(default=0)),
+                ('observed_plan_count', models.IntegerField(default=0)),
+                ('teacher', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rollup', to='accounts.staff')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ComponentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('strength_count', models.IntegerField(default=0)),
+                ('growth_count', models.IntegerField(default=0)),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='perf.component')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='component_rollups', to='accounts.department')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('department', 'component'), name='unique_component_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:22
+
+from django.db import migrations, models
+
+# Auto-created m2m through tables have no Meta to declare indexes on. These
+# lead with component_id and cover the owner column, so "rows for component X"
+# lookups never touch the table itself.
+THROUGH_INDEXES = [
+    ("perf_reflectiondomain_strengths", "reflectiondomain_id", "rd_strengths_component"),
+    ("perf_reflectiondomain_growths", "reflectiondomain_id", "rd_growths_component"),
+    ("perf_growthplan_components_addressed", "growthplan_id", "gp_components_component"),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('perf', '0002_dashboard_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='academicyear',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['is_active'], name='academicyear_active'),
+        ),
+        migrations.AddIndex(
+            model_name='selfreflection',
+            index=models.Index(fields=['teacher', '-date_created', '-id'], name='reflection_teacher_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='selfreflection',
+            index=models.Index(fields=['-date_created', '-id'], name='reflection_recent'),
+        ),
+    ] + [
+        migrations.RunSQL(
+            f'CREATE INDEX "{name}" ON "{table}" ("component_id", "{owner}")',
+            f'DROP INDEX "{name}"',
+        )
+        for table, owner, name in THROUGH_INDEXES
+    ]
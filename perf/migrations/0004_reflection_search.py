@@ -0,0 +1,102 @@
+"""FTS5 full-text index over reflection text (see perf/search.py).
+
+One row per reflection domain (next steps), growth plan (goal, indicators,
+actions) and observation (comments), plus the teacher's name. Triggers keep it
+in sync, so bulk inserts and raw SQL writes are indexed too. The rowid encodes
+the source row as ``id * 4 + kind`` so triggers update by rowid, never by scan.
+"""
+from django.db import migrations
+
+TEACHER_NAME = "trim(s.fname || ' ' || coalesce(s.mname || ' ', '') || s.lname)"
+
+# kind: (source table, body expression, the row's reflection id, watched columns)
+SOURCES = {
+    1: (
+        "perf_reflectiondomain",
+        "coalesce({row}.next_steps, '')",
+        "{row}.reflection_id",
+        ("next_steps",),
+    ),
+    2: (
+        "perf_growthplan",
+        "{row}.goal_statement || char(10) || {row}.indicators_of_success || char(10) || {row}.actions",
+        "{row}.reflection_id",
+        ("goal_statement", "indicators_of_success", "actions"),
+    ),
+    3: (
+        "perf_observation",
+        "coalesce({row}.hod_comment, '') || char(10) || coalesce({row}.coordinator_comment, '')"
+        " || char(10) || coalesce({row}.prin_comment, '')",
+        "(SELECT g.reflection_id FROM perf_growthplan g WHERE g.id = {row}.growth_plan_id)",
+        ("hod_comment", "coordinator_comment", "prin_comment"),
+    ),
+}
+
+
+def insert_sql(kind, row):
+    """Index ``row`` (``new`` in a trigger, or every row of the table when ``src``)."""
+    table, body, reflection, _ = SOURCES[kind]
+    source = f"{table} src, " if row == "src" else ""
+    return (
+        "INSERT INTO perf_search(rowid, teacher, body, reflection_id, teacher_id) "
+        f"SELECT {row}.id * 4 + {kind}, {TEACHER_NAME}, {body.format(row=row)}, r.id, s.id "
+        f"FROM {source}perf_selfreflection r JOIN accounts_staff s ON s.id = r.teacher_id "
+        f"WHERE r.id = {reflection.format(row=row)}"
+    )
+
+
+def forward_sql():
+    statements = [
+        "CREATE VIRTUAL TABLE perf_search USING fts5("
+        "teacher, body, reflection_id UNINDEXED, teacher_id UNINDEXED, "
+        "tokenize = 'porter unicode61')"
+    ]
+    for kind, (table, body, _, columns) in SOURCES.items():
+        name = f"perf_search_{table.split('_', 1)[1]}"
+        statements += [
+            f"CREATE TRIGGER {name}_ai AFTER INSERT ON {table} BEGIN "
+            f"{insert_sql(kind, 'new')}; END",
+            f"CREATE TRIGGER {name}_au AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN "
+            f"UPDATE perf_search SET body = {body.format(row='new')} WHERE rowid = new.id * 4 + {kind}; END",
+            f"CREATE TRIGGER {name}_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM perf_search WHERE rowid = old.id * 4 + {kind}; END",
+            insert_sql(kind, "src"),
+        ]
+    statements.append(
+        "CREATE TRIGGER perf_search_staff_au AFTER UPDATE OF fname, mname, lname ON accounts_staff BEGIN "
+        f"UPDATE perf_search SET teacher = {TEACHER_NAME.replace('s.', 'new.')} WHERE teacher_id = new.id; END"
+    )
+    return statements
+
+
+BACKWARD_SQL = [
+    *(
+        f"DROP TRIGGER IF EXISTS perf_search_{table.split('_', 1)[1]}_{suffix}"
+        for table, *_ in SOURCES.values()
+        for suffix in ("ai", "au", "ad")
+    ),
+    "DROP TRIGGER IF EXISTS perf_search_staff_au",
+    "DROP TABLE IF EXISTS perf_search",
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("perf", "0003_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(forward_sql()), run(BACKWARD_SQL)),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('perf', '0004_reflection_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherrollup',
+            name='growth_counts',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='teacherrollup',
+            name='last_activity',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='teacherrollup',
+            name='latest_plan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='perf.growthplan'),
+        ),
+        migrations.AddField(
+            model_name='teacherrollup',
+            name='latest_plan_observed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='teacherrollup',
+            name='latest_reflection',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='teacherrollup',
+            name='strength_counts',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
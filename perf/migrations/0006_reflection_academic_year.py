@@ -0,0 +1,260 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:05
+
+from datetime import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from perf.migrations._search_triggers import CREATE_INSERT_TRIGGERS, DROP_INSERT_TRIGGERS, run
+
+
+def start_of(start_year):
+    month = getattr(settings, "PERF_ACADEMIC_YEAR_START_MONTH", 9)
+    moment = datetime(start_year, month, 1)
+    return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+
+def backfill_academic_year(apps, schema_editor):
+    """File each existing reflection under the academic year its date falls in."""
+    AcademicYear = apps.get_model("perf", "AcademicYear")
+    SelfReflection = apps.get_model("perf", "SelfReflection")
+
+    span = SelfReflection.objects.aggregate(first=Min("date_created"), last=Max("date_created"))
+    if span["first"] is None:
+        return
+    month = getattr(settings, "PERF_ACADEMIC_YEAR_START_MONTH", 9)
+    first, last = (
+        moment.year if moment.month >= month else moment.year - 1
+        for moment in (span["first"], span["last"])
+    )
+    for start_year in range(first, last + 1):
+        rows = SelfReflection.objects.filter(
+            date_created__gte=start_of(start_year), date_created__lt=start_of(start_year + 1)
+        )
+        if not rows.exists():
+            continue
+        year = AcademicYear.objects.filter(start_year=start_year).order_by("end_year").first()
+        if year is None:
+            year = AcademicYear.objects.create(start_year=start_year, end_year=start_year + 1)
+        rows.update(academic_year=year)
+
+
+def clear_department_rollups(apps, schema_editor):
+    # Department and component counters are re-keyed by academic year;
+    # rebuild_rollups below refills them once the new columns exist.
+    apps.get_model("perf", "DepartmentRollup").objects.all().delete()
+    apps.get_model("perf", "ComponentRollup").objects.all().delete()
+
+
+def rebuild_rollups(apps, schema_editor):
+    """Refill the per-year counters, as ``perf.rollups.rebuild`` does."""
+    SelfReflection = apps.get_model("perf", "SelfReflection")
+    GrowthPlan = apps.get_model("perf", "GrowthPlan")
+    ReflectionDomain = apps.get_model("perf", "ReflectionDomain")
+    DepartmentRollup = apps.get_model("perf", "DepartmentRollup")
+    ComponentRollup = apps.get_model("perf", "ComponentRollup")
+    TeacherYearRollup = apps.get_model("perf", "TeacherYearRollup")
+
+    departments = {}
+
+    def department(department_id, year_id):
+        return departments.setdefault(
+            (department_id, year_id),
+            DepartmentRollup(department_id=department_id, academic_year_id=year_id),
+        )
+
+    for row in (
+        SelfReflection.objects.filter(teacher__is_active=True)
+        .values("teacher__department_id", "academic_year_id")
+        .annotate(total=Count("id"), teachers=Count("teacher", distinct=True))
+    ):
+        rollup = department(row["teacher__department_id"], row["academic_year_id"])
+        rollup.reflection_count = row["total"]
+        rollup.teachers_with_reflections = row["teachers"]
+    for row in (
+        GrowthPlan.objects.filter(reflection__teacher__is_active=True)
+        .values("reflection__teacher__department_id", "reflection__academic_year_id")
+        .annotate(total=Count("id"), observed=Count("observation"))
+    ):
+        rollup = department(row["reflection__teacher__department_id"], row["reflection__academic_year_id"])
+        rollup.growth_plan_count = row["total"]
+        rollup.observed_plan_count = row["observed"]
+    DepartmentRollup.objects.bulk_create(departments.values())
+
+    components = {}
+    for field, link in (
+        ("strength_count", ReflectionDomain.strengths.through),
+        ("growth_count", ReflectionDomain.growths.through),
+    ):
+        for row in (
+            link.objects.filter(reflectiondomain__reflection__teacher__is_active=True)
+            .values(
+                "reflectiondomain__reflection__teacher__department_id",
+                "reflectiondomain__reflection__academic_year_id",
+                "component_id",
+            )
+            .annotate(total=Count("id"))
+        ):
+            key = (
+                row["reflectiondomain__reflection__teacher__department_id"],
+                row["reflectiondomain__reflection__academic_year_id"],
+                row["component_id"],
+            )
+            rollup = components.setdefault(
+                key, ComponentRollup(department_id=key[0], academic_year_id=key[1], component_id=key[2])
+            )
+            setattr(rollup, field, row["total"])
+    ComponentRollup.objects.bulk_create(components.values(), batch_size=500)
+
+    TeacherYearRollup.objects.bulk_create(
+        (
+            TeacherYearRollup(
+                teacher_id=row["teacher_id"],
+                academic_year_id=row["academic_year_id"],
+                reflection_count=row["total"],
+            )
+            for row in SelfReflection.objects.values("teacher_id", "academic_year_id").annotate(
+                total=Count("id")
+            )
+        ),
+        batch_size=500,
+    )
+
+
+def rebuild_teacher_rollups(apps, schema_editor):
+    """Refill the per-teacher summaries, as ``perf.rollups.rebuild_teachers`` does."""
+    SelfReflection = apps.get_model("perf", "SelfReflection")
+    GrowthPlan = apps.get_model("perf", "GrowthPlan")
+    Observation = apps.get_model("perf", "Observation")
+    ReflectionDomain = apps.get_model("perf", "ReflectionDomain")
+    TeacherRollup = apps.get_model("perf", "TeacherRollup")
+
+    TeacherRollup.objects.all().delete()
+
+    teachers = {}
+
+    def teacher(teacher_id):
+        return teachers.setdefault(teacher_id, TeacherRollup(teacher_id=teacher_id))
+
+    for row in SelfReflection.objects.values("teacher_id").annotate(
+        total=Count("id"), latest=Max("date_created")
+    ):
+        rollup = teacher(row["teacher_id"])
+        rollup.reflection_count = row["total"]
+        rollup.latest_reflection = rollup.last_activity = row["latest"]
+
+    latest_plans = GrowthPlan.objects.values("reflection__teacher_id").annotate(latest=Max("id"))
+    for row in latest_plans.annotate(total=Count("id"), observed=Count("observation")):
+        rollup = teacher(row["reflection__teacher_id"])
+        rollup.growth_plan_count = row["total"]
+        rollup.observed_plan_count = row["observed"]
+        rollup.latest_plan_id = row["latest"]
+
+    observed = set(
+        Observation.objects.filter(growth_plan__in=latest_plans.values("latest"))
+        .values_list("growth_plan_id", flat=True)
+    )
+    for rollup in teachers.values():
+        rollup.latest_plan_observed = rollup.latest_plan_id in observed
+
+    for row in Observation.objects.values("growth_plan__reflection__teacher_id").annotate(
+        latest=Max("last_updated")
+    ):
+        rollup = teacher(row["growth_plan__reflection__teacher_id"])
+        if rollup.last_activity is None or row["latest"] > rollup.last_activity:
+            rollup.last_activity = row["latest"]
+
+    for field, link in (
+        ("strength_counts", ReflectionDomain.strengths.through),
+        ("growth_counts", ReflectionDomain.growths.through),
+    ):
+        for row in link.objects.values(
+            "reflectiondomain__reflection__teacher_id", "component_id"
+        ).annotate(total=Count("id")):
+            rollup = teacher(row["reflectiondomain__reflection__teacher_id"])
+            getattr(rollup, field)[str(row["component_id"])] = row["total"]
+
+    TeacherRollup.objects.bulk_create(teachers.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('perf', '0005_teacher_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(DROP_INSERT_TRIGGERS), run(CREATE_INSERT_TRIGGERS)),
+        migrations.AddField(
+            model_name='selfreflection',
+            name='academic_year',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reflections', to='perf.academicyear'),
+        ),
+        migrations.RunPython(backfill_academic_year, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='selfreflection',
+            name='academic_year',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reflections', to='perf.academicyear'),
+        ),
+        migrations.RunPython(run(CREATE_INSERT_TRIGGERS), run(DROP_INSERT_TRIGGERS)),
+        migrations.RemoveIndex(
+            model_name='selfreflection',
+            name='reflection_recent',
+        ),
+        migrations.AddIndex(
+            model_name='selfreflection',
+            index=models.Index(fields=['academic_year', '-date_created', '-id'], name='reflection_year_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='selfreflection',
+            index=models.Index(fields=['academic_year', 'teacher', '-date_created', '-id'], name='reflection_year_teacher'),
+        ),
+        migrations.RunPython(clear_department_rollups, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='departmentrollup',
+            name='department',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='accounts.department'),
+        ),
+        migrations.AddField(
+            model_name='departmentrollup',
+            name='academic_year',
+            field=models.ForeignKey(default=None, on_delete=django.db.models.deletion.CASCADE, related_name='department_rollups', to='perf.academicyear'),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name='departmentrollup',
+            constraint=models.UniqueConstraint(fields=('academic_year', 'department'), name='unique_department_rollup'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='componentrollup',
+            name='unique_component_rollup',
+        ),
+        migrations.AddField(
+            model_name='componentrollup',
+            name='academic_year',
+            field=models.ForeignKey(default=None, on_delete=django.db.models.deletion.CASCADE, related_name='component_rollups', to='perf.academicyear'),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name='componentrollup',
+            constraint=models.UniqueConstraint(fields=('academic_year', 'department', 'component'), name='unique_component_rollup'),
+        ),
+        migrations.CreateModel(
+            name='TeacherYearRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reflection_count', models.IntegerField(default=0)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teacher_rollups', to='perf.academicyear')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='year_rollups', to='accounts.staff')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('academic_year', 'teacher'), name='unique_teacher_year_rollup')],
+            },
+        ),
+        migrations.RunPython(rebuild_rollups, migrations.RunPython.noop),
+        migrations.RunPython(rebuild_teacher_rollups, migrations.RunPython.noop),
+    ]
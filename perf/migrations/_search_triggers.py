@@ -0,0 +1,27 @@
+"""Insert triggers of the search index (0004), for migrations that rebuild tables.
+
+SQLite remakes a table to change a column's nullability, and will not while
+the index's insert triggers read from it, so such migrations drop the triggers
+first and recreate them afterwards. The migration loader skips modules whose
+names start with an underscore, so this one is not a migration itself.
+"""
+import importlib
+
+search = importlib.import_module("perf.migrations.0004_reflection_search")
+
+
+def trigger_name(table):
+    return f"perf_search_{table.split('_', 1)[1]}_ai"
+
+
+DROP_INSERT_TRIGGERS = [
+    f"DROP TRIGGER IF EXISTS {trigger_name(table)}" for table, *_ in search.SOURCES.values()
+]
+
+CREATE_INSERT_TRIGGERS = [
+    f"CREATE TRIGGER {trigger_name(table)} AFTER INSERT ON {table} BEGIN "
+    f"{search.insert_sql(kind, 'new')}; END"
+    for kind, (table, *_) in search.SOURCES.items()
+]
+
+run = search.run
@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from accounts.models import Staff as Teacher
-from accounts.models import Role
+from accounts.models import Role, Department
+from accounts.access import Access, DEPARTMENT, SCHOOL, OWN
 
 
 class AcademicYear(models.Model):
@@ -12,6 +14,21 @@ class AcademicYear(models.Model):
     class Meta:
         ordering = ["-start_year"]
         unique_together = ("start_year", "end_year")
+        indexes = [
+            # get_active_year(): only the one active row is indexed.
+            models.Index(
+                fields=["is_active"],
+                condition=models.Q(is_active=True),
+                name="academicyear_active",
+            ),
+        ]
+
+    @staticmethod
+    def start_year_for(moment):
+        """Start year of the academic year ``moment`` falls in."""
+        if moment.month >= settings.PERF_ACADEMIC_YEAR_START_MONTH:
+            return moment.year
+        return moment.year - 1
 
     def __str__(self):
         if self.is_active:
@@ -37,12 +54,90 @@ class Component(models.Model):
         return f"{self.domain.name} - {self.name}"
 
 
+# === Role scoping ===
+
+
+class ScopedQuerySet(models.QuerySet):
+    """Rows scoped through the teacher who owns them.
+
+    Each scope is a filter on ``teacher_path``: the teacher's id, or one join
+    to the teacher's department. Nothing is materialised into an ``IN`` list.
+    """
+
+    teacher_path = "teacher"
+    # Rows are filed under their reflection's academic year.
+    year_path = "academic_year"
+
+    def for_teacher(self, teacher):
+        return self.filter(**{f"{self.teacher_path}_id": getattr(teacher, "pk", teacher)})
+
+    def for_department(self, department):
+        return self.filter(
+            **{f"{self.teacher_path}__department_id": getattr(department, "pk", department)}
+        )
+
+    def for_year(self, year):
+        """Rows of one academic year; ``None`` leaves them unfiltered."""
+        if year is None:
+            return self
+        return self.filter(**{f"{self.year_path}_id": getattr(year, "pk", year)})
+
+    def visible_to(self, staff):
+        """What ``staff`` may read: HOD → department, PC/VP → school, else their own."""
+        scope = Access(staff).scope
+        if scope == DEPARTMENT:
+            return self.for_department(staff.department_id)
+        if scope == SCHOOL:
+            return self.all()
+        if scope == OWN:
+            return self.for_teacher(staff)
+        return self.none()
+
+
+class ReflectionQuerySet(ScopedQuerySet):
+    teacher_path = "teacher"
+
+
+class ReflectionPartQuerySet(ScopedQuerySet):
+    teacher_path = "reflection__teacher"
+    year_path = "reflection__academic_year"
+
+
+class ObservationQuerySet(ScopedQuerySet):
+    teacher_path = "growth_plan__reflection__teacher"
+    year_path = "growth_plan__reflection__academic_year"
+
+
 class SelfReflection(models.Model):
     teacher = models.ForeignKey(
         Teacher, on_delete=models.CASCADE, related_name="reflections"
     )
+    academic_year = models.ForeignKey(
+        AcademicYear, on_delete=models.CASCADE, related_name="reflections"
+    )
     date_created = models.DateTimeField(auto_now_add=True)
 
+    objects = ReflectionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # One year's reflections, newest first (lists, keyset pagination).
+            models.Index(
+                fields=["academic_year", "-date_created", "-id"],
+                name="reflection_year_recent",
+            ),
+            # A teacher's reflections within a year (dashboards, completion).
+            models.Index(
+                fields=["academic_year", "teacher", "-date_created", "-id"],
+                name="reflection_year_teacher",
+            ),
+            # A teacher's whole history, newest first (profile page).
+            models.Index(
+                fields=["teacher", "-date_created", "-id"],
+                name="reflection_teacher_recent",
+            ),
+        ]
+
     def __str__(self):
         return f"Reflection - {self.teacher}"
 
@@ -62,6 +157,8 @@ class ReflectionDomain(models.Model):
     )
     next_steps = models.TextField(blank=True, null=True)
 
+    objects = ReflectionPartQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -89,6 +186,8 @@ class GrowthPlan(models.Model):
     evaluator_name = models.CharField(max_length=200)
     date = models.DateField()
 
+    objects = ReflectionPartQuerySet.as_manager()
+
     def __str__(self):
         return f"Growth Plan ({self.reflection.teacher} - {self.goal_statement[:30]})"
 
@@ -105,5 +204,118 @@ class Observation(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
 
+    objects = ObservationQuerySet.as_manager()
+
     def __str__(self):
         return f"Observation for {self.growth_plan}"
+
+
+# === Dashboard rollups ===
+# Counters kept current by perf.signals and rebuilt by `manage.py rebuild_rollups`.
+# Department and component counters are kept per academic year (the year of
+# the reflection a row counts).
+
+
+class DepartmentRollup(models.Model):
+    """Precomputed dashboard totals for one department in one academic year."""
+
+    department = models.ForeignKey(
+        Department, on_delete=models.CASCADE, related_name="rollups"
+    )
+    academic_year = models.ForeignKey(
+        AcademicYear, on_delete=models.CASCADE, related_name="department_rollups"
+    )
+    reflection_count = models.IntegerField(default=0)
+    teachers_with_reflections = models.IntegerField(default=0)
+    growth_plan_count = models.IntegerField(default=0)
+    observed_plan_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["academic_year", "department"], name="unique_department_rollup"
+            )
+        ]
+
+    def __str__(self):
+        return f"Rollup - {self.department}"
+
+
+class ComponentRollup(models.Model):
+    """How often a component was picked as a strength/growth within a department."""
+
+    department = models.ForeignKey(
+        Department, on_delete=models.CASCADE, related_name="component_rollups"
+    )
+    component = models.ForeignKey(
+        Component, on_delete=models.CASCADE, related_name="rollups"
+    )
+    academic_year = models.ForeignKey(
+        AcademicYear, on_delete=models.CASCADE, related_name="component_rollups"
+    )
+    strength_count = models.IntegerField(default=0)
+    growth_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["academic_year", "department", "component"],
+                name="unique_component_rollup",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.department} - {self.component}"
+
+
+class TeacherYearRollup(models.Model):
+    """A teacher's reflections in one academic year, behind the completion figure."""
+
+    teacher = models.ForeignKey(
+        Teacher, on_delete=models.CASCADE, related_name="year_rollups"
+    )
+    academic_year = models.ForeignKey(
+        AcademicYear, on_delete=models.CASCADE, related_name="teacher_rollups"
+    )
+    reflection_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["academic_year", "teacher"], name="unique_teacher_year_rollup"
+            )
+        ]
+
+    def __str__(self):
+        return f"Rollup - {self.teacher} ({self.academic_year})"
+
+
+class TeacherRollup(models.Model):
+    """Per-teacher profile summary, across every academic year."""
+
+    teacher = models.OneToOneField(
+        Teacher, on_delete=models.CASCADE, related_name="rollup"
+    )
+    reflection_count = models.IntegerField(default=0)
+    growth_plan_count = models.IntegerField(default=0)
+    observed_plan_count = models.IntegerField(default=0)
+    # Times each component was picked, keyed by component id (as a string).
+    strength_counts = models.JSONField(default=dict, blank=True)
+    growth_counts = models.JSONField(default=dict, blank=True)
+    latest_reflection = models.DateTimeField(null=True, blank=True)
+    last_activity = models.DateTimeField(null=True, blank=True)
+    latest_plan = models.ForeignKey(
+        "GrowthPlan", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    latest_plan_observed = models.BooleanField(default=False)
+
+    @property
+    def has_reflection(self):
+        return self.reflection_count > 0
+
+    @property
+    def pending_plan_count(self):
+        return self.growth_plan_count - self.observed_plan_count
+
+    def __str__(self):
+        return f"Rollup - {self.teacher}"
@@ -0,0 +1,403 @@
+"""Incrementally maintained dashboard counters.
+
+The signal handlers in ``perf.signals`` call the ``bump_*`` helpers on every
+write; ``rebuild`` recomputes everything from the raw tables and backs the
+``rebuild_rollups`` management command. ``rebuild_teachers`` does the same for
+the per-teacher summaries alone (``backfill_teacher_summaries``). Both commands
+call ``bump_caches`` afterwards so cached dashboards pick up the new numbers.
+
+Department and component counters only cover active teachers, filed under
+their current department, so completion compares like with like against the
+active staff count. ``move_teacher`` shifts a teacher's share when either
+changes.
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from accounts.models import Department, Staff as Teacher
+from . import caching
+from .models import (
+    SelfReflection,
+    ReflectionDomain,
+    GrowthPlan,
+    Observation,
+    DepartmentRollup,
+    ComponentRollup,
+    TeacherRollup,
+    TeacherYearRollup,
+)
+
+
+def _bump(model, lookup, deltas):
+    """Add ``deltas`` to the row matching ``lookup``, creating it if missing."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas or None in lookup.values():
+        return
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    if all(delta < 0 for delta in deltas.values()):
+        # Nothing to take away from; the owner is most likely being deleted.
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{f: max(d, 0) for f, d in deltas.items()})
+    except IntegrityError:
+        # Created concurrently between our update and insert.
+        model.objects.filter(**lookup).update(**updates)
+
+
+def department_key(department_id, is_active):
+    """Department a teacher's work is counted under; ``None`` (nowhere) when inactive."""
+    return department_id if is_active else None
+
+
+def bump_department(department_id, year_id, **deltas):
+    _bump(DepartmentRollup, {"department_id": department_id, "academic_year_id": year_id}, deltas)
+
+
+def bump_teacher(teacher_id, department_id, year_id, **deltas):
+    """Update a teacher's counters, keeping the department's completion count in step."""
+    _bump(TeacherRollup, {"teacher_id": teacher_id}, deltas)
+    change = deltas.get("reflection_count")
+    if not change:
+        return
+    lookup = {"teacher_id": teacher_id, "academic_year_id": year_id}
+    _bump(TeacherYearRollup, lookup, {"reflection_count": change})
+    count = (
+        TeacherYearRollup.objects.filter(**lookup)
+        .values_list("reflection_count", flat=True)
+        .first()
+    )
+    # Only the 0 -> n and n -> 0 transitions within a year change the completion figure.
+    if change > 0 and count == change:
+        bump_department(department_id, year_id, teachers_with_reflections=1)
+    elif change < 0 and count == 0:
+        bump_department(department_id, year_id, teachers_with_reflections=-1)
+
+
+def bump_components(keys, field, delta):
+    """Adjust ``field`` for each ``(department_id, year_id, component_id)`` key.
+
+    Costs one SELECT, one UPDATE per distinct repeat count and at most one
+    INSERT per department and year, however many components are involved.
+    """
+    by_department = defaultdict(Counter)
+    for department_id, year_id, component_id in keys:
+        if department_id is not None and year_id is not None:
+            by_department[department_id, year_id][component_id] += 1
+
+    for (department_id, year_id), counts in by_department.items():
+        rows = ComponentRollup.objects.filter(
+            academic_year_id=year_id, department_id=department_id, component_id__in=list(counts)
+        )
+        existing = set(rows.values_list("component_id", flat=True))
+
+        by_times = defaultdict(list)
+        for component_id, times in counts.items():
+            if component_id in existing:
+                by_times[times].append(component_id)
+        for times, component_ids in by_times.items():
+            rows.filter(component_id__in=component_ids).update(
+                **{field: F(field) + delta * times}
+            )
+
+        missing = [component_id for component_id in counts if component_id not in existing]
+        if delta < 0 or not missing:
+            continue
+        try:
+            with transaction.atomic():
+                ComponentRollup.objects.bulk_create(
+                    ComponentRollup(
+                        department_id=department_id,
+                        academic_year_id=year_id,
+                        component_id=component_id,
+                        **{field: delta * counts[component_id]},
+                    )
+                    for component_id in missing
+                )
+        except IntegrityError:
+            # Another writer created some of them first; fall back to row by row.
+            for component_id in missing:
+                _bump(
+                    ComponentRollup,
+                    {
+                        "department_id": department_id,
+                        "academic_year_id": year_id,
+                        "component_id": component_id,
+                    },
+                    {field: delta * counts[component_id]},
+                )
+
+
+def move_teacher(teacher_id, old_department_id, new_department_id):
+    """Move a teacher's share of the department and component counters.
+
+    Either department may be ``None`` (see ``department_key``), so the same
+    call covers transfers, deactivation and reactivation.
+    """
+    if old_department_id == new_department_id:
+        return
+    years = defaultdict(Counter)
+    for row in (
+        SelfReflection.objects.filter(teacher_id=teacher_id)
+        .values("academic_year_id")
+        .annotate(total=Count("id"))
+    ):
+        years[row["academic_year_id"]].update(
+            reflection_count=row["total"], teachers_with_reflections=1
+        )
+    for row in (
+        GrowthPlan.objects.filter(reflection__teacher_id=teacher_id)
+        .values("reflection__academic_year_id")
+        .annotate(total=Count("id"), observed=Count("observation"))
+    ):
+        years[row["reflection__academic_year_id"]].update(
+            growth_plan_count=row["total"], observed_plan_count=row["observed"]
+        )
+    for year_id, deltas in years.items():
+        bump_department(old_department_id, year_id, **{f: -d for f, d in deltas.items()})
+        bump_department(new_department_id, year_id, **deltas)
+
+    for field, link in (
+        ("strength_count", ReflectionDomain.strengths.through),
+        ("growth_count", ReflectionDomain.growths.through),
+    ):
+        counts = Counter()
+        for row in (
+            link.objects.filter(reflectiondomain__reflection__teacher_id=teacher_id)
+            .values("reflectiondomain__reflection__academic_year_id", "component_id")
+            .annotate(total=Count("id"))
+        ):
+            counts[row["reflectiondomain__reflection__academic_year_id"], row["component_id"]] = row["total"]
+        for department_id, delta in ((old_department_id, -1), (new_department_id, 1)):
+            keys = Counter({(department_id, *key): total for key, total in counts.items()})
+            bump_components(keys.elements(), field, delta)
+
+
+# === Teacher summaries ===
+
+# Component vector on TeacherRollup for each ComponentRollup counter.
+VECTOR_FIELDS = {"strength_count": "strength_counts", "growth_count": "growth_counts"}
+
+
+def update_teacher(teacher_id, create=True, **values):
+    """Overwrite summary fields on a teacher's row, creating it if asked to.
+
+    Delete paths pass ``create=False``: the teacher may be going too.
+    """
+    if teacher_id is None:
+        return
+    if TeacherRollup.objects.filter(teacher_id=teacher_id).update(**values) or not create:
+        return
+    try:
+        with transaction.atomic():
+            TeacherRollup.objects.create(teacher_id=teacher_id, **values)
+    except IntegrityError:
+        TeacherRollup.objects.filter(teacher_id=teacher_id).update(**values)
+
+
+def touch_teacher(teacher_id, **values):
+    update_teacher(teacher_id, create=False, last_activity=timezone.now(), **values)
+
+
+def bump_teacher_components(teacher_id, field, counts):
+    """Add ``counts`` ({component_id: delta}) to a teacher's component vector.
+
+    ``field`` is the ComponentRollup counter name, as passed to ``bump_components``.
+    """
+    counts = {component_id: delta for component_id, delta in counts.items() if delta}
+    if teacher_id is None or not counts:
+        return
+    field = VECTOR_FIELDS[field]
+    positive = any(delta > 0 for delta in counts.values())
+    with transaction.atomic():
+        rollup = TeacherRollup.objects.select_for_update().filter(teacher_id=teacher_id).first()
+        if rollup is None:
+            if not positive:
+                return
+            update_teacher(teacher_id, last_activity=timezone.now())
+            rollup = TeacherRollup.objects.select_for_update().get(teacher_id=teacher_id)
+        vector = getattr(rollup, field)
+        for component_id, delta in counts.items():
+            key = str(component_id)
+            total = vector.get(key, 0) + delta
+            if total > 0:
+                vector[key] = total
+            else:
+                vector.pop(key, None)
+        values = {field: vector}
+        if positive:
+            values["last_activity"] = timezone.now()
+        TeacherRollup.objects.filter(pk=rollup.pk).update(**values)
+
+
+def refresh_latest(teacher_id):
+    """Recompute a teacher's latest reflection and plan, e.g. after a delete."""
+    if teacher_id is None:
+        return
+    latest_reflection = (
+        SelfReflection.objects.for_teacher(teacher_id)
+        .order_by("-date_created", "-id")
+        .values_list("date_created", flat=True)
+        .first()
+    )
+    plan_id, observation_id = (
+        GrowthPlan.objects.for_teacher(teacher_id)
+        .order_by("-id")
+        .values_list("id", "observation")
+        .first()
+    ) or (None, None)
+    update_teacher(
+        teacher_id,
+        create=False,
+        latest_reflection=latest_reflection,
+        latest_plan_id=plan_id,
+        latest_plan_observed=observation_id is not None,
+    )
+
+
+@transaction.atomic
+def rebuild_teachers():
+    """Recompute every teacher's rollup row; returns the number of rows."""
+    TeacherRollup.objects.all().delete()
+
+    teachers = {}
+
+    def teacher(teacher_id):
+        return teachers.setdefault(teacher_id, TeacherRollup(teacher_id=teacher_id))
+
+    for row in SelfReflection.objects.values("teacher_id").annotate(
+        total=Count("id"), latest=Max("date_created")
+    ):
+        rollup = teacher(row["teacher_id"])
+        rollup.reflection_count = row["total"]
+        rollup.latest_reflection = rollup.last_activity = row["latest"]
+
+    latest_plans = GrowthPlan.objects.values("reflection__teacher_id").annotate(latest=Max("id"))
+    for row in latest_plans.annotate(total=Count("id"), observed=Count("observation")):
+        rollup = teacher(row["reflection__teacher_id"])
+        rollup.growth_plan_count = row["total"]
+        rollup.observed_plan_count = row["observed"]
+        rollup.latest_plan_id = row["latest"]
+
+    observed = set(
+        Observation.objects.filter(growth_plan__in=latest_plans.values("latest"))
+        .values_list("growth_plan_id", flat=True)
+    )
+    for rollup in teachers.values():
+        rollup.latest_plan_observed = rollup.latest_plan_id in observed
+
+    for row in Observation.objects.values("growth_plan__reflection__teacher_id").annotate(
+        latest=Max("last_updated")
+    ):
+        rollup = teacher(row["growth_plan__reflection__teacher_id"])
+        if rollup.last_activity is None or row["latest"] > rollup.last_activity:
+            rollup.last_activity = row["latest"]
+
+    for field, link in (
+        ("strength_counts", ReflectionDomain.strengths.through),
+        ("growth_counts", ReflectionDomain.growths.through),
+    ):
+        for row in link.objects.values(
+            "reflectiondomain__reflection__teacher_id", "component_id"
+        ).annotate(total=Count("id")):
+            rollup = teacher(row["reflectiondomain__reflection__teacher_id"])
+            getattr(rollup, field)[str(row["component_id"])] = row["total"]
+
+    TeacherRollup.objects.bulk_create(teachers.values(), batch_size=500)
+    return len(teachers)
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute every rollup row from the source tables."""
+    DepartmentRollup.objects.all().delete()
+    ComponentRollup.objects.all().delete()
+    TeacherYearRollup.objects.all().delete()
+
+    departments = {}
+
+    def department(department_id, year_id):
+        return departments.setdefault(
+            (department_id, year_id),
+            DepartmentRollup(department_id=department_id, academic_year_id=year_id),
+        )
+
+    # Only active teachers count towards department figures (see the module docstring).
+    for row in (
+        SelfReflection.objects.filter(teacher__is_active=True)
+        .values("teacher__department_id", "academic_year_id")
+        .annotate(total=Count("id"), teachers=Count("teacher", distinct=True))
+    ):
+        rollup = department(row["teacher__department_id"], row["academic_year_id"])
+        rollup.reflection_count = row["total"]
+        rollup.teachers_with_reflections = row["teachers"]
+
+    for row in GrowthPlan.objects.filter(reflection__teacher__is_active=True).values(
+        "reflection__teacher__department_id", "reflection__academic_year_id"
+    ).annotate(total=Count("id"), observed=Count("observation")):
+        rollup = department(
+            row["reflection__teacher__department_id"], row["reflection__academic_year_id"]
+        )
+        rollup.growth_plan_count = row["total"]
+        rollup.observed_plan_count = row["observed"]
+
+    DepartmentRollup.objects.bulk_create(departments.values())
+
+    components = {}
+    for field, link in (
+        ("strength_count", ReflectionDomain.strengths.through),
+        ("growth_count", ReflectionDomain.growths.through),
+    ):
+        for row in (
+            link.objects.filter(reflectiondomain__reflection__teacher__is_active=True)
+            .values(
+                "reflectiondomain__reflection__teacher__department_id",
+                "reflectiondomain__reflection__academic_year_id",
+                "component_id",
+            )
+            .annotate(total=Count("id"))
+        ):
+            key = (
+                row["reflectiondomain__reflection__teacher__department_id"],
+                row["reflectiondomain__reflection__academic_year_id"],
+                row["component_id"],
+            )
+            rollup = components.setdefault(
+                key,
+                ComponentRollup(
+                    department_id=key[0], academic_year_id=key[1], component_id=key[2]
+                ),
+            )
+            setattr(rollup, field, row["total"])
+
+    ComponentRollup.objects.bulk_create(components.values(), batch_size=500)
+
+    TeacherYearRollup.objects.bulk_create(
+        (
+            TeacherYearRollup(
+                teacher_id=row["teacher_id"],
+                academic_year_id=row["academic_year_id"],
+                reflection_count=row["total"],
+            )
+            for row in SelfReflection.objects.values("teacher_id", "academic_year_id").annotate(
+                total=Count("id")
+            )
+        ),
+        batch_size=500,
+    )
+
+    return len(departments), len(components), rebuild_teachers()
+
+
+def bump_caches():
+    """Invalidate every cached dashboard and profile built from the old counters."""
+    caching.bump(
+        caching.SCHOOL,
+        *(caching.department_scope(pk) for pk in Department.objects.values_list("pk", flat=True)),
+        *(caching.teacher_scope(pk) for pk in Teacher.objects.values_list("pk", flat=True)),
+    )
@@ -0,0 +1,166 @@
+"""Full-text search over reflections, growth plans and observations.
+
+Backed by the SQLite FTS5 table ``perf_search`` (migration 0004), which
+triggers keep in sync with the source rows. Each index row is one reflection
+domain, growth plan or observation; its rowid is ``source id * 4 + kind``.
+Results are grouped per reflection, ranked by bm25 and highlighted by
+``snippet()``. On other databases search returns nothing.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import SelfReflection
+
+DOMAIN, PLAN, OBSERVATION = 1, 2, 3
+KINDS = {DOMAIN: "Next steps", PLAN: "Growth plan", OBSERVATION: "Observation"}
+
+# Private-use characters mark the snippet's matches so the text can be
+# HTML-escaped before they are turned into <mark> tags.
+OPEN, CLOSE = "\ue000", "\ue001"
+
+# bm25 column weights: a hit on the teacher's name beats one in the body.
+RANK = "bm25(perf_search, 4.0, 1.0)"
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def available():
+    return connection.vendor == "sqlite"
+
+
+def fts_query(text):
+    """Turn user input into an FTS5 query: every word must match, last one as a prefix.
+
+    Words are quoted so FTS5 operators and punctuation in the input are inert.
+    """
+    words = TOKEN.findall(text or "")
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def highlight(text):
+    return mark_safe(escape(text).replace(OPEN, "<mark>").replace(CLOSE, "</mark>"))
+
+
+def scope_filter(staff):
+    """SQL restricting the index to ``SelfReflection.objects.visible_to(staff)``.
+
+    Returns ``("", [])`` when that is every reflection, so the subquery is skipped.
+    """
+    visible = SelfReflection.objects.visible_to(staff)
+    if visible.query.is_empty():
+        return "0", []
+    if not visible.query.where:
+        return "", []
+    sql, params = visible.values("pk").query.sql_with_params()
+    return f"reflection_id IN ({sql})", list(params)
+
+
+class SearchHit:
+    def __init__(self, reflection, kind, teacher, snippet, rank):
+        self.reflection = reflection
+        self.kind = kind
+        self.teacher = teacher
+        self.snippet = snippet
+        self.rank = rank
+
+    @property
+    def label(self):
+        return KINDS.get(self.kind, "")
+
+
+class SearchPage:
+    def __init__(self, query, hits, number, page_size, has_next):
+        self.query = query
+        self.hits = hits
+        self.number = number
+        self.page_size = page_size
+        self.has_next = has_next
+
+    @property
+    def has_previous(self):
+        return self.number > 1
+
+    @property
+    def next_page_number(self):
+        return self.number + 1
+
+    @property
+    def previous_page_number(self):
+        return self.number - 1
+
+    def __iter__(self):
+        return iter(self.hits)
+
+    def __len__(self):
+        return len(self.hits)
+
+
+def search(text, staff, page=1, page_size=25):
+    """One page of reflections matching ``text`` that ``staff`` may see, best first.
+
+    Each reflection appears once, with the snippet of its best-ranked row.
+    """
+    query = fts_query(text)
+    page = max(1, page)
+    if not query or not available():
+        return SearchPage(text, [], page, page_size, False)
+
+    where, params = scope_filter(staff)
+    sql = f"""
+        SELECT reflection_id, kind, teacher, snippet, rank FROM (
+            SELECT *, row_number() OVER (PARTITION BY reflection_id ORDER BY rank) AS n FROM (
+                SELECT reflection_id, rowid %% 4 AS kind, {RANK} AS rank,
+                       highlight(perf_search, 0, %s, %s) AS teacher,
+                       snippet(perf_search, 1, %s, %s, '…', 16) AS snippet
+                FROM perf_search
+                WHERE perf_search MATCH %s {"AND " + where if where else ""}
+            )
+        )
+        WHERE n = 1
+        ORDER BY rank, reflection_id DESC
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql, [OPEN, CLOSE, OPEN, CLOSE, query, *params, page_size + 1, (page - 1) * page_size]
+        )
+        rows = cursor.fetchall()
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    reflections = SelfReflection.objects.select_related("teacher__department").in_bulk(
+        [row[0] for row in rows]
+    )
+    hits = [
+        SearchHit(reflections[pk], kind, highlight(teacher), highlight(snippet), rank)
+        for pk, kind, teacher, snippet, rank in rows
+        if pk in reflections
+    ]
+    return SearchPage(text, hits, page, page_size, has_next)
+
+
+def matching_reflections(text):
+    """Subquery of reflection ids matching ``text``, for ``pk__in`` (None if unavailable)."""
+    query = fts_query(text)
+    if not query or not available():
+        return None
+    return RawSQL("SELECT reflection_id FROM perf_search WHERE perf_search MATCH %s", [query])
+
+
+def matching_plans(text):
+    """Subquery of growth plan ids whose own text matches ``text``."""
+    query = fts_query(text)
+    if not query or not available():
+        return None
+    return RawSQL(
+        f"SELECT rowid / 4 FROM perf_search WHERE perf_search MATCH %s AND rowid %% 4 = {PLAN}",
+        [query],
+    )
@@ -0,0 +1,274 @@
+"""Bulk generation of synthetic reflection data.
+
+Used by ``seed_reflections``, ``bench`` and ``explain_views``. Rows, including
+the m2m through rows, are written with ``bulk_create`` in chunked
+transactions; signals do not fire, so the rollups are rebuilt once at the end
+instead.
+"""
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.test.utils import override_settings
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from faker import Faker
+
+from accounts.models import CustomUser, Staff, Role, Department
+from .models import (
+    AcademicYear,
+    Domain,
+    Component,
+    SelfReflection,
+    ReflectionDomain,
+    GrowthPlan,
+    Observation,
+)
+from .utils import insert_links
+from . import caching, rollups
+
+StrengthLink = ReflectionDomain.strengths.through
+GrowthLink = ReflectionDomain.growths.through
+PlanComponentLink = GrowthPlan.components_addressed.through
+
+EVALUATORS = ["HOD Smith", "Coordinator Jane", "Principal Lee"]
+
+
+def text_pool(fake, size=200):
+    """Pre-generated sentences/paragraphs; Faker per row dominates seeding time."""
+    return {
+        "sentence": [fake.sentence() for _ in range(size)],
+        "paragraph": [fake.paragraph(nb_sentences=2) for _ in range(size)],
+        "actions": [fake.paragraph(nb_sentences=3) for _ in range(size)],
+    }
+
+
+def seed_reflections(
+    teachers,
+    domains,
+    year,
+    per_teacher,
+    rng,
+    texts,
+    domains_per_reflection=2,
+    observed_ratio=0.0,
+    batch_size=500,
+):
+    """Create ``per_teacher`` reflections (with domains and a growth plan) per teacher.
+
+    ``domains`` is a list of ``(domain, [components])`` pairs. Returns the
+    number of reflections written.
+    """
+    domains = [(domain, components) for domain, components in domains if components]
+    today = timezone.now().date()
+    jobs = [teacher for teacher in teachers for _ in range(per_teacher)]
+
+    for start in range(0, len(jobs), batch_size):
+        chunk = jobs[start:start + batch_size]
+        with transaction.atomic():
+            reflections = SelfReflection.objects.bulk_create(
+                [SelfReflection(teacher=teacher, academic_year=year) for teacher in chunk]
+            )
+
+            # Like the forms: a component is never both a strength and a growth,
+            # and a plan addresses some of its reflection's growths.
+            reflection_domains, picks, reflection_growths = [], [], []
+            for reflection in reflections:
+                growth_pool = []
+                for domain, components in rng.sample(
+                    domains, k=min(domains_per_reflection, len(domains))
+                ):
+                    reflection_domains.append(
+                        ReflectionDomain(
+                            reflection=reflection,
+                            domain=domain,
+                            next_steps=rng.choice(texts["sentence"]),
+                        )
+                    )
+                    chosen = rng.sample(components, k=min(4, len(components)))
+                    half = len(chosen) // 2
+                    picks.append((chosen[:half], chosen[half:]))
+                    growth_pool += chosen[half:]
+                reflection_growths.append(growth_pool)
+            ReflectionDomain.objects.bulk_create(reflection_domains)
+
+            strengths, growths = [], []
+            for rd, (strength_picks, growth_picks) in zip(reflection_domains, picks):
+                strengths += [(rd.pk, c.pk) for c in strength_picks]
+                growths += [(rd.pk, c.pk) for c in growth_picks]
+            insert_links(StrengthLink, "reflectiondomain", strengths)
+            insert_links(GrowthLink, "reflectiondomain", growths)
+
+            plans = GrowthPlan.objects.bulk_create(
+                [
+                    GrowthPlan(
+                        reflection=reflection,
+                        academic_year=year,
+                        goal_statement=rng.choice(texts["paragraph"]),
+                        indicators_of_success=rng.choice(texts["sentence"]),
+                        actions=rng.choice(texts["actions"]),
+                        timelines="One term",
+                        resources=rng.choice(texts["sentence"]),
+                        evaluator_name=rng.choice(EVALUATORS),
+                        date=today,
+                    )
+                    for reflection in reflections
+                ]
+            )
+            insert_links(
+                PlanComponentLink,
+                "growthplan",
+                [
+                    (plan.pk, c.pk)
+                    for plan, growth_pool in zip(plans, reflection_growths)
+                    for c in rng.sample(growth_pool, k=min(3, len(growth_pool)))
+                ],
+            )
+            if observed_ratio:
+                Observation.objects.bulk_create(
+                    [
+                        Observation(growth_plan=plan, hod_comment=rng.choice(texts["sentence"]))
+                        for plan in plans
+                        if rng.random() < observed_ratio
+                    ]
+                )
+
+    rollups.rebuild()
+    caching.bump(
+        caching.SCHOOL,
+        *{caching.department_scope(teacher.department_id) for teacher in teachers},
+        *(caching.teacher_scope(teacher.pk) for teacher in teachers),
+    )
+    return len(jobs)
+
+
+# === Synthetic school (bench, explain_views) ===
+
+# How to fill in the URL arguments of each perf view from the seeded sample.
+URL_KWARGS = {
+    "reflection_detail": lambda s: {"pk": s["reflection"].pk},
+    "reflection_edit": lambda s: {"pk": s["reflection"].pk},
+    "growthplan_create": lambda s: {"reflection_id": s["reflection"].pk},
+    "growthplan_edit": lambda s: {"pk": s["growth_plan"].pk},
+    "teacher_reflections": lambda s: {"teacher_id": s["teacher"].pk},
+    "growth_plan_detail": lambda s: {"pk": s["growth_plan"].pk},
+}
+
+# Views that are not worth timing (auth round trips).
+SKIP = {"login", "logout"}
+
+
+def seed_school(
+    teachers=50,
+    reflections_per_teacher=5,
+    departments=8,
+    domains=4,
+    components=5,
+    seed=1,
+):
+    """Create a school with a teacher, an HOD and a PC to browse it as.
+
+    Returns the sample objects view URLs are built from (see ``view_urls``).
+    """
+    rng = random.Random(seed)
+    role = Role.objects.create(name="Teacher")
+    department_list = [
+        Department.objects.create(name=f"Department {i + 1}") for i in range(departments)
+    ]
+    year = AcademicYear.objects.create(start_year=2024, end_year=2025, is_active=True)
+    catalog = []
+    for d in range(domains):
+        domain = Domain.objects.create(name=f"Domain {d + 1}", role=role)
+        Component.objects.bulk_create(
+            Component(domain=domain, name=f"Component {d + 1}.{c + 1}")
+            for c in range(components)
+        )
+        catalog.append((domain, list(domain.components.all())))
+
+    def staff(email, department, **flags):
+        user = CustomUser.objects.create(email=email)
+        return Staff.objects.create(
+            user=user,
+            fname=email.split("@")[0],
+            lname="Bench",
+            staff_id=email,
+            role=role,
+            department=department,
+            **flags,
+        )
+
+    teacher_list = [
+        staff(f"teacher{i + 1}@bench.test", rng.choice(department_list)) for i in range(teachers)
+    ]
+    hod = staff(
+        "hod@bench.test",
+        teacher_list[0].department if teacher_list else department_list[0],
+        is_hod=True,
+    )
+    pc = staff("pc@bench.test", department_list[0], is_pc=True)
+
+    fake = Faker()
+    fake.seed_instance(seed)
+    seed_reflections(
+        teacher_list,
+        catalog,
+        year,
+        reflections_per_teacher,
+        rng,
+        text_pool(fake, size=50),
+        domains_per_reflection=len(catalog),
+        observed_ratio=0.5,
+    )
+
+    teacher = teacher_list[0] if teacher_list else hod
+    reflection = SelfReflection.objects.filter(teacher=teacher).first()
+    return {
+        "roles": {"teacher": teacher, "hod": hod, "pc": pc},
+        "teacher": teacher,
+        "reflection": reflection,
+        "growth_plan": reflection.growth_plans.first() if reflection else None,
+    }
+
+
+def view_urls(sample):
+    """``(name, url)`` for every perf view; ``url`` is None when it cannot be built."""
+    from . import urls
+
+    for pattern in urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or pattern.name in SKIP:
+            continue
+        if pattern.pattern.converters:
+            build = URL_KWARGS.get(pattern.name)
+            kwargs = build(sample) if build else {None: None}
+            if None in kwargs.values():
+                yield pattern.name, None
+                continue
+            yield pattern.name, reverse(pattern.name, kwargs=kwargs)
+        else:
+            yield pattern.name, reverse(pattern.name)
+
+
+@contextmanager
+def throwaway_caches():
+    """Give every cache alias a private LocMemCache while a throwaway school is in use.
+
+    ``bench`` and ``explain_views`` clear caches and bump versions against a
+    throwaway database; none of that may reach the shared cache (and the
+    in-progress wizards in it) that live workers use.
+    """
+    with override_settings(
+        CACHES={
+            alias: {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": f"throwaway-{alias}",
+            }
+            for alias in settings.CACHES
+        }
+    ):
+        try:
+            yield
+        finally:
+            for cache in caches.all():
+                cache.clear()
@@ -0,0 +1,272 @@
+from collections import Counter, defaultdict
+
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import Staff as Teacher
+from accounts.roster import roster_imported
+from .models import (
+    AcademicYear,
+    Domain,
+    Component,
+    SelfReflection,
+    ReflectionDomain,
+    GrowthPlan,
+    Observation,
+    TeacherYearRollup,
+    TeacherRollup,
+)
+from . import caching, catalog, rollups
+
+
+def _owner(row):
+    """(teacher_id, department_id, year_id) from (teacher, department, is_active, year)."""
+    if row is None:
+        return None, None, None
+    teacher_id, department_id, is_active, year_id = row
+    return teacher_id, rollups.department_key(department_id, is_active), year_id
+
+
+def _plan_owner(growth_plan_id):
+    """(teacher_id, department_id, year_id) for a growth plan, in one query.
+
+    ``department_id`` is ``None`` for an inactive teacher, like ``rollups.department_key``.
+    """
+    return _owner(
+        GrowthPlan.objects.filter(pk=growth_plan_id)
+        .values_list(
+            "reflection__teacher_id",
+            "reflection__teacher__department_id",
+            "reflection__teacher__is_active",
+            "reflection__academic_year_id",
+        )
+        .first()
+    )
+
+
+def _reflection_owner(reflection_id):
+    return _owner(
+        SelfReflection.objects.filter(pk=reflection_id)
+        .values_list("teacher_id", "teacher__department_id", "teacher__is_active", "academic_year_id")
+        .first()
+    )
+
+
+def _teacher_department(teacher):
+    return rollups.department_key(teacher.department_id, teacher.is_active)
+
+
+# === SelfReflection ===
+
+@receiver(post_save, sender=SelfReflection)
+def reflection_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        department_id, year_id = _teacher_department(instance.teacher), instance.academic_year_id
+        rollups.bump_department(department_id, year_id, reflection_count=1)
+        rollups.bump_teacher(instance.teacher_id, department_id, year_id, reflection_count=1)
+        rollups.update_teacher(
+            instance.teacher_id,
+            latest_reflection=instance.date_created,
+            last_activity=instance.date_created,
+        )
+        caching.bump_owner(instance.teacher_id, department_id)
+
+
+@receiver(post_delete, sender=SelfReflection)
+def reflection_deleted(sender, instance, **kwargs):
+    department_id, year_id = _teacher_department(instance.teacher), instance.academic_year_id
+    rollups.bump_department(department_id, year_id, reflection_count=-1)
+    rollups.bump_teacher(instance.teacher_id, department_id, year_id, reflection_count=-1)
+    rollups.refresh_latest(instance.teacher_id)
+    caching.bump_owner(instance.teacher_id, department_id)
+
+
+@receiver(pre_delete, sender=Teacher)
+def teacher_deleting(sender, instance, **kwargs):
+    # Settle the completion figures up front and zero the counters, so the
+    # cascaded reflection deletes below cannot count this teacher out twice.
+    counted = TeacherYearRollup.objects.filter(teacher=instance, reflection_count__gt=0)
+    department_id = _teacher_department(instance)
+    for year_id in counted.values_list("academic_year_id", flat=True):
+        rollups.bump_department(department_id, year_id, teachers_with_reflections=-1)
+    counted.update(reflection_count=0)
+
+
+@receiver(pre_save, sender=Teacher)
+def teacher_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Remember where the teacher was counted, for teacher_saved.
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    watched = {"department", "department_id", "is_active"}
+    if update_fields is not None and not watched & set(update_fields):
+        return
+    instance._rollup_previous = (
+        Teacher.objects.filter(pk=instance.pk).values_list("department_id", "is_active").first()
+    )
+
+
+@receiver(post_save, sender=Teacher)
+def teacher_saved(sender, instance, **kwargs):
+    previous = getattr(instance, "_rollup_previous", None)
+    if previous is not None:
+        rollups.move_teacher(
+            instance.pk, rollups.department_key(*previous), _teacher_department(instance)
+        )
+        caching.bump(caching.department_scope(previous[0]))
+    # Staff numbers feed the completion percentage on the HOD/PC dashboards.
+    caching.bump_owner(instance.pk, instance.department_id)
+
+
+@receiver(roster_imported)
+def roster_imported_bump(sender, staff, **kwargs):
+    # Bulk-created staff skip post_save.
+    caching.bump(
+        caching.SCHOOL,
+        *{caching.department_scope(member.department_id) for member in staff},
+    )
+
+
+# === GrowthPlan / Observation ===
+
+def _latest_plan_observed(teacher_id, growth_plan_id, observed):
+    TeacherRollup.objects.filter(teacher_id=teacher_id, latest_plan_id=growth_plan_id).update(
+        latest_plan_observed=observed
+    )
+
+
+@receiver(post_save, sender=GrowthPlan)
+def growth_plan_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    teacher_id, department_id, year_id = _reflection_owner(instance.reflection_id)
+    if created:
+        rollups.bump_department(department_id, year_id, growth_plan_count=1)
+        rollups.bump_teacher(teacher_id, department_id, year_id, growth_plan_count=1)
+        rollups.update_teacher(
+            teacher_id,
+            latest_plan_id=instance.pk,
+            latest_plan_observed=False,
+            last_activity=timezone.now(),
+        )
+        caching.bump_owner(teacher_id, department_id)
+    else:
+        rollups.touch_teacher(teacher_id)
+
+
+@receiver(post_delete, sender=GrowthPlan)
+def growth_plan_deleted(sender, instance, **kwargs):
+    teacher_id, department_id, year_id = _reflection_owner(instance.reflection_id)
+    rollups.bump_department(department_id, year_id, growth_plan_count=-1)
+    rollups.bump_teacher(teacher_id, department_id, year_id, growth_plan_count=-1)
+    rollups.refresh_latest(teacher_id)
+    caching.bump_owner(teacher_id, department_id)
+
+
+@receiver(post_save, sender=Observation)
+def observation_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    teacher_id, department_id, year_id = _plan_owner(instance.growth_plan_id)
+    if created:
+        rollups.bump_department(department_id, year_id, observed_plan_count=1)
+        rollups.bump_teacher(teacher_id, department_id, year_id, observed_plan_count=1)
+        _latest_plan_observed(teacher_id, instance.growth_plan_id, True)
+        caching.bump_owner(teacher_id, department_id)
+    rollups.touch_teacher(teacher_id)
+
+
+@receiver(post_delete, sender=Observation)
+def observation_deleted(sender, instance, **kwargs):
+    teacher_id, department_id, year_id = _plan_owner(instance.growth_plan_id)
+    rollups.bump_department(department_id, year_id, observed_plan_count=-1)
+    rollups.bump_teacher(teacher_id, department_id, year_id, observed_plan_count=-1)
+    _latest_plan_observed(teacher_id, instance.growth_plan_id, False)
+    caching.bump_owner(teacher_id, department_id)
+
+
+# === ReflectionDomain strengths / growths ===
+
+LINK_FIELDS = {
+    ReflectionDomain.strengths.through: ("strengths", "strength_reflections", "strength_count"),
+    ReflectionDomain.growths.through: ("growths", "growth_reflections", "growth_count"),
+}
+
+
+def _owned_components(instance, reverse, pk_set):
+    """(teacher_id, department_id, year_id, component_id) for each link in an m2m change."""
+    if not pk_set:
+        return []
+    if not reverse:
+        owner = _reflection_owner(instance.reflection_id)
+        return [(*owner, component_id) for component_id in pk_set]
+    owners = ReflectionDomain.objects.filter(pk__in=pk_set).values_list(
+        "reflection__teacher_id",
+        "reflection__teacher__department_id",
+        "reflection__teacher__is_active",
+        "reflection__academic_year_id",
+    )
+    return [(*_owner(owner), instance.pk) for owner in owners]
+
+
+def _apply_links(links, field, delta):
+    rollups.bump_components([link[1:] for link in links], field, delta)
+    by_teacher = defaultdict(Counter)
+    for teacher_id, _, _, component_id in links:
+        by_teacher[teacher_id][component_id] += delta
+    for teacher_id, counts in by_teacher.items():
+        rollups.bump_teacher_components(teacher_id, field, counts)
+    for teacher_id, department_id in {link[:2] for link in links}:
+        caching.bump_owner(teacher_id, department_id)
+
+
+def link_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    forward_name, reverse_name, field = LINK_FIELDS[sender]
+    if action == "pre_clear":
+        related = getattr(instance, reverse_name if reverse else forward_name)
+        instance._rollup_cleared = set(related.values_list("pk", flat=True))
+    elif action == "post_clear":
+        links = _owned_components(instance, reverse, getattr(instance, "_rollup_cleared", None))
+        _apply_links(links, field, -1)
+    elif action == "post_add":
+        _apply_links(_owned_components(instance, reverse, pk_set), field, 1)
+    elif action == "post_remove":
+        _apply_links(_owned_components(instance, reverse, pk_set), field, -1)
+
+
+for link in LINK_FIELDS:
+    m2m_changed.connect(link_changed, sender=link, dispatch_uid=f"rollup_{link.__name__}")
+
+
+@receiver(post_save, sender=ReflectionDomain)
+def reflection_domain_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        teacher_id, department_id, _ = _reflection_owner(instance.reflection_id)
+        rollups.touch_teacher(teacher_id)
+        caching.bump_owner(teacher_id, department_id)
+
+
+@receiver(pre_delete, sender=ReflectionDomain)
+def reflection_domain_deleting(sender, instance, **kwargs):
+    # The through rows go with the domain without an m2m_changed signal.
+    owner = _reflection_owner(instance.reflection_id)
+    for link, (_, _, field) in LINK_FIELDS.items():
+        component_ids = link.objects.filter(reflectiondomain=instance).values_list(
+            "component_id", flat=True
+        )
+        _apply_links([(*owner, component_id) for component_id in component_ids], field, -1)
+    caching.bump_owner(*owner[:2])
+
+
+# === Catalog ===
+
+def catalog_changed(sender, **kwargs):
+    # caching.bump repeats the bump on commit, so no worker keeps a snapshot
+    # it rebuilt before the change was visible.
+    catalog.invalidate()
+
+
+for model in (Domain, Component, AcademicYear):
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f"catalog_save_{model.__name__}")
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f"catalog_delete_{model.__name__}")
@@ -0,0 +1,145 @@
+"""Static asset pipeline, built on ``collectstatic``.
+
+- ``PrunedPluginsFinder`` leaves out ``static/plugins/<name>/`` folders that no
+  template under ``PERF_STATIC_TEMPLATE_DIRS`` references with ``{% static %}``.
+- ``CompressedManifestStaticFilesStorage`` writes content-hashed names (so
+  they can be cached forever) plus ``.gz`` variants next to them at build
+  time. Templates may only reference files that are vendored under
+  ``static/``; a missing one fails at render time under the manifest.
+- ``serve`` hands out the smallest variant the browser accepts, with
+  immutable far-future caching for hashed names. It is mounted when
+  ``PERF_SERVE_STATIC`` is on; a front-end server can serve the same files.
+"""
+import gzip
+import mimetypes
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePath
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import Http404
+from django.utils.cache import patch_vary_headers
+from django.views import static
+
+PLUGINS = "plugins"
+STATIC_TAG = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]""")
+
+# Already-compressed formats (images, woff/woff2) gain nothing.
+COMPRESSIBLE = {".css", ".js", ".map", ".json", ".svg", ".txt", ".html", ".xml", ".eot", ".ttf", ".otf", ".ico"}
+MIN_SIZE = 512
+
+# Preferred first. A variant is only kept if it saves at least 5%.
+ENCODINGS = (("gzip", ".gz"),)
+
+# ManifestStaticFilesStorage inserts a 12-character MD5 prefix before the extension.
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.[^/.]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+# === Pruning ===
+
+def referenced_plugins(template_dirs=None):
+    """Names of the ``plugins/<name>/`` folders used by any template."""
+    used = set()
+    for directory in template_dirs or settings.PERF_STATIC_TEMPLATE_DIRS:
+        for template in Path(directory).rglob("*.html"):
+            for path in STATIC_TAG.findall(template.read_text(encoding="utf-8")):
+                parts = PurePath(path).parts
+                if len(parts) > 2 and parts[0] == PLUGINS:
+                    used.add(parts[1])
+    return used
+
+
+class PrunedPluginsFinder(FileSystemFinder):
+    """``FileSystemFinder`` whose ``collectstatic`` listing skips unused plugins.
+
+    ``find()`` is untouched, so runserver still serves everything in development.
+    """
+
+    def list(self, ignore_patterns):
+        used = referenced_plugins()
+        for path, storage in super().list(ignore_patterns):
+            parts = PurePath(path).parts
+            if len(parts) > 2 and parts[0] == PLUGINS and parts[1] not in used:
+                continue
+            yield path, storage
+
+
+# === Precompression ===
+
+def compress(path):
+    """Write the precompressed variants of ``path``; returns the ones kept."""
+    data = path.read_bytes()
+    written = []
+    for encoding, suffix in ENCODINGS:
+        target = path.with_name(path.name + suffix)
+        if target.exists():  # hashed names are content-addressed, so still valid
+            written.append(target)
+            continue
+        packed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(packed) < len(data) * 0.95:
+            target.write_bytes(packed)
+            written.append(target)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    keep_intermediate_files = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = [
+            name
+            for name in set(self.hashed_files.values())
+            if Path(name).suffix in COMPRESSIBLE and self.size(name) >= MIN_SIZE
+        ]
+        # zlib releases the GIL, so threads do help here.
+        with ThreadPoolExecutor() as pool:
+            results = pool.map(lambda name: compress(Path(self.path(name))), names)
+            for name, written in zip(names, results):
+                for target in written:
+                    yield name, f"{name}{target.suffix}", True
+
+
+# === Serving ===
+
+def accepted_encodings(request):
+    """Content codings in the request's Accept-Encoding, minus any refused with q=0."""
+    accepted = set()
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        weight = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            if float(weight) > 0:
+                accepted.add(coding.lower())
+        except ValueError:
+            continue
+    return accepted
+
+
+def serve(request, path):
+    """Serve a collected file from ``STATIC_ROOT``, precompressed when possible."""
+    root = Path(settings.STATIC_ROOT)
+    accepted = accepted_encodings(request)
+    response = None
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and (root / (path + suffix)).is_file():
+            try:
+                response = static.serve(request, path + suffix, document_root=root)
+            except Http404:
+                continue
+            content_type, _ = mimetypes.guess_type(path)
+            response["Content-Type"] = content_type or "application/octet-stream"
+            response["Content-Encoding"] = encoding
+            break
+    if response is None:
+        response = static.serve(request, path, document_root=root)
+
+    patch_vary_headers(response, ["Accept-Encoding"])
+    if HASHED_NAME.search(path):
+        response["Cache-Control"] = IMMUTABLE
+    return response
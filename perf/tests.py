@@ -1,3 +1,1456 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import importlib
+import io
+import json
+import random
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache, caches
+from django.core.cache.backends import locmem
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Sum
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+from faker import Faker
+
+from accounts.models import CustomUser, Staff, Role, Department
+from .models import (
+    AcademicYear,
+    Domain,
+    Component,
+    SelfReflection,
+    ReflectionDomain,
+    GrowthPlan,
+    Observation,
+    ComponentRollup,
+    DepartmentRollup,
+    TeacherRollup,
+    TeacherYearRollup,
+)
+from .management.commands.explain_views import explain, problems
+from .forms import ReflectionDomainForm, GrowthPlanForm
+from .pagination import paginate_newest_first
+from .utils import get_active_year, save_reflection
+from . import analytics, caching, catalog, export, rollups, search, seeding, staticfiles, warmup
+
+# The shared alias lives in the project's .cache directory; tests get a
+# throwaway directory so they never clear or fill the live cache.
+_cache_dir = tempfile.TemporaryDirectory(prefix="perf-tests-")
+isolated_caches = override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "shared": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": _cache_dir.name,
+        },
+    }
+)
+
+
+class SchoolFixture:
+    """Small helpers to build staff and reflections without the wizard."""
+
+    @classmethod
+    def make_staff(cls, email, department, role, **flags):
+        user = CustomUser.objects.create(email=email)
+        return Staff.objects.create(
+            user=user,
+            fname=email.split("@")[0],
+            lname="Test",
+            staff_id=email,
+            role=role,
+            department=department,
+            **flags,
+        )
+
+    @classmethod
+    def make_catalog(cls, role, domains=2, components=3):
+        created = []
+        for d in range(domains):
+            domain = Domain.objects.create(name=f"Domain {d}", role=role)
+            for c in range(components):
+                Component.objects.create(domain=domain, name=f"Component {d}.{c}")
+            created.append(domain)
+        return created
+
+    @classmethod
+    def make_reflection(cls, teacher, domains, year, plans=1, observed=True):
+        reflection = SelfReflection.objects.create(teacher=teacher, academic_year=year)
+        for domain in domains:
+            components = list(domain.components.all())
+            rd = ReflectionDomain.objects.create(
+                reflection=reflection, domain=domain, next_steps="Plan differentiation"
+            )
+            rd.strengths.set(components[:1])
+            rd.growths.set(components[1:])
+        for _ in range(plans):
+            plan = GrowthPlan.objects.create(
+                reflection=reflection,
+                academic_year=year,
+                goal_statement="Improve questioning",
+                indicators_of_success="Students ask more questions",
+                actions="Peer observation",
+                timelines="One term",
+                evaluator_name="HOD",
+                date=timezone.now().date(),
+            )
+            plan.components_addressed.set(
+                Component.objects.filter(domain__in=domains)[:3]
+            )
+            if observed:
+                Observation.objects.create(growth_plan=plan, hod_comment="Good")
+        return reflection
+
+    @classmethod
+    def wizard_posts(cls, domains, year):
+        """POST data for each ReflectionWizard step, domain steps first."""
+        steps = [
+            (
+                f"domain_{domain.pk}",
+                {
+                    "strengths": [c.pk for c in domain.components.all()[:1]],
+                    "growths": [c.pk for c in domain.components.all()[1:]],
+                    "next_steps": "Next",
+                },
+            )
+            for domain in domains
+        ]
+        growths = [pk for _, data in steps for pk in data["growths"]]
+        steps.append(
+            (
+                "growth_plan",
+                {
+                    "academic_year": year.pk,
+                    "goal_statement": "Goal",
+                    "components_addressed": growths[:2],
+                    "indicators_of_success": "Indicators",
+                    "actions": "Actions",
+                    "timelines": "One term",
+                    "evaluator_name": "HOD",
+                    "date": "2025-01-10",
+                },
+            )
+        )
+        posts = []
+        for step, data in steps:
+            post = {f"{step}-{field}": value for field, value in data.items()}
+            post["reflection_wizard-current_step"] = step
+            posts.append(post)
+        return posts
+
+
+@isolated_caches
+class PerfTestCase(SchoolFixture, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.role = Role.objects.create(name="Teacher")
+        cls.department = Department.objects.create(name="Sciences")
+        cls.year = AcademicYear.objects.create(start_year=2024, end_year=2025, is_active=True)
+        cls.teacher = cls.make_staff("teacher@test.com", cls.department, cls.role)
+        cls.hod = cls.make_staff("hod@test.com", cls.department, cls.role, is_hod=True)
+        cls.pc = cls.make_staff("pc@test.com", cls.department, cls.role, is_pc=True)
+
+    def setUp(self):
+        cache.clear()
+        caching.get_cache().clear()
+        catalog.reset()
+
+    def count_queries(self, user, url):
+        self.client.force_login(user.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+
+class ReflectionRenderingQueryTests(PerfTestCase):
+    """Rendering cost must not grow with domains, components or growth plans."""
+
+    def test_reflection_detail_query_count_is_fixed(self):
+        small = self.make_reflection(self.teacher, self.make_catalog(self.role, 1, 2), self.year)
+        large = self.make_reflection(
+            self.teacher, self.make_catalog(self.role, 6, 5), self.year, plans=4
+        )
+
+        self.assertEqual(
+            self.count_queries(self.hod, reverse("reflection_detail", args=[small.pk])),
+            self.count_queries(self.hod, reverse("reflection_detail", args=[large.pk])),
+        )
+
+    def test_teacher_reflections_query_count_is_fixed(self):
+        other = self.make_staff("other@test.com", self.department, self.role)
+        self.make_reflection(other, self.make_catalog(self.role, 1, 2), self.year)
+        domains = self.make_catalog(self.role, 5, 4)
+        for plans in range(1, 6):
+            self.make_reflection(self.teacher, domains, self.year, plans=plans)
+        catalog.get_catalog()  # top components are named from the catalog snapshot
+
+        self.assertEqual(
+            self.count_queries(self.hod, reverse("teacher_reflections", args=[other.pk])),
+            self.count_queries(self.hod, reverse("teacher_reflections", args=[self.teacher.pk])),
+        )
+
+
+class QueryInstrumentationTests(PerfTestCase):
+    def test_server_timing_reports_queries_and_repeats(self):
+        domains = self.make_catalog(self.role, 1, 2)
+        for _ in range(4):
+            self.make_reflection(self.teacher, domains, self.year)
+        self.client.force_login(self.hod.user)
+
+        with self.assertLogs("perf.sql") as logs, self.settings(
+            PERF_SQL_INSTRUMENTATION={
+                "ENABLED": True,
+                "SERVER_TIMING": True,
+                "DUPLICATE_THRESHOLD": 1,
+                "SLOW_REQUEST_MS": 10**6,
+            }
+        ):
+            response = self.client.get(reverse("reflections_list"))
+
+        self.assertIn("queries", response["Server-Timing"])
+        self.assertIn("dup;", response["Server-Timing"])
+        self.assertIn('"duplicates"', logs.output[0])
+
+    def test_off_unless_enabled(self):
+        self.client.force_login(self.hod.user)
+        with self.settings(PERF_SQL_INSTRUMENTATION={}):
+            response = self.client.get(reverse("reflections_list"))
+        self.assertFalse(response.has_header("Server-Timing"))
+
+        with self.settings(PERF_SQL_INSTRUMENTATION={"ENABLED": True}):
+            response = Client().get(reverse("login"))
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_streamed_bodies_are_measured_once_consumed(self):
+        domains = self.make_catalog(self.role, 1, 2)
+        for _ in range(3):
+            self.make_reflection(self.teacher, domains, self.year)
+        self.client.force_login(self.pc.user)
+
+        with self.settings(PERF_SQL_INSTRUMENTATION={"ENABLED": True, "LOG_ALL": True}):
+            response = self.client.get(reverse("reflections_export"), {"format": "csv"})
+            with self.assertNoLogs("perf.sql"):
+                content = iter(response.streaming_content)
+                next(content)
+            with CaptureQueriesContext(connection) as ctx, self.assertLogs("perf.sql") as logs:
+                list(content)
+
+        self.assertTrue(ctx.captured_queries)
+        self.assertGreaterEqual(json.loads(logs.output[0].split(":", 2)[2])["queries"], len(ctx.captured_queries))
+
+
+class SaveReflectionTests(PerfTestCase):
+    def growth_plan_form(self, components):
+        return GrowthPlanForm(
+            {
+                "academic_year": self.year.pk,
+                "goal_statement": "Goal",
+                "components_addressed": [c.pk for c in components],
+                "indicators_of_success": "Indicators",
+                "actions": "Actions",
+                "timelines": "One term",
+                "evaluator_name": "HOD",
+                "date": "2025-01-10",
+            },
+            growth_components=Component.objects.filter(pk__in=[c.pk for c in components]),
+        )
+
+    def test_saves_domains_links_plan_and_rollups(self):
+        domains = self.make_catalog(self.role, 3, 3)
+        domain_data = {
+            domain.pk: {
+                "strengths": list(domain.components.all()[:1]),
+                "growths": list(domain.components.all()[1:]),
+                "next_steps": f"Next for {domain.name}",
+            }
+            for domain in domains
+        }
+        growths = [c for data in domain_data.values() for c in data["growths"]]
+        form = self.growth_plan_form(growths[:2])
+        self.assertTrue(form.is_valid(), form.errors)
+
+        reflection = save_reflection(self.teacher, domain_data, form)
+
+        self.assertEqual(reflection.reflection_domains.count(), 3)
+        self.assertEqual(
+            ReflectionDomain.strengths.through.objects.filter(
+                reflectiondomain__reflection=reflection
+            ).count(),
+            3,
+        )
+        self.assertEqual(reflection.growth_plans.get().components_addressed.count(), 2)
+        self.assertEqual(
+            ComponentRollup.objects.filter(department=self.department).aggregate(
+                strengths=Sum("strength_count"), growths=Sum("growth_count")
+            ),
+            {"strengths": 3, "growths": 6},
+        )
+        # Bulk inserts reach the search index through its triggers.
+        self.assertEqual([hit.reflection for hit in search.search("Domain 2", self.teacher)], [reflection])
+
+    def test_query_count_does_not_grow_with_domains(self):
+        domains = self.make_catalog(self.role, 4, 3)
+
+        def save(count):
+            domain_data = {
+                domain.pk: {
+                    "strengths": list(domain.components.all()[:1]),
+                    "growths": list(domain.components.all()[1:]),
+                    "next_steps": "",
+                }
+                for domain in domains[:count]
+            }
+            growths = [c for data in domain_data.values() for c in data["growths"]]
+            form = self.growth_plan_form(growths)
+            self.assertTrue(form.is_valid(), form.errors)
+            with CaptureQueriesContext(connection) as ctx:
+                save_reflection(self.teacher, domain_data, form)
+            return len(ctx.captured_queries)
+
+        save(4)  # creates the rollup rows both measured saves update
+        self.assertEqual(save(1), save(4))
+
+    def test_failure_leaves_no_partial_reflection(self):
+        domain = self.make_catalog(self.role, 1, 2)[0]
+        domain_data = {domain.pk: {"strengths": [], "growths": [], "next_steps": ""}}
+        form = self.growth_plan_form([])
+        self.assertFalse(form.is_valid())
+
+        with self.assertRaises(ValueError):
+            save_reflection(self.teacher, domain_data, form)
+
+        self.assertFalse(SelfReflection.objects.exists())
+        self.assertFalse(ReflectionDomain.objects.exists())
+
+
+class CachingTests(PerfTestCase):
+    def build(self, scope, value="payload"):
+        built = []
+        return caching.get_or_build("test", scope, lambda: built.append(value) or value), built
+
+    def test_bump_invalidates_only_the_owners_scopes(self):
+        arts = Department.objects.create(name="Arts")
+        for scope in (caching.department_scope(self.department.pk), caching.department_scope(arts.pk)):
+            self.assertEqual(self.build(scope)[1], ["payload"])
+            self.assertEqual(self.build(scope)[1], [])
+
+        caching.bump_owner(self.teacher.pk, self.department.pk)
+        self.assertEqual(self.build(caching.department_scope(self.department.pk))[1], ["payload"])
+        self.assertEqual(self.build(caching.department_scope(arts.pk))[1], [])
+
+    def test_bump_from_another_worker_is_seen(self):
+        scope = caching.department_scope(self.department.pk)
+        self.build(scope)
+        # A second process opens its own connection to the same backend.
+        other = caches.create_connection(settings.PERF_DASHBOARD_CACHE)
+        with mock.patch.object(caching, "get_cache", return_value=other):
+            caching.bump(scope)
+        self.assertEqual(self.build(scope)[1], ["payload"])
+
+    def test_bump_is_repeated_on_commit(self):
+        scope = caching.department_scope(self.department.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            caching.bump(scope)
+            # Another worker rebuilds from the rows it can still see.
+            self.assertEqual(self.build(scope, "stale")[1], ["stale"])
+        self.assertEqual(self.build(scope)[1], ["payload"])
+
+    def test_rebuild_commands_invalidate_every_scope(self):
+        scopes = (caching.SCHOOL, caching.department_scope(self.department.pk), caching.teacher_scope(self.teacher.pk))
+        for command in ("rebuild_rollups", "backfill_teacher_summaries"):
+            for scope in scopes:
+                self.build(scope)
+            call_command(command, stdout=io.StringIO())
+            for scope in scopes:
+                self.assertEqual(self.build(scope)[1], ["payload"], (command, scope))
+
+    def test_dashboard_payloads_are_scoped_by_staff_and_year(self):
+        domains = self.make_catalog(self.role, 1, 3)
+        arts = Department.objects.create(name="Arts")
+        arts_hod = self.make_staff("arts-hod@test.com", arts, self.role, is_hod=True)
+        old_year = AcademicYear.objects.create(start_year=2023, end_year=2024)
+        self.make_reflection(self.teacher, domains, self.year)
+        self.make_reflection(self.teacher, domains, old_year)
+        self.make_reflection(self.teacher, domains, old_year)
+
+        def reflections(staff, **params):
+            self.client.force_login(staff.user)
+            return self.client.get(reverse("dashboard"), params).context["total_reflections"]
+
+        self.assertEqual(reflections(self.hod), 1)
+        self.assertEqual(reflections(self.hod, year=old_year.pk), 2)
+        self.assertEqual(reflections(arts_hod), 0)
+        self.make_reflection(self.hod, domains, self.year)
+        self.assertEqual(reflections(self.hod), 2)
+        self.assertEqual(reflections(self.hod, year=old_year.pk), 2)
+        self.assertEqual(reflections(arts_hod), 0)
+
+
+class DashboardSummaryTests(PerfTestCase):
+    def setUp(self):
+        super().setUp()
+        domains = self.make_catalog(self.role, 2, 3)
+        for _ in range(2):
+            self.make_reflection(self.teacher, domains, self.year)
+        self.make_reflection(self.hod, domains, self.year, observed=False)
+        artist = self.make_staff("artist@test.com", Department.objects.create(name="Arts"), self.role)
+        self.make_reflection(artist, domains[:1], self.year)
+        # Other years stay out of the figures.
+        self.make_reflection(self.pc, domains, AcademicYear.objects.create(start_year=2023, end_year=2024))
+
+    def figures(self, summary):
+        return {
+            key: summary[key]
+            for key in (
+                "total_teachers",
+                "teachers_with_reflections",
+                "total_reflections",
+                "reflection_completion",
+                "completed_growth_plans",
+                "obs_completed",
+                "obs_pending",
+            )
+        }
+
+    def top(self, rows):
+        return [(row["name"], row["total"]) for row in rows]
+
+    def test_department_summary(self):
+        summary = analytics.department_summary(self.department, self.year)
+
+        self.assertEqual(
+            self.figures(summary),
+            {
+                "total_teachers": 3,
+                "teachers_with_reflections": 2,
+                "total_reflections": 3,
+                "reflection_completion": 66.7,
+                "completed_growth_plans": 3,
+                "obs_completed": 2,
+                "obs_pending": 1,
+            },
+        )
+        self.assertEqual(
+            summary["strength_counts"],
+            [{"domain__name": "Domain 0", "total": 3}, {"domain__name": "Domain 1", "total": 3}],
+        )
+        self.assertEqual(
+            self.top(summary["component_strength_counts"]), [("Component 0.0", 3), ("Component 1.0", 3)]
+        )
+        self.assertEqual(
+            self.top(summary["component_growth_counts"]),
+            [("Component 0.1", 3), ("Component 0.2", 3), ("Component 1.1", 3), ("Component 1.2", 3)],
+        )
+        self.assertEqual(len(summary["reflections"]), 3)
+
+    def test_school_summary(self):
+        summary = analytics.school_summary(self.year)
+
+        self.assertEqual(
+            self.figures(summary),
+            {
+                "total_teachers": 4,
+                "teachers_with_reflections": 3,
+                "total_reflections": 4,
+                "reflection_completion": 75.0,
+                "completed_growth_plans": 4,
+                "obs_completed": 3,
+                "obs_pending": 1,
+            },
+        )
+        self.assertEqual(
+            summary["growth_counts"],
+            [{"domain__name": "Domain 0", "total": 8}, {"domain__name": "Domain 1", "total": 6}],
+        )
+        self.assertEqual(
+            self.top(summary["component_strength_counts"]), [("Component 0.0", 4), ("Component 1.0", 3)]
+        )
+        self.assertEqual(
+            self.top(summary["component_growth_counts"]),
+            [("Component 0.1", 4), ("Component 0.2", 4), ("Component 1.1", 3), ("Component 1.2", 3)],
+        )
+
+
+class RollupTests(PerfTestCase):
+    def setUp(self):
+        super().setUp()
+        self.arts = Department.objects.create(name="Arts")
+        self.domains = self.make_catalog(self.role, 2, 3)
+        self.old_year = AcademicYear.objects.create(start_year=2023, end_year=2024)
+        self.make_reflection(self.teacher, self.domains, self.old_year)
+        self.make_reflection(self.teacher, self.domains, self.year, plans=2)
+        self.make_reflection(self.hod, self.domains[:1], self.year, observed=False)
+        self.make_reflection(self.make_staff("artist@test.com", self.arts, self.role), self.domains, self.year)
+
+    def snapshot(self):
+        return (
+            sorted(
+                DepartmentRollup.objects.exclude(reflection_count=0, growth_plan_count=0).values_list(
+                    "department", "academic_year", "reflection_count", "teachers_with_reflections",
+                    "growth_plan_count", "observed_plan_count",
+                )
+            ),
+            sorted(
+                ComponentRollup.objects.exclude(strength_count=0, growth_count=0).values_list(
+                    "department", "academic_year", "component", "strength_count", "growth_count"
+                )
+            ),
+            sorted(
+                TeacherYearRollup.objects.exclude(reflection_count=0).values_list(
+                    "teacher", "academic_year", "reflection_count"
+                )
+            ),
+        )
+
+    def assertMatchesRebuild(self):
+        maintained = self.snapshot()
+        rollups.rebuild()
+        self.assertEqual(self.snapshot(), maintained)
+
+    def test_department_moves_and_deactivation_keep_rollups_equal_to_a_rebuild(self):
+        self.teacher.department = self.arts
+        self.teacher.save()
+        self.assertMatchesRebuild()
+
+        self.hod.is_active = False
+        self.hod.save(update_fields=["is_active"])
+        self.make_reflection(self.hod, self.domains, self.year)
+        self.assertMatchesRebuild()
+        self.assertFalse(
+            DepartmentRollup.objects.filter(department=self.department, academic_year=self.year)
+            .exclude(reflection_count=0)
+            .exists()
+        )
+
+        self.hod.is_active = True
+        self.hod.department = self.arts
+        self.hod.save()
+        self.assertMatchesRebuild()
+
+    def test_completion_counts_active_teachers_only(self):
+        # One of two active Sciences teachers has reflected; the departed one does not count.
+        self.hod.is_active = False
+        self.hod.save()
+        self.make_reflection(self.pc, self.domains, self.old_year)
+
+        summary = analytics.department_summary(self.department, self.year)
+        self.assertEqual(
+            (summary["total_teachers"], summary["teachers_with_reflections"], summary["total_reflections"]),
+            (2, 1, 1),
+        )
+        self.assertEqual(summary["reflection_completion"], 50.0)
+        self.assertNotIn(self.hod, [reflection.teacher for reflection in summary["reflections"]])
+
+
+class KeysetPaginationTests(PerfTestCase):
+    def setUp(self):
+        super().setUp()
+        domains = self.make_catalog(self.role, 1, 2)
+        for _ in range(5):
+            self.make_reflection(self.teacher, domains, self.year, plans=0)
+        # Same timestamp throughout: only the id can order them.
+        SelfReflection.objects.update(date_created=timezone.now())
+        self.newest_first = list(SelfReflection.objects.order_by("-id").values_list("pk", flat=True))
+
+    def test_pages_split_rows_with_equal_timestamps(self):
+        pages, cursor = [], None
+        while True:
+            page = paginate_newest_first(SelfReflection.objects.all(), after=cursor, page_size=2)
+            pages.append([reflection.pk for reflection in page])
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(pages, [self.newest_first[:2], self.newest_first[2:4], self.newest_first[4:]])
+
+        back = paginate_newest_first(SelfReflection.objects.all(), before=page.prev_cursor, page_size=2)
+        self.assertEqual([reflection.pk for reflection in back], self.newest_first[2:4])
+        self.assertTrue(back.has_previous)
+
+    def test_malformed_cursor_falls_back_to_the_first_page(self):
+        self.client.force_login(self.teacher.user)
+        bad_date = base64.urlsafe_b64encode(b"yesterday|3").decode()
+        for cursor in ("garbage", "!!!", "été", bad_date, base64.urlsafe_b64encode(b"\xff|1").decode()):
+            for direction in ("after", "before"):
+                with self.subTest(cursor=cursor, direction=direction):
+                    response = self.client.get(reverse("reflections_list"), {direction: cursor, "page_size": 2})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(
+                        [reflection.pk for reflection in response.context["reflections"]],
+                        self.newest_first[:2],
+                    )
+
+
+class AcademicYearScopeTests(PerfTestCase):
+    def setUp(self):
+        super().setUp()
+        self.domains = self.make_catalog(self.role, 1, 3)
+        self.old_year = AcademicYear.objects.create(start_year=2023, end_year=2024)
+        self.make_reflection(self.teacher, self.domains, self.old_year)
+        self.make_reflection(self.hod, self.domains, self.old_year)
+        self.current = self.make_reflection(self.teacher, self.domains, self.year)
+
+    def get(self, staff, name, **params):
+        self.client.force_login(staff.user)
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_dashboards_and_lists_default_to_the_active_year(self):
+        context = self.get(self.hod, "dashboard")
+        self.assertEqual(context["year"], self.year)
+        self.assertEqual((context["total_reflections"], context["teachers_with_reflections"]), (1, 1))
+        self.assertEqual(list(self.get(self.pc, "reflections_list")["reflections"]), [self.current])
+
+        context = self.get(self.hod, "dashboard", year=self.old_year.pk)
+        self.assertEqual((context["total_reflections"], context["teachers_with_reflections"]), (2, 2))
+        self.assertEqual(len(self.get(self.pc, "reflections_list", year=self.old_year.pk)["reflections"]), 2)
+
+    def test_rollups_are_kept_per_year(self):
+        def snapshot():
+            return sorted(
+                DepartmentRollup.objects.exclude(reflection_count=0).values_list(
+                    "academic_year", "reflection_count", "teachers_with_reflections", "growth_plan_count"
+                )
+            )
+
+        self.teacher.delete()
+        maintained = snapshot()
+        self.assertEqual(maintained, [(self.old_year.pk, 1, 1, 1)])
+        rollups.rebuild()
+        self.assertEqual(snapshot(), maintained)
+
+    def test_backfill_files_reflections_by_date(self):
+        backfill = importlib.import_module("perf.migrations.0006_reflection_academic_year")
+        SelfReflection.objects.filter(academic_year=self.old_year).update(
+            date_created=timezone.make_aware(timezone.datetime(2024, 1, 15))
+        )
+        SelfReflection.objects.filter(pk=self.current.pk).update(
+            date_created=timezone.make_aware(timezone.datetime(2022, 10, 5))
+        )
+        backfill.backfill_academic_year(django_apps, None)
+
+        self.current.refresh_from_db()
+        self.assertEqual(
+            (self.current.academic_year.start_year, self.current.academic_year.end_year), (2022, 2023)
+        )
+        self.assertEqual(SelfReflection.objects.filter(academic_year=self.old_year).count(), 2)
+
+    def test_migration_refills_the_year_rollups(self):
+        migration = importlib.import_module("perf.migrations.0006_reflection_academic_year")
+
+        def snapshot():
+            return (
+                sorted(DepartmentRollup.objects.values_list("department", "academic_year", "reflection_count")),
+                sorted(ComponentRollup.objects.values_list("academic_year", "component", "strength_count")),
+                sorted(TeacherYearRollup.objects.values_list("teacher", "academic_year", "reflection_count")),
+            )
+
+        rollups.rebuild()
+        expected = snapshot()
+        for model in (DepartmentRollup, ComponentRollup, TeacherYearRollup):
+            model.objects.all().delete()
+        migration.rebuild_rollups(django_apps, None)
+        self.assertEqual(snapshot(), expected)
+
+    def test_migration_refills_the_teacher_summaries(self):
+        migration = importlib.import_module("perf.migrations.0006_reflection_academic_year")
+        fields = [f.name for f in TeacherRollup._meta.concrete_fields if f.name != "id"]
+
+        def snapshot():
+            return sorted(TeacherRollup.objects.values_list(*fields), key=repr)
+
+        rollups.rebuild_teachers()
+        expected = snapshot()
+        TeacherRollup.objects.all().delete()
+        state = MigrationLoader(connection).project_state(("perf", "0006_reflection_academic_year"))
+        migration.rebuild_teacher_rollups(state.apps, None)
+        self.assertEqual(snapshot(), expected)
+        self.assertTrue(expected)
+
+
+class VisibleToTests(PerfTestCase):
+    def setUp(self):
+        super().setUp()
+        domains = self.make_catalog(self.role, 1, 3)
+        self.mine = self.make_reflection(self.teacher, domains, self.year)
+        outsider = self.make_staff("outsider@test.com", Department.objects.create(name="Arts"), self.role)
+        self.theirs = self.make_reflection(outsider, domains, self.year)
+
+    def test_scopes_compile_to_one_filter_without_id_lists(self):
+        expected = {self.teacher: 1, self.hod: 1, self.pc: 2, None: 0}
+        for model in (SelfReflection, ReflectionDomain, GrowthPlan, Observation):
+            for staff, count in expected.items():
+                queryset = model.objects.visible_to(staff)
+                self.assertEqual(queryset.count(), count, (model, staff))
+                if staff is not None:
+                    _, params = queryset.query.sql_with_params()
+                    self.assertLessEqual(len(params), 1, (model, staff))
+
+    def test_views_hide_other_scopes(self):
+        self.client.force_login(self.teacher.user)
+        self.assertEqual(
+            self.client.get(reverse("reflection_detail", args=[self.theirs.pk])).status_code, 404
+        )
+        plan = self.theirs.growth_plans.get()
+        self.assertEqual(
+            self.client.get(reverse("growth_plan_detail", args=[plan.pk])).status_code, 404
+        )
+        self.client.force_login(self.pc.user)
+        self.assertEqual(
+            self.client.get(reverse("reflection_detail", args=[self.theirs.pk])).status_code, 200
+        )
+
+
+class MemberDirectoryTests(PerfTestCase):
+    def directory(self, staff, **params):
+        self.client.force_login(staff.user)
+        response = self.client.get(reverse("department_members"), params)
+        self.assertEqual(response.status_code, 200)
+        return list(response.context["members"])
+
+    def test_rows_are_annotated_with_activity(self):
+        domains = self.make_catalog(self.role, 1, 3)
+        self.make_reflection(self.teacher, domains, self.year, plans=2, observed=False)
+        latest = self.make_reflection(self.teacher, domains, self.year, plans=1)
+
+        row = self.directory(self.pc, sort="-reflections")[0]
+        self.assertEqual(row, self.teacher)
+        self.assertEqual(
+            (row.reflection_count, row.growth_plan_count, row.observed_plan_count),
+            (2, 3, 1),
+        )
+        self.assertEqual(row.latest_reflection, latest.date_created)
+        self.assertEqual(self.directory(self.pc, sort="-pending")[0], self.teacher)
+
+    def test_query_count_does_not_grow_with_staff(self):
+        self.count_queries(self.pc, reverse("department_members"))
+        few = self.count_queries(self.pc, reverse("department_members"))
+        for n in range(30):
+            self.make_staff(f"staff{n}@test.com", self.department, self.role)
+        self.assertEqual(self.count_queries(self.pc, reverse("department_members")), few)
+
+    def test_hod_sees_department_only_and_pages(self):
+        self.make_staff("outsider@test.com", Department.objects.create(name="Arts"), self.role)
+        self.assertEqual(len(self.directory(self.hod)), 3)
+        self.assertEqual(len(self.directory(self.pc)), 4)
+        self.assertEqual(len(self.directory(self.pc, page_size=3, page=2)), 1)
+        self.assertEqual(self.directory(self.pc, q="outsider")[0].staff_id, "outsider@test.com")
+
+
+class TeacherSummaryTests(PerfTestCase):
+    SUMMARY_FIELDS = (
+        "reflection_count",
+        "growth_plan_count",
+        "observed_plan_count",
+        "strength_counts",
+        "growth_counts",
+        "latest_reflection",
+        "latest_plan_id",
+        "latest_plan_observed",
+    )
+
+    def summary(self, teacher):
+        return TeacherRollup.objects.filter(teacher=teacher).values(*self.SUMMARY_FIELDS).get()
+
+    def test_writes_keep_the_summary_equal_to_a_backfill(self):
+        domains = self.make_catalog(self.role, 2, 3)
+        self.make_reflection(self.teacher, domains, self.year, plans=2)
+        doomed = self.make_reflection(self.teacher, domains, self.year)
+        latest = self.make_reflection(self.teacher, domains[:1], self.year, observed=False)
+        doomed.delete()
+        ReflectionDomain.objects.filter(reflection=latest).get().growths.clear()
+        Observation.objects.filter(growth_plan__reflection__teacher=self.teacher).first().delete()
+        save_reflection(
+            self.teacher,
+            {domains[1].pk: {"strengths": [], "growths": list(domains[1].components.all()), "next_steps": ""}},
+            None,
+        )
+
+        maintained = self.summary(self.teacher)
+        self.assertEqual(maintained["reflection_count"], 3)
+        self.assertEqual(maintained["latest_plan_id"], latest.growth_plans.get().pk)
+        self.assertFalse(maintained["latest_plan_observed"])
+        call_command("backfill_teacher_summaries", stdout=io.StringIO())
+        self.assertEqual(self.summary(self.teacher), maintained)
+
+    def test_profile_renders_from_the_summary(self):
+        domains = self.make_catalog(self.role, 1, 3)
+        for _ in range(2):
+            self.make_reflection(self.teacher, domains, self.year)
+        strength = domains[0].components.first()
+
+        self.client.force_login(self.hod.user)
+        response = self.client.get(reverse("teacher_reflections", args=[self.teacher.pk]))
+        self.assertEqual(response.context["total_reflections"], 2)
+        self.assertEqual(
+            [(row["id"], row["total"]) for row in response.context["strength_components"]],
+            [(strength.pk, 2)],
+        )
+        self.assertTrue(response.context["summary"].latest_plan_observed)
+
+        self.client.force_login(self.make_staff("peer@test.com", self.department, self.role).user)
+        response = self.client.get(reverse("teacher_reflections", args=[self.teacher.pk]))
+        self.assertEqual(response.status_code, 403)
+
+
+class GrowthPlanDetailTests(PerfTestCase):
+    def setUp(self):
+        super().setUp()
+        domains = self.make_catalog(self.role, 1, 3)
+        reflection = self.make_reflection(self.teacher, domains, self.year, observed=False)
+        self.plan = reflection.growth_plans.get()
+        self.url = reverse("growth_plan_detail", args=[self.plan.pk])
+
+    def test_viewing_never_writes(self):
+        for staff in (self.teacher, self.hod, self.pc):
+            self.client.force_login(staff.user)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            writes = [
+                q["sql"] for q in ctx.captured_queries
+                if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+                and "django_session" not in q["sql"]
+            ]
+            self.assertEqual(writes, [])
+        self.assertFalse(Observation.objects.exists())
+
+    def test_first_comment_creates_the_observation(self):
+        self.client.force_login(self.hod.user)
+        self.client.post(self.url, {"hod_comment": "Well paced"})
+        self.client.force_login(self.pc.user)
+        self.client.post(self.url, {"coordinator_comment": "Agreed"})
+
+        observation = Observation.objects.get(growth_plan=self.plan)
+        self.assertEqual(observation.hod_comment, "Well paced")
+        self.assertEqual(observation.coordinator_comment, "Agreed")
+
+    def test_blank_comment_does_not_create_the_observation(self):
+        self.client.force_login(self.pc.user)
+        self.client.post(self.url, {"coordinator_comment": ""})
+        self.client.post(
+            reverse("reflection_detail", args=[self.plan.reflection_id]),
+            {"growth_plan_id": self.plan.pk, "coordinator_comment": ""},
+        )
+        self.assertFalse(Observation.objects.exists())
+        self.assertEqual(TeacherRollup.objects.get(teacher=self.teacher).observed_plan_count, 0)
+
+        self.client.post(self.url, {"coordinator_comment": "Agreed"})
+        self.client.post(self.url, {"coordinator_comment": ""})
+        self.assertEqual(Observation.objects.get(growth_plan=self.plan).coordinator_comment, "")
+
+    def test_reflection_detail_saves_only_the_role_comment(self):
+        url = reverse("reflection_detail", args=[self.plan.reflection_id])
+        self.client.force_login(self.hod.user)
+        self.client.post(url, {"growth_plan_id": self.plan.pk, "hod_comment": "Well paced"})
+        self.client.force_login(self.pc.user)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(
+                url,
+                {"growth_plan_id": self.plan.pk, "hod_comment": "Overwritten", "coordinator_comment": "Agreed"},
+            )
+        writes = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith(("INSERT", "UPDATE")) and '"perf_observation"' in q["sql"]
+        ]
+
+        observation = Observation.objects.get(growth_plan=self.plan)
+        self.assertEqual(observation.hod_comment, "Well paced")
+        self.assertEqual(observation.coordinator_comment, "Agreed")
+        self.assertEqual(len(writes), 1)
+
+
+class ReflectionWizardTests(PerfTestCase):
+    def walk(self, domains):
+        """Submit every step of the wizard; return each POST's query count."""
+        role = Role.objects.create(name=f"Role {len(domains)}")
+        Domain.objects.filter(pk__in=[d.pk for d in domains]).update(role=role)
+        teacher = self.make_staff(f"wizard{len(domains)}@test.com", self.department, role)
+        self.client.force_login(teacher.user)
+        url = reverse("add_reflection")
+        self.client.get(url)
+
+        counts = []
+        for post in self.wizard_posts(domains, self.year):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(url, post)
+            self.assertIn(response.status_code, (200, 302))
+            counts.append(len(ctx.captured_queries))
+        self.assertRedirects(response, reverse("reflection_success"), fetch_redirect_response=False)
+        self.assertEqual(
+            SelfReflection.objects.get(teacher=teacher).growth_plans.get().components_addressed.count(),
+            2,
+        )
+        return counts
+
+    def test_step_queries_do_not_grow_with_domains(self):
+        small = self.walk(self.make_catalog(self.role, 1, 3))
+        large = self.walk(self.make_catalog(self.role, 4, 3))
+
+        # Domain steps render from the catalog; the step that renders the
+        # growth plan form costs the same for one domain or four.
+        self.assertEqual(len(set(large[:-2])), 1)
+        self.assertEqual(large[-2], small[0])
+        # The small walk already created the shared rollup rows.
+        self.assertLessEqual(large[-1], small[-1])
+
+    def test_steps_do_not_write_the_session(self):
+        domains = self.make_catalog(self.role, 2, 3)
+        self.client.force_login(self.teacher.user)
+        url = reverse("add_reflection")
+        self.client.get(url)
+
+        posts = self.wizard_posts(domains, self.year)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(url, posts[0])
+        self.assertFalse(
+            [q["sql"] for q in ctx.captured_queries if "django_session" in q["sql"] and "SELECT" not in q["sql"]]
+        )
+
+        # Only the step's own fields are kept: no CSRF token or management form.
+        state = caches[settings.PERF_WIZARD_CACHE].get(
+            f"perf:wizard_reflection_wizard:{self.client.session.session_key}"
+        )
+        step = f"domain_{domains[0].pk}"
+        self.assertEqual(
+            state["step_data"][step],
+            {f"{step}-strengths": [str(pk) for pk in posts[0][f"{step}-strengths"]],
+             f"{step}-growths": [str(pk) for pk in posts[0][f"{step}-growths"]],
+             f"{step}-next_steps": ["Next"]},
+        )
+
+    def test_steps_can_land_on_different_workers(self):
+        domains = self.make_catalog(self.role, 2, 3)
+        self.client.force_login(self.teacher.user)
+        url = reverse("add_reflection")
+        self.client.get(url)
+
+        self.addCleanup(caches.__delitem__, settings.PERF_WIZARD_CACHE)
+        for post in self.wizard_posts(domains, self.year):
+            # Each step is served by a fresh process: a new cache connection
+            # and nothing left in process-local (LocMemCache) memory.
+            with mock.patch.dict(locmem._caches, clear=True), mock.patch.dict(locmem._expire_info, clear=True):
+                caches[settings.PERF_WIZARD_CACHE] = caches.create_connection(settings.PERF_WIZARD_CACHE)
+                response = self.client.post(url, post)
+        self.assertRedirects(response, reverse("reflection_success"), fetch_redirect_response=False)
+        self.assertEqual(SelfReflection.objects.get(teacher=self.teacher).reflection_domains.count(), 2)
+
+
+class ReflectionSinglePostTests(PerfTestCase):
+    def post_data(self, domains):
+        data = {}
+        for post in self.wizard_posts(domains, self.year):
+            post.pop("reflection_wizard-current_step")
+            data.update(post)
+        return data
+
+    def test_saves_whole_reflection_in_one_post(self):
+        domains = self.make_catalog(self.role, 3, 3)
+        self.client.force_login(self.teacher.user)
+        url = reverse("add_reflection_single")
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.post(url, self.post_data(domains))
+        self.assertRedirects(response, reverse("reflection_success"), fetch_redirect_response=False)
+        reflection = SelfReflection.objects.get(teacher=self.teacher)
+        self.assertEqual(reflection.reflection_domains.count(), 3)
+        self.assertEqual(reflection.growth_plans.get().components_addressed.count(), 2)
+
+    def test_plan_must_address_chosen_growths(self):
+        domains = self.make_catalog(self.role, 2, 3)
+        data = self.post_data(domains)
+        data["growth_plan-components_addressed"] = [domains[0].components.first().pk]  # a strength
+        self.client.force_login(self.teacher.user)
+
+        response = self.client.post(reverse("add_reflection_single"), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["plan_form"].has_error("components_addressed"))
+        self.assertFalse(SelfReflection.objects.exists())
+
+
+class SeedingTests(PerfTestCase):
+    PLAN_FIELDS = (
+        "goal_statement", "indicators_of_success", "actions", "timelines", "resources", "evaluator_name", "date",
+    )
+
+    def test_seeded_reflections_pass_form_validation(self):
+        domains = self.make_catalog(self.role, 3, 2) + self.make_catalog(self.role, 1, 5)
+        seeding.seed_reflections(
+            [self.teacher, self.hod],
+            [(domain, list(domain.components.all())) for domain in domains],
+            self.year,
+            3,
+            random.Random(1),
+            seeding.text_pool(Faker(), size=5),
+            domains_per_reflection=4,
+        )
+
+        for rd in ReflectionDomain.objects.prefetch_related("strengths", "growths"):
+            form = ReflectionDomainForm(
+                {
+                    "strengths": [c.pk for c in rd.strengths.all()],
+                    "growths": [c.pk for c in rd.growths.all()],
+                    "next_steps": rd.next_steps,
+                },
+                domain=rd.domain,
+            )
+            self.assertTrue(form.is_valid(), form.errors)
+
+        for plan in GrowthPlan.objects.select_related("reflection"):
+            growths = Component.objects.filter(growth_reflections__reflection=plan.reflection)
+            data = {field: getattr(plan, field) for field in self.PLAN_FIELDS}
+            data["academic_year"] = self.year.pk
+            data["components_addressed"] = [c.pk for c in plan.components_addressed.all()]
+            form = GrowthPlanForm(data, growth_components=list(growths))
+            self.assertTrue(form.is_valid(), form.errors)
+
+
+@isolated_caches
+class BenchCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caching.get_cache().clear()
+        catalog.reset()
+
+    def test_runs_against_a_tiny_school(self):
+        bench = importlib.import_module("perf.management.commands.bench")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        report = Path(tmp.name) / "bench.json"
+        stdout = io.StringIO()
+
+        def run(*args):
+            # The runner already provides the test environment and database;
+            # each run seeds afresh inside a savepoint that is rolled back.
+            with mock.patch.object(bench, "setup_test_environment"), mock.patch.object(
+                bench, "teardown_test_environment"
+            ), mock.patch.object(connection.creation, "create_test_db"), mock.patch.object(
+                connection.creation, "destroy_test_db"
+            ), transaction.atomic():
+                call_command("bench", "--teachers", "2", "--iterations", "1", *args, stdout=stdout)
+                transaction.set_rollback(True)
+
+        tiny = ["--reflections-per-teacher", "1", "--departments", "1", "--domains", "1", "--components", "3"]
+        live = caching.get_cache()
+        live.set("wizard-in-progress", "step 2", timeout=None)
+        run(*tiny, "--output", str(report))
+        run(*tiny, "--compare", str(report), "--threshold", "1000")
+
+        results = json.loads(report.read_text())["results"]
+        self.assertEqual({key.split(":")[0] for key in results}, {"teacher", "hod", "pc"})
+        for role in ("teacher", "hod", "pc"):
+            self.assertEqual(results[f"{role}:dashboard"]["status"], 200)
+            self.assertGreater(results[f"{role}:dashboard"]["queries"], 0)
+        # Session and user alone are two queries; the export's own run as the body is read.
+        self.assertGreater(results["pc:reflections_export"]["queries"], 2)
+        self.assertIn("No regressions", stdout.getvalue())
+        # The throwaway school never touches the live shared cache.
+        self.assertEqual(live.get("wizard-in-progress"), "step 2")
+
+
+class CatalogTests(PerfTestCase):
+    def test_reads_are_served_from_memory(self):
+        domain = self.make_catalog(self.role, 1, 3)[0]
+        catalog.get_catalog()
+
+        with CaptureQueriesContext(connection) as ctx:
+            form = ReflectionDomainForm(domain=domain)
+            form.as_p()
+            self.assertEqual(get_active_year(), self.year)
+
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(len(form.fields["growths"].choices), 3)
+
+    def test_saving_a_component_invalidates_the_snapshot(self):
+        domain = self.make_catalog(self.role, 1, 1)[0]
+        self.assertEqual(len(catalog.get_catalog().components_for(domain.pk)), 1)
+
+        Component.objects.create(domain=domain, name="New")
+
+        self.assertEqual(len(catalog.get_catalog().components_for(domain.pk)), 2)
+
+    def test_invalidation_by_another_worker_is_seen(self):
+        domain = self.make_catalog(self.role, 1, 1)[0]
+        self.assertEqual(len(catalog.get_catalog().components_for(domain.pk)), 1)
+
+        # Written and invalidated by a second process with its own cache connection.
+        Component.objects.bulk_create([Component(domain=domain, name="New")])
+        other = caches.create_connection(settings.PERF_DASHBOARD_CACHE)
+        with mock.patch.object(caching, "get_cache", return_value=other):
+            catalog.invalidate()
+
+        self.assertEqual(len(catalog.get_catalog().components_for(domain.pk)), 2)
+
+
+class StartupTests(PerfTestCase):
+    def test_urlconf_import_does_not_query(self):
+        from . import urls
+
+        with self.assertNumQueries(0):
+            importlib.reload(urls)
+            clear_url_caches()
+            warmup.load_urls()
+
+    def test_warm_up_steps_preload_templates_and_catalog(self):
+        self.make_catalog(self.role, 1, 2)
+        names = {name for _, name in warmup.project_templates()}
+        self.assertIn("reflections/reflection_wizard.html", names)
+
+        warmup.load_templates()
+        warmup.load_catalog()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(catalog.get_catalog().domains), 1)
+
+
+@isolated_caches
+class SQLiteConcurrencyTests(SchoolFixture, TransactionTestCase):
+    """Simultaneous wizard submissions and dashboard reads on the file test DB."""
+
+    WRITERS = 8
+    READERS = 4
+    ROUNDS = 3
+
+    def setUp(self):
+        cache.clear()
+        caching.get_cache().clear()
+        catalog.reset()
+        # Production's SQLite tuning, on fresh connections for this test only.
+        tuning = override_settings(PERF_SQLITE_TUNING=True)
+        tuning.enable()
+        options = mock.patch.dict(connection.settings_dict["OPTIONS"], transaction_mode="IMMEDIATE")
+        options.start()
+        self.addCleanup(connection.close)
+        self.addCleanup(tuning.disable)
+        self.addCleanup(options.stop)
+        connection.close()
+        self.role = Role.objects.create(name="Teacher")
+        self.department = Department.objects.create(name="Sciences")
+        self.year = AcademicYear.objects.create(start_year=2024, end_year=2025, is_active=True)
+        self.domains = self.make_catalog(self.role, 3, 3)
+        self.teachers = [
+            self.make_staff(f"writer{i}@test.com", self.department, self.role)
+            for i in range(self.WRITERS)
+        ]
+        self.readers = [
+            self.make_staff(f"reader{i}@test.com", self.department, self.role, is_hod=i % 2 == 0, is_pc=i % 2 == 1)
+            for i in range(self.READERS)
+        ]
+
+    def test_pragmas_are_applied(self):
+        self.assertEqual(connection.transaction_mode, "IMMEDIATE")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0].lower(), "wal")
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_concurrent_submissions_and_reads(self):
+        posts = self.wizard_posts(self.domains, self.year)
+        url = reverse("add_reflection")
+        start = threading.Barrier(self.WRITERS + self.READERS, timeout=30)
+
+        def submit(teacher):
+            try:
+                client = Client()
+                client.force_login(teacher.user)
+                start.wait()
+                for _ in range(self.ROUNDS):
+                    client.get(url)
+                    for post in posts:
+                        response = client.post(url, post)
+                    assert response.status_code == 302, response.status_code
+            finally:
+                connection.close()
+
+        def read(staff):
+            try:
+                client = Client()
+                client.force_login(staff.user)
+                start.wait()
+                for _ in range(self.ROUNDS * len(posts)):
+                    for name in ("dashboard", "reflections_list"):
+                        response = client.get(reverse(name))
+                        assert response.status_code == 200, response.status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(self.WRITERS + self.READERS) as pool:
+            futures = [pool.submit(submit, teacher) for teacher in self.teachers]
+            futures += [pool.submit(read, staff) for staff in self.readers]
+            for future in futures:
+                future.result()  # re-raises "database is locked" and friends
+
+        expected = self.WRITERS * self.ROUNDS
+        self.assertEqual(SelfReflection.objects.count(), expected)
+        self.assertEqual(GrowthPlan.objects.count(), expected)
+        self.assertEqual(DepartmentRollup.objects.get(department=self.department).reflection_count, expected)
+
+
+class QueryPlanTests(PerfTestCase):
+    def test_newest_first_reflection_lists_use_indexes(self):
+        for queryset in (
+            SelfReflection.objects.for_year(self.year),
+            SelfReflection.objects.for_year(self.year).for_teacher(self.teacher),
+            SelfReflection.objects.for_year(self.year).for_department(self.department),
+            SelfReflection.objects.filter(teacher=self.teacher),
+        ):
+            sql, params = queryset.order_by("-date_created", "-id")[:25].query.sql_with_params()
+            self.assertEqual(problems(explain(sql, params)), [], sql)
+
+
+class ReflectionExportTests(PerfTestCase):
+    def export(self, user, fmt):
+        self.client.force_login(user.user)
+        return self.client.get(reverse("reflections_export"), {"format": fmt})
+
+    def test_streams_csv_and_ndjson(self):
+        domains = self.make_catalog(self.role, 2, 3)
+        self.make_reflection(self.teacher, domains, self.year, plans=2)
+        self.make_reflection(self.teacher, domains, self.year, plans=0)
+
+        response = self.export(self.pc, "csv")
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][0], "reflection_id")
+        self.assertEqual(len(rows), 1 + 2 + 1)  # header, one row per plan, planless reflection
+        self.assertEqual(rows[1][rows[0].index("hod_comment")], "Good")
+
+        response = self.export(self.pc, "ndjson")
+        records = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(len(records[0]["domains"]), 2)
+        self.assertEqual(records[0]["domains"][0]["strengths"], ["Domain 0 - Component 0.0"])
+
+    def test_csv_cells_cannot_start_formulas(self):
+        domains = self.make_catalog(self.role, 1, 2)
+        reflection = self.make_reflection(self.teacher, domains, self.year)
+        plan = reflection.growth_plans.get()
+        GrowthPlan.objects.filter(pk=plan.pk).update(
+            goal_statement='=HYPERLINK("http://evil.example","x")',
+            actions="-1+2",
+            resources="@SUM(A1)",
+            indicators_of_success="\t=1+1",
+            evaluator_name="\r=1+1",
+        )
+        Observation.objects.filter(growth_plan=plan).update(hod_comment="+cmd")
+
+        response = self.export(self.pc, "csv")
+        body = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(body, newline="")))
+        row = dict(zip(rows[0], rows[1]))
+        self.assertEqual(row["goal_statement"], "'=HYPERLINK(\"http://evil.example\",\"x\")")
+        self.assertEqual(row["actions"], "'-1+2")
+        self.assertEqual(row["resources"], "'@SUM(A1)")
+        self.assertEqual(row["indicators_of_success"], "'\t=1+1")
+        self.assertEqual(row["evaluator_name"], "'\r=1+1")
+        self.assertEqual(row["hod_comment"], "'+cmd")
+        self.assertEqual(row["timelines"], "One term")
+
+    def test_query_count_is_per_chunk_not_per_reflection(self):
+        domains = self.make_catalog(self.role, 2, 3)
+        self.make_reflection(self.teacher, domains, self.year)
+        catalog.get_catalog()
+
+        def count():
+            with CaptureQueriesContext(connection) as ctx:
+                list(export.iter_reflections())
+            return len(ctx.captured_queries)
+
+        few = count()
+        for _ in range(5):
+            self.make_reflection(self.teacher, domains, self.year, plans=2)
+        self.assertEqual(count(), few)
+
+    def test_only_pc_and_vp_can_export(self):
+        self.assertEqual(self.export(self.teacher, "csv").status_code, 403)
+        self.assertEqual(self.export(self.hod, "csv").status_code, 403)
+        self.assertEqual(self.export(self.pc, "xml").status_code, 400)
+
+
+class ReflectionSearchTests(PerfTestCase):
+    def setUp(self):
+        super().setUp()
+        self.domains = self.make_catalog(self.role, 1, 3)
+        self.mine = self.make_reflection(self.teacher, self.domains, self.year)
+        other = Department.objects.create(name="Languages")
+        self.outsider = self.make_staff("outsider@test.com", other, self.role)
+        self.theirs = self.make_reflection(self.outsider, self.domains, self.year)
+
+    def hits(self, text, staff):
+        return [hit.reflection for hit in search.search(text, staff)]
+
+    def test_results_are_scoped_by_role(self):
+        self.assertEqual(self.hits("questioning", self.teacher), [self.mine])
+        self.assertEqual(self.hits("questioning", self.hod), [self.mine])
+        self.assertCountEqual(self.hits("questioning", self.pc), [self.mine, self.theirs])
+        self.assertEqual(self.hits("outsider", self.pc), [self.theirs])
+
+    def test_scope_matches_visible_to(self):
+        vp = self.make_staff("vp@test.com", self.department, self.role, is_vp=True)
+        self.make_reflection(self.hod, self.domains, self.year)
+        for staff in (self.teacher, self.hod, self.pc, vp, self.outsider):
+            with self.subTest(staff=staff.staff_id):
+                self.assertCountEqual(
+                    self.hits("questioning", staff), SelfReflection.objects.visible_to(staff)
+                )
+
+    def test_ranked_highlighted_and_paginated(self):
+        plan = self.mine.growth_plans.get()
+        plan.goal_statement = "Questioning, questioning and <b>more</b> questioning"
+        plan.save()
+        page = search.search("question", self.pc, page_size=1)
+        self.assertEqual([hit.reflection for hit in page], [self.mine])
+        self.assertTrue(page.has_next)
+        self.assertEqual(page.hits[0].label, "Growth plan")
+        self.assertIn("<mark>Questioning</mark>", page.hits[0].snippet)
+        self.assertIn("&lt;b&gt;more&lt;/b&gt;", page.hits[0].snippet)
+        self.assertEqual(
+            [hit.reflection for hit in search.search("question", self.pc, page=2, page_size=1)],
+            [self.theirs],
+        )
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self.hits("differentiation", self.teacher), [self.mine])
+        self.mine.reflection_domains.update(next_steps="Station rotation")
+        self.assertEqual(self.hits("differentiation", self.teacher), [])
+        self.assertEqual(self.hits("rotations", self.teacher), [self.mine])  # porter stemming
+
+        Observation.objects.filter(growth_plan__reflection=self.mine).update(prin_comment="Exemplary")
+        self.assertEqual(self.hits("exemplary", self.teacher), [self.mine])
+
+        Staff.objects.filter(pk=self.teacher.pk).update(fname="Abena")
+        self.assertEqual(self.hits("abena", self.teacher), [self.mine])
+
+        self.mine.delete()
+        self.assertEqual(self.hits("rotation", self.teacher), [])
+
+    def test_view_and_admin_search(self):
+        self.client.force_login(self.hod.user)
+        response = self.client.get(reverse("reflection_search"), {"q": "Differentiation"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "<mark>differentiation</mark>")
+        self.assertNotContains(response, "outsider")
+
+        admin = CustomUser.objects.create_superuser(email="admin@test.com", password="x")
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:perf_selfreflection_changelist"), {"q": "outsider"})
+        self.assertEqual(list(response.context["cl"].result_list), [self.theirs])
+        response = self.client.get(reverse("admin:perf_growthplan_changelist"), {"q": "peer"})
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+
+class StaticPipelineTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        source, templates = self.root / "static", self.root / "templates"
+        for name, content in {
+            "plugins/jquery/jquery.min.js": "var jq = 1;\n" * 200,
+            "plugins/chart.js/Chart.min.js": "var chart = 1;\n" * 200,
+            "dist/css/site.css": "body { background: url('../img/bg.png'); }\n" * 50,
+            "dist/img/bg.png": "png",
+        }.items():
+            (source / name).parent.mkdir(parents=True, exist_ok=True)
+            (source / name).write_text(content)
+        templates.mkdir()
+        (templates / "base.html").write_text(
+            '{% load static %}<script src="{% static "plugins/jquery/jquery.min.js" %}"></script>'
+        )
+        self.settings = override_settings(
+            STATICFILES_DIRS=[source],
+            STATIC_ROOT=self.root / "collected",
+            STATICFILES_FINDERS=["perf.staticfiles.PrunedPluginsFinder"],
+            PERF_STATIC_TEMPLATE_DIRS=[templates],
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "perf.staticfiles.CompressedManifestStaticFilesStorage"},
+            },
+        )
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def test_collectstatic_prunes_hashes_and_precompresses(self):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        collected = self.root / "collected"
+        manifest = json.loads((collected / "staticfiles.json").read_text())["paths"]
+
+        self.assertNotIn("plugins/chart.js/Chart.min.js", manifest)
+        jquery = manifest["plugins/jquery/jquery.min.js"]
+        self.assertRegex(jquery, staticfiles.HASHED_NAME)
+        self.assertEqual(
+            gzip.decompress((collected / f"{jquery}.gz").read_bytes()),
+            (collected / jquery).read_bytes(),
+        )
+        css = (collected / manifest["dist/css/site.css"]).read_text()
+        self.assertIn(Path(manifest["dist/img/bg.png"]).name, css)
+        self.assertFalse((collected / f"{manifest['dist/img/bg.png']}.gz").exists())
+
+    def test_serves_precompressed_variant_with_immutable_caching(self):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        manifest = json.loads((self.root / "collected" / "staticfiles.json").read_text())["paths"]
+        jquery = manifest["plugins/jquery/jquery.min.js"]
+        factory = RequestFactory()
+
+        response = staticfiles.serve(factory.get("/", HTTP_ACCEPT_ENCODING="gzip, br;q=0"), jquery)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("javascript", response["Content-Type"])
+        self.assertEqual(response["Cache-Control"], staticfiles.IMMUTABLE)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        response = staticfiles.serve(factory.get("/"), "plugins/jquery/jquery.min.js")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Cache-Control"))
+
+
+class ProductionStaticTests(PerfTestCase):
+    """Pages must render against the real tree once collectstatic has run."""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        production = override_settings(
+            STATIC_ROOT=Path(tmp.name),
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "perf.staticfiles.CompressedManifestStaticFilesStorage"},
+            },
+        )
+        production.enable()
+        self.addCleanup(production.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    def test_every_referenced_asset_is_in_the_manifest(self):
+        for directory in settings.PERF_STATIC_TEMPLATE_DIRS:
+            for template in Path(directory).rglob("*.html"):
+                for path in staticfiles.STATIC_TAG.findall(template.read_text(encoding="utf-8")):
+                    with self.subTest(template=template.name, path=path):
+                        self.assertRegex(staticfiles_storage.url(path), staticfiles.HASHED_NAME)
+
+    def test_pages_render_with_hashed_assets(self):
+        self.make_reflection(self.teacher, self.make_catalog(self.role, 1, 2), self.year)
+        response = self.client.get(reverse("login"))
+        self.assertEqual(response.status_code, 200)
+
+        self.client.force_login(self.pc.user)
+        for name in ("dashboard", "department_members", "reflections_list"):
+            with self.subTest(page=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertRegex(response.content.decode(), r"/static/plugins/jquery/[^\"]+\.[0-9a-f]{12}\.js")
@@ -1,10 +1,13 @@
 from django.urls import path, include
 from .views import (
     ReflectionWizard,
+    reflection_single,
     dashboard,
     reflection_detail,
     department_members,
     reflections_list,
+    reflections_export,
+    reflection_search,
     growthplan_create,
     growthplan_edit,
     reflection_edit,
@@ -13,15 +16,15 @@ from .views import (
 )
 from django.shortcuts import render
 from django.contrib.auth import views as auth_views
-from .utils import get_reflection_forms
 
 urlpatterns = [
     path("", dashboard, name="dashboard"),
     path(
         "reflection/add/",
-        ReflectionWizard.as_view(get_reflection_forms()),
+        ReflectionWizard.as_view(),
         name="add_reflection",
     ),
+    path("reflection/add/single/", reflection_single, name="add_reflection_single"),
     path(
         "reflection/success/",
         lambda request: render(request, "reflections/success.html"),
@@ -30,6 +33,8 @@ urlpatterns = [
     path("reflections/<int:pk>/", reflection_detail, name="reflection_detail"),
     path("teachers/", department_members, name="department_members"),
     path("reflections/", reflections_list, name="reflections_list"),
+    path("reflections/export/", reflections_export, name="reflections_export"),
+    path("search/", reflection_search, name="reflection_search"),
     path("reflections/<int:pk>/edit/", reflection_edit, name="reflection_edit"),
     
     
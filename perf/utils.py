@@ -1,28 +1,138 @@
-from .models import AcademicYear, Domain
+from collections import Counter
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AcademicYear, SelfReflection, ReflectionDomain
 from .forms import ReflectionDomainForm, GrowthPlanForm
+from .catalog import get_catalog
+from . import caching, rollups
 
 def get_active_year():
-    return AcademicYear.objects.get(is_active=True)
+    year = get_catalog().active_year
+    if year is None:
+        raise AcademicYear.DoesNotExist("No active academic year.")
+    return year
 
 
+def reflection_year():
+    """Year a new reflection is filed under: the active one, else the year today falls in."""
+    year = get_catalog().active_year
+    if year is not None:
+        return year
+    start_year = AcademicYear.start_year_for(timezone.localdate())
+    return (
+        AcademicYear.objects.filter(start_year=start_year).order_by("end_year").first()
+        or AcademicYear.objects.create(start_year=start_year, end_year=start_year + 1)
+    )
 
-def get_reflection_forms(user=None):
-    forms = []
+
+def selected_year(value):
+    """The academic year a ``?year=`` value picks: the active (else latest) year by default."""
+    catalog = get_catalog()
+    try:
+        pk = int(value)
+    except (TypeError, ValueError):
+        pk = None
+    for year in catalog.years:
+        if year.pk == pk:
+            return year
+    return catalog.active_year or next(iter(catalog.years), None)
+
+
+
+def get_reflection_domains(user):
+    """``(id, name)`` pairs of the domains a user reflects on, in step order."""
     if user and hasattr(user, "staff"):
-        role = user.staff.role  
-        domains = Domain.objects.filter(role=role)
-    else:
-        domains = Domain.objects.none()
+        return [
+            (domain.pk, domain.name)
+            for domain in get_catalog().domains_for_role(user.staff.role_id)
+        ]
+    return []
+
 
-    for domain in domains:
+def get_reflection_forms(user=None, domains=None):
+    if domains is None:
+        domains = get_reflection_domains(user)
+
+    forms = []
+    for domain_id, _ in domains:
         forms.append((
-            f"domain_{domain.id}",
+            f"domain_{domain_id}",
             ReflectionDomainForm,
         ))
     forms.append(("growth_plan", GrowthPlanForm))  # keep your growth plan step
     return forms
 
 
+def insert_links(link_model, owner_field, rows):
+    """Insert ``(owner_id, component_id)`` pairs straight into an m2m through table.
+
+    Skips model instantiation and the per-relation ``.set()`` round trips.
+    No ``m2m_changed`` signal is sent, so callers update rollups themselves.
+    """
+    if not rows:
+        return
+    opts = link_model._meta
+    quote = connection.ops.quote_name
+    columns = ", ".join(
+        quote(opts.get_field(name).column) for name in (owner_field, "component")
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {quote(opts.db_table)} ({columns}) VALUES (%s, %s)", rows
+        )
+
+
+@transaction.atomic
+def save_reflection(teacher, domain_data, growth_plan_form):
+    """Write a submitted reflection as one short transaction.
+
+    ``domain_data`` maps domain ids to a ``ReflectionDomainForm``'s cleaned
+    data. Domains are resolved from the catalog, reflection domains and their
+    strength/growth links are bulk-inserted, and the growth plan is saved
+    alongside them, so a failure leaves no partial reflection behind.
+    """
+    reflection = SelfReflection.objects.create(teacher=teacher, academic_year=reflection_year())
+
+    domains = get_catalog().domains
+    reflection_domains = ReflectionDomain.objects.bulk_create(
+        [
+            ReflectionDomain(
+                reflection=reflection,
+                domain=domains[domain_id],
+                next_steps=data["next_steps"],
+            )
+            for domain_id, data in domain_data.items()
+            if domain_id in domains
+        ]
+    )
+
+    links = {"strengths": [], "growths": []}
+    for rd in reflection_domains:
+        for name, rows in links.items():
+            rows.extend((rd.pk, component.pk) for component in domain_data[rd.domain_id][name])
+    insert_links(ReflectionDomain.strengths.through, "reflectiondomain", links["strengths"])
+    insert_links(ReflectionDomain.growths.through, "reflectiondomain", links["growths"])
+
+    if growth_plan_form is not None:
+        growth_plan = growth_plan_form.save(commit=False)
+        growth_plan.reflection = reflection
+        growth_plan.save()
+        growth_plan_form.save_m2m()
+
+    # Bulk inserts bypass the signal handlers in perf.signals.
+    department_id, year_id = teacher.department_id, reflection.academic_year_id
+    for name, field in (("strengths", "strength_count"), ("growths", "growth_count")):
+        rollups.bump_components(
+            [(department_id, year_id, component_id) for _, component_id in links[name]], field, 1
+        )
+        rollups.bump_teacher_components(
+            teacher.pk, field, Counter(component_id for _, component_id in links[name])
+        )
+    caching.bump_owner(teacher.pk, department_id)
+    return reflection
+
 
 # def get_reflection_forms(): 
 #     forms = [] 
@@ -1,4 +1,4 @@
-from formtools.wizard.views import SessionWizardView
+from formtools.wizard.views import WizardView
 from django.shortcuts import redirect, render, get_object_or_404
 from .models import (
     SelfReflection,
@@ -10,240 +10,60 @@ from .models import (
 )
 from .forms import ReflectionDomainForm, GrowthPlanForm, ObservationForm
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q
-from django.http import HttpResponseForbidden
+from django.db.models import Prefetch, Q
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.utils import timezone
 from accounts.models import Staff as Teacher
 from django.contrib import messages
-from .utils import get_reflection_forms
+from django.core.paginator import Paginator
+from .utils import get_reflection_domains, get_reflection_forms, save_reflection, selected_year
+from .catalog import get_catalog
+from . import analytics, caching, export, search
+from .wizard import compact_step_data
+from .pagination import paginate_newest_first, get_page_size
 
 @login_required
 def dashboard(request):
-    user = request.user
+    access = request.access
+    # Figures cover one academic year: ?year=<id>, else the active year.
+    year = selected_year(request.GET.get("year"))
+    year_context = {"year": year, "years": get_catalog().years}
 
     # HOD dashboard
-    if hasattr(user, "staff") and user.staff.is_hod:
-        hod = user.staff
-        department = hod.department
-
-        # All staff in HOD’s department
-        dept_members = department.staff_members.filter(is_active=True)
-
-        # Reflections from department members
-        reflections = SelfReflection.objects.filter(teacher__in=dept_members)
-
-        # Count total reflections
-
-        total_teachers = dept_members.count()
-        teachers_with_reflections = reflections.values("teacher").distinct().count()
-
-        reflections = list(reflections[:5])
-        total_reflections = len(reflections)
-
-        # Completion percentage
-        reflection_completion = (
-            (teachers_with_reflections / total_teachers) * 100
-            if total_teachers > 0
-            else 0
-        )
-
-        # Growth plan stats
-        growth_plans = GrowthPlan.objects.filter(reflection__in=reflections)
-        completed_growth_plans = growth_plans.count()
-
-        # Observation status
-        obs_pending = growth_plans.filter(observation__isnull=True).count()
-        obs_completed = growth_plans.filter(observation__isnull=False).count()
-
-        # Aggregate strengths & growths across department
-        strength_counts = (
-            ReflectionDomain.objects.filter(reflection__in=reflections)
-            .values("domain__name")
-            .annotate(total=Count("strengths"))
-            .order_by("-total")
-        )
-
-        growth_counts = (
-            ReflectionDomain.objects.filter(reflection__in=reflections)
-            .values("domain__name")
-            .annotate(total=Count("growths"))
-            .order_by("-total")
+    if access.is_hod:
+        hod = access.staff
+        department = access.department
+
+        context = caching.get_or_build(
+            f"dashboard:hod:{getattr(year, 'pk', None)}",
+            caching.department_scope(hod.department_id),
+            lambda: analytics.department_summary(department, year),
         )
-
-        # Strength counts by component
-        component_strength_counts = (
-            Component.objects.filter(strength_reflections__reflection__in=reflections)
-            .values("id", "name", "domain__name")   # include domain for grouping
-            .annotate(total=Count("strength_reflections"))
-            .order_by("-total")
-        )[:5]
-
-        # Growth counts by component
-        component_growth_counts = (
-            Component.objects.filter(growth_reflections__reflection__in=reflections)
-            .values("id", "name", "domain__name")
-            .annotate(total=Count("growth_reflections"))
-            .order_by("-total")
-        )[:5]
-
-        context = {
-            "hod": hod,
-            "department": department,
-            "dept_members": dept_members,
-            "reflections": reflections,
-            "total_reflections": total_reflections,
-            "total_teachers": total_teachers,
-            "teachers_with_reflections": teachers_with_reflections,
-            "reflection_completion": round(reflection_completion, 1),
-            "growth_plans": growth_plans,
-            "completed_growth_plans": completed_growth_plans,
-            "obs_pending": obs_pending,
-            "obs_completed": obs_completed,
-            "strength_counts": strength_counts,
-            "growth_counts": growth_counts,
-
-            "component_strength_counts": component_strength_counts,
-            "component_growth_counts": component_growth_counts,
-        }
+        context = dict(context, hod=hod, department=department, **year_context)
 
         return render(request, "reflections/hod_dashboard.html", context)
 
-    # PC/vp dashboard → only reflections with HOD observations
-    elif hasattr(user, "staff") and (user.staff.is_pc or user.staff.is_vp):
-        vp = request.user.staff
-
-        # All staff across school
-        all_staff = Teacher.objects.filter(is_active=True)
-
-        # Reflections from all staff
-        reflections = SelfReflection.objects.all()
-
-        # Count totals
-        total_teachers = all_staff.count()
-        teachers_with_reflections = reflections.values("teacher").distinct().count()
-
-        reflections = list(reflections[:5])  # latest 5 reflections
-        total_reflections = len(reflections)
-
-        # Completion percentage
-        reflection_completion = (
-            (teachers_with_reflections / total_teachers) * 100
-            if total_teachers > 0
-            else 0
-        )
-
-        # Growth plan stats (all)
-        growth_plans = GrowthPlan.objects.filter(reflection__in=reflections)
-        completed_growth_plans = growth_plans.count()
-
-        # Observation status
-        obs_pending = growth_plans.filter(observation__isnull=True).count()
-        obs_completed = growth_plans.filter(observation__isnull=False).count()
-
-        # Aggregate strengths & growths across all reflections
-        strength_counts = (
-            ReflectionDomain.objects.filter(reflection__in=reflections)
-            .values("domain__name")
-            .annotate(total=Count("strengths"))
-            .order_by("-total")
-        )
-
-        growth_counts = (
-            ReflectionDomain.objects.filter(reflection__in=reflections)
-            .values("domain__name")
-            .annotate(total=Count("growths"))
-            .order_by("-total")
+    # PC/vp dashboard → school-wide figures
+    elif access.is_school_wide:
+        context = caching.get_or_build(
+            f"dashboard:pc:{getattr(year, 'pk', None)}",
+            caching.SCHOOL,
+            lambda: analytics.school_summary(year),
         )
-
-         # Strength counts by component
-        component_strength_counts = (
-            Component.objects.filter(strength_reflections__reflection__in=reflections)
-            .values("id", "name", "domain__name")   # include domain for grouping
-            .annotate(total=Count("strength_reflections"))
-            .order_by("-total")
-        )[:5]
-
-        # Growth counts by component
-        component_growth_counts = (
-            Component.objects.filter(growth_reflections__reflection__in=reflections)
-            .values("id", "name", "domain__name")
-            .annotate(total=Count("growth_reflections"))
-            .order_by("-total")
-        )[:5]
-
-        context = {
-            "total_teachers": total_teachers,
-            "teachers_with_reflections": teachers_with_reflections,
-            "total_reflections": total_reflections,
-            "reflection_completion": reflection_completion,
-            "completed_growth_plans": completed_growth_plans,
-            "obs_pending": obs_pending,
-            "obs_completed": obs_completed,
-            "strength_counts": strength_counts,
-            "growth_counts": growth_counts,
-            "reflections":reflections,
-
-            "component_strength_counts": component_strength_counts,
-            "component_growth_counts": component_growth_counts,
-        }
+        context = dict(context, **year_context)
 
         return render(request, "reflections/pc_dashboard.html", context)
 
     # Default → Teacher dashboard
     else:
-        teacher = request.user.staff  # Assuming logged-in teacher
-
-        # Reflections
-        reflections = SelfReflection.objects.filter(teacher=teacher)
-        total_reflections = reflections.count()
-
-        # Domains covered
-        domains_covered = (
-            ReflectionDomain.objects.filter(reflection__in=reflections)
-            .values("domain__name")
-            .distinct()
-            .count()
-        )
-
-        # Strengths and Growths
-        strengths_count = (
-            ReflectionDomain.objects.filter(reflection__in=reflections)
-            .annotate(strengths_num=Count("strengths"))
-            .aggregate(total=Count("strengths_num"))["total"]
-        )
-        growths_count = (
-            ReflectionDomain.objects.filter(reflection__in=reflections)
-            .annotate(growths_num=Count("growths"))
-            .aggregate(total=Count("growths_num"))["total"]
-        )
-
-        # Growth Plans
-        growth_plans = GrowthPlan.objects.filter(reflection__in=reflections)
-        total_growth_plans = growth_plans.count()
-        observed_plans = growth_plans.filter(observation__isnull=False).count()
+        teacher = access.staff  # Assuming logged-in teacher
 
-        # Most common strengths and growths components
-        top_strengths = (
-            Component.objects.filter(strength_reflections__reflection__in=reflections)
-            .annotate(count=Count("strength_reflections"))
-            .order_by("-count")[:5]
-        )
-        top_growths = (
-            Component.objects.filter(growth_reflections__reflection__in=reflections)
-            .annotate(count=Count("growth_reflections"))
-            .order_by("-count")[:5]
+        context = caching.get_or_build(
+            f"dashboard:teacher:{getattr(year, 'pk', None)}",
+            caching.teacher_scope(teacher.id),
+            lambda: analytics.teacher_summary(teacher, year),
         )
-
-        context = {
-            "total_reflections": total_reflections,
-            "domains_covered": domains_covered,
-            "strengths_count": strengths_count,
-            "growths_count": growths_count,
-            "total_growth_plans": total_growth_plans,
-            "observed_plans": observed_plans,
-            "top_strengths": top_strengths,
-            "top_growths": top_growths,
-            "reflections": reflections,
-        }
+        context = dict(context, **year_context)
 
         return render(
             request,
@@ -253,107 +73,177 @@ def dashboard(request):
 
 
 # views.py
-class ReflectionWizard(SessionWizardView):
+class ReflectionWizard(WizardView):
     template_name = "reflections/reflection_wizard.html"
+    # Wizard state lives in the cache, compacted to each step's own fields
+    # (perf/wizard.py), so stepping through does not rewrite the session row.
+    storage_name = "perf.wizard.CacheStorage"
+    # Static placeholder for as_view(); the real steps are per user and are
+    # resolved lazily in load_steps(), so importing the URLconf needs no DB.
+    form_list = get_reflection_forms(domains=[])
+
+    # formtools asks for the form list, and rebuilds earlier steps' forms,
+    # many times per request. The user's domains are looked up once per wizard
+    # session and kept in extra_data, along with each domain step's chosen
+    # growths, so a step POST costs the same whatever the number of domains.
+
+    def load_steps(self):
+        if not hasattr(self, "domains"):
+            extra = self.storage.extra_data
+            if "domains" not in extra:
+                # ✅ Dynamically load based on logged-in user
+                extra["domains"] = get_reflection_domains(self.request.user)
+            catalog = get_catalog()
+            self.domains = {
+                f"domain_{domain_id}": catalog.domains.get(domain_id) or Domain(id=domain_id, name=name)
+                for domain_id, name in extra["domains"]
+            }
+            # Instance-level form_list: get_cleaned_data_for_step() and
+            # get_form() look steps up here, not via get_form_list().
+            self.form_list = dict(get_reflection_forms(domains=extra["domains"]))
+        return self.form_list
 
     def get_form_list(self):
-        # ✅ Dynamically load based on logged-in user
-        return dict(get_reflection_forms(self.request.user))
+        self.load_steps()
+        return super().get_form_list()
+
+    def get_cleaned_data_for_step(self, step):
+        self.load_steps()
+        return super().get_cleaned_data_for_step(step)
+
+    def get_form_step_data(self, form):
+        return compact_step_data(form)
+
+    def process_step(self, form):
+        step = self.steps.current
+        if step in self.domains:
+            growths = self.storage.extra_data.setdefault("growths", {})
+            growths[step] = [c.pk for c in form.cleaned_data.get("growths", [])]
+        return super().process_step(form)
 
     def get_form_kwargs(self, step=None):
         kwargs = super().get_form_kwargs(step)
+        self.load_steps()
 
         # For domain steps → pass the domain instance
-        if step and step.startswith("domain_"):
-            domain_id = int(step.split("_")[1])
-            kwargs["domain"] = Domain.objects.get(id=domain_id)
+        if step in self.domains:
+            kwargs["domain"] = self.domains[step]
 
         # For the growth_plan step → restrict to chosen growths
         if step == "growth_plan":
-            all_growths = []
-            for step_key in self.get_form_list().keys():
-                if step_key.startswith("domain_"):
-                    data = self.get_cleaned_data_for_step(step_key)
-                    if data and "growths" in data:
-                        all_growths.extend(data["growths"])
-            kwargs["growth_components"] = Component.objects.filter(
-                id__in=[g.id for g in all_growths]
+            growths = self.storage.extra_data.get("growths", {})
+            kwargs["growth_components"] = get_catalog().components_in(
+                pk for key in self.domains for pk in growths.get(key, [])
             )
 
         return kwargs
 
-    def done(self, form_list, **kwargs):
-        teacher = self.request.user.staff  # accounts.Staff
-        reflection = SelfReflection.objects.create(teacher=teacher)
-
-        # Save ReflectionDomain entries
-        for step, form in zip(self.get_form_list().keys(), form_list):
-            if step.startswith("domain_"):
-                domain_id = int(step.split("_")[1])
-                domain = Domain.objects.get(id=domain_id)
-                rd = ReflectionDomain.objects.create(
-                    reflection=reflection,
-                    domain=domain,
-                    next_steps=form.cleaned_data["next_steps"],
-                )
-                rd.strengths.set(form.cleaned_data["strengths"])
-                rd.growths.set(form.cleaned_data["growths"])
-
-        # Save Growth Plan
-        growth_plan_form = form_list[-1]
-        gp = growth_plan_form.save(commit=False)
-        gp.reflection = reflection
-        gp.save()
-        growth_plan_form.save_m2m()
+    def done(self, form_list, form_dict=None, **kwargs):
+        domain_data = {
+            int(step.split("_")[1]): form.cleaned_data
+            for step, form in form_dict.items()
+            if step.startswith("domain_")
+        }
+        save_reflection(self.request.access.staff, domain_data, form_dict["growth_plan"])
 
         return redirect("reflection_success")
 
 
+@login_required
+def reflection_single(request):
+    """The whole reflection on one page: every domain and the growth plan in one POST."""
+    staff = request.access.staff
+    if staff is None:
+        return HttpResponseForbidden("Only staff can add reflections.")
+
+    catalog = get_catalog()
+    domains = [catalog.domains[domain_id] for domain_id, _ in get_reflection_domains(request.user)]
+    data = request.POST if request.method == "POST" else None
+
+    domain_forms = {
+        domain.pk: ReflectionDomainForm(data, domain=domain, prefix=f"domain_{domain.pk}")
+        for domain in domains
+    }
+    plan_form = GrowthPlanForm(
+        data,
+        prefix="growth_plan",
+        growth_components=[c for domain in domains for c in catalog.components_for(domain.pk)],
+    )
+
+    if data is not None and all([form.is_valid() for form in domain_forms.values()]) and plan_form.is_valid():
+        # Same rule as the wizard: a plan addresses components marked as growths.
+        growths = {c.pk for form in domain_forms.values() for c in form.cleaned_data["growths"]}
+        if any(c.pk not in growths for c in plan_form.cleaned_data["components_addressed"]):
+            plan_form.add_error(
+                "components_addressed", "Choose only components you marked as growth areas."
+            )
+        else:
+            save_reflection(
+                staff,
+                {domain_id: form.cleaned_data for domain_id, form in domain_forms.items()},
+                plan_form,
+            )
+            return redirect("reflection_success")
+
+    return render(
+        request,
+        "reflections/reflection_single.html",
+        {
+            "domain_forms": [(domain, domain_forms[domain.pk]) for domain in domains],
+            "plan_form": plan_form,
+        },
+    )
+
+
+def with_reflection_graph(queryset):
+    """Fetch a reflection's domains, components and growth plans up front.
+
+    Covers everything reflection_detail.html and teacher_reflections.html
+    render (including ``Component.__str__``'s domain), so the number of
+    queries does not depend on how many domains or plans a reflection has.
+    """
+    components = Component.objects.select_related("domain")
+    return queryset.select_related("teacher", "teacher__department").prefetch_related(
+        Prefetch(
+            "reflection_domains",
+            queryset=ReflectionDomain.objects.select_related("domain").order_by("id"),
+        ),
+        Prefetch("reflection_domains__strengths", queryset=components),
+        Prefetch("reflection_domains__growths", queryset=components),
+        Prefetch(
+            "growth_plans",
+            queryset=GrowthPlan.objects.select_related(
+                "academic_year", "observation"
+            ).order_by("id"),
+        ),
+        Prefetch("growth_plans__components_addressed", queryset=components),
+    )
+
+
 @login_required
 def reflection_detail(request, pk):
-    reflection = get_object_or_404(SelfReflection, pk=pk)
+    access = request.access
+    reflection = get_object_or_404(
+        with_reflection_graph(SelfReflection.objects.visible_to(access.staff)), pk=pk
+    )
 
     # Role checks
-    staff = getattr(request.user, "staff", None)
-    is_hod = staff and staff.is_hod
-    is_pc = staff and staff.is_pc
-    is_prin = staff and staff.is_vp  # your field is is_vp, but saving to prin_comment
+    is_hod = access.is_hod
+    is_pc = access.is_pc
+    is_prin = access.is_vp  # your field is is_vp, but saving to prin_comment
 
     if request.method == "POST" and (is_hod or is_pc or is_prin):
         growth_plan_id = request.POST.get("growth_plan_id")
-        growth_plan = get_object_or_404(GrowthPlan, pk=growth_plan_id)
+        growth_plan = get_object_or_404(reflection.growth_plans.all(), pk=growth_plan_id)
 
-        observation, created = Observation.objects.get_or_create(
-            growth_plan=growth_plan
-        )
-        form = ObservationForm(request.POST, instance=observation)
+        form = ObservationForm(request.POST)
 
         if form.is_valid():
-            obs = form.save(commit=False)  # get instance but don't overwrite yet
-            existing_obs = Observation.objects.get(pk=obs.pk)  # get current DB version
-
-            if is_hod:
-                obs.hod_comment = form.cleaned_data.get(
-                    "hod_comment", existing_obs.hod_comment
-                )
-                obs.coordinator_comment = existing_obs.coordinator_comment
-                obs.prin_comment = existing_obs.prin_comment
-
-            elif is_pc:
-                obs.coordinator_comment = form.cleaned_data.get(
-                    "coordinator_comment", existing_obs.coordinator_comment
-                )
-                obs.hod_comment = existing_obs.hod_comment
-                obs.prin_comment = existing_obs.prin_comment
-
-            elif is_prin:  # principal / vice principal
-                obs.prin_comment = form.cleaned_data.get(
-                    "prin_comment", existing_obs.prin_comment
-                )
-                obs.hod_comment = existing_obs.hod_comment
-                obs.coordinator_comment = existing_obs.coordinator_comment
-
-            obs.save()
+            # Same upsert as growth_plan_detail: only this role's comment is
+            # written, and the row is created on the first non-blank comment.
+            role = "hod" if is_hod else "coordinator" if is_pc else "principal"
+            field = OBSERVATION_FIELDS[role]
+            save_comment(growth_plan, field, form.cleaned_data[field])
 
             return redirect("reflection_detail", pk=reflection.pk)
     else:
@@ -374,63 +264,126 @@ def reflection_detail(request, pk):
 
 @login_required
 def department_members(request):
-    teacher = get_object_or_404(Teacher, user=request.user)
+    access = request.access
 
     # If VP or Principal → see all staff
-    if teacher.is_vp or teacher.is_pc:
+    if access.is_school_wide:
         members = Teacher.objects.all()
         department = None  # optional, since it's all departments
 
     # If HOD → see only their department staff
-    elif teacher.is_hod:
-        department = teacher.department
-        members = Teacher.objects.filter(department=department)
+    elif access.is_hod:
+        department = access.department
+        members = Teacher.objects.filter(department_id=access.department_id)
 
     # Otherwise → forbid access
     else:
         return HttpResponseForbidden("You do not have permission to view this page.")
 
+    query = request.GET.get("q", "").strip()
+    if query:
+        members = members.filter(
+            Q(fname__icontains=query) | Q(lname__icontains=query) | Q(staff_id__icontains=query)
+        )
+
+    sort = request.GET.get("sort", "name")
+    if sort.lstrip("-") not in analytics.DIRECTORY_SORTS:
+        sort = "name"
+    paginator = Paginator(
+        analytics.member_directory(members, sort), get_page_size(request.GET.get("page_size"))
+    )
+    page = paginator.get_page(request.GET.get("page"))
+
     context = {
         "department": department,
-        "members": members,
+        "members": page,
+        "page": page,
+        "sort": sort,
+        "query": query,
     }
     return render(request, "reflections/members.html", context)
 
 
+# Everything reflections_list.html touches per row.
+REFLECTION_LIST_RELATED = ("teacher", "teacher__department")
+
+
 @login_required
 def reflections_list(request):
-    user = request.user
-
-    # HOD → see reflections only for teachers in their department
-    if hasattr(user, "staff") and user.staff.is_hod:
-        dept = user.staff.department
-        reflections = SelfReflection.objects.filter(
-            teacher__department=dept
-        ).select_related("teacher", "teacher__department")
-
-    # VP or PC → see all reflections across departments
-    elif hasattr(user, "staff") and (user.staff.is_pc or user.staff.is_vp):
-        reflections = SelfReflection.objects.select_related(
-            "teacher", "teacher__department"
-        )
+    # HOD → their department, VP or PC → every department, teachers → their own,
+    # within one academic year (?year=<id>, else the active year)
+    year = selected_year(request.GET.get("year"))
+    reflections = SelfReflection.objects.visible_to(request.access.staff).for_year(year)
+
+    page = paginate_newest_first(
+        reflections.select_related(*REFLECTION_LIST_RELATED),
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+        page_size=get_page_size(request.GET.get("page_size")),
+    )
+
+    return render(
+        request,
+        "reflections/reflections_list.html",
+        {"reflections": page, "page": page, "year": year, "years": get_catalog().years},
+    )
 
-    # Teachers → see only their own reflections
-    else:
-        reflections = SelfReflection.objects.filter(teacher__user=user)
+
+@login_required
+def reflection_search(request):
+    """Full-text search over reflections the user may read (see perf/search.py)."""
+    staff = request.access.staff
+    if staff is None:
+        return HttpResponseForbidden("Only staff can search reflections.")
+
+    query = request.GET.get("q", "").strip()
+    try:
+        number = int(request.GET.get("page", 1))
+    except ValueError:
+        number = 1
+    page = search.search(
+        query, staff, page=number, page_size=get_page_size(request.GET.get("page_size"))
+    )
 
     return render(
-        request, "reflections/reflections_list.html", {"reflections": reflections}
+        request,
+        "reflections/search.html",
+        {"query": query, "hits": page, "page": page},
+    )
+
+
+@login_required
+def reflections_export(request):
+    """Stream every reflection school-wide as CSV or NDJSON (PC/VP only)."""
+    if not request.access.is_school_wide:
+        return HttpResponseForbidden("You do not have permission to export reflections.")
+
+    fmt = request.GET.get("format", "csv")
+    if fmt not in export.FORMATS:
+        return HttpResponseBadRequest(f"Unknown export format: {fmt}")
+    content_type, render_lines = export.FORMATS[fmt]
+
+    response = StreamingHttpResponse(
+        render_lines(export.iter_reflections(export.export_queryset().visible_to(request.access.staff))),
+        content_type=content_type,
     )
+    stamp = timezone.now().strftime("%Y%m%d")
+    response["Content-Disposition"] = f'attachment; filename="reflections-{stamp}.{fmt}"'
+    return response
 
 
 @login_required
 def growthplan_create(request, reflection_id):
-    reflection = get_object_or_404(SelfReflection, id=reflection_id)
+    reflection = get_object_or_404(
+        SelfReflection.objects.visible_to(request.access.staff), id=reflection_id
+    )
 
     # Collect all growth components chosen in this reflection
-    selected_components = Component.objects.filter(
-        growth_reflections__reflection=reflection
-    ).distinct()
+    selected_components = get_catalog().components_in(
+        Component.objects.filter(growth_reflections__reflection=reflection).values_list(
+            "id", flat=True
+        )
+    )
 
     if request.method == "POST":
         form = GrowthPlanForm(request.POST, growth_components=selected_components)
@@ -454,7 +407,7 @@ def growthplan_create(request, reflection_id):
 @login_required
 def growthplan_edit(request, pk):
     """Edit growth plan only if there’s no observation"""
-    plan = get_object_or_404(GrowthPlan, pk=pk)
+    plan = get_object_or_404(GrowthPlan.objects.visible_to(request.access.staff), pk=pk)
 
     if hasattr(plan, "observation"):
         messages.error(
@@ -479,10 +432,11 @@ from django.forms import modelformset_factory
 
 @login_required
 def reflection_edit(request, pk):
-    reflection = get_object_or_404(SelfReflection, pk=pk, teacher=request.user.staff)
+    reflection = get_object_or_404(SelfReflection, pk=pk, teacher=request.access.staff)
 
     # Collect all domain instances for this reflection
-    domains = Domain.objects.all()
+    catalog = get_catalog()
+    domains = catalog.domains.values()
     reflection_domains = {
         rd.domain_id: rd for rd in reflection.reflection_domains.all()
     }
@@ -491,6 +445,10 @@ def reflection_edit(request, pk):
     editable_growthplans = reflection.growth_plans.filter(observation__isnull=True)
     locked_growthplans = reflection.growth_plans.filter(observation__isnull=False)
 
+    growth_components = catalog.components_in(
+        reflection.reflection_domains.values_list("growths", flat=True)
+    )
+
     # Formset only for editable ones
     GrowthPlanFormSet = modelformset_factory(
         GrowthPlan, form=GrowthPlanForm, extra=0, can_delete=True
@@ -516,11 +474,7 @@ def reflection_edit(request, pk):
             request.POST,
             queryset=editable_growthplans,
             form_kwargs={
-                "growth_components": Component.objects.filter(
-                    id__in=reflection.reflection_domains.values_list(
-                        "growths", flat=True
-                    )
-                )
+                "growth_components": growth_components
             },
         )
 
@@ -560,11 +514,7 @@ def reflection_edit(request, pk):
         formset = GrowthPlanFormSet(
             queryset=editable_growthplans,
             form_kwargs={
-                "growth_components": Component.objects.filter(
-                    id__in=reflection.reflection_domains.values_list(
-                        "growths", flat=True
-                    )
-                )
+                "growth_components": growth_components
             },
         )
 
@@ -585,79 +535,85 @@ def reflection_edit(request, pk):
 
 # teacher detail page
 
+@login_required
 def teacher_reflections(request, teacher_id):
-    teacher = get_object_or_404(Teacher, id=teacher_id)
-
-    # Get all reflections for this teacher
-    reflections = (
-        SelfReflection.objects.filter(teacher=teacher)
-        .select_related("teacher")
-        .prefetch_related("reflection_domains__strengths", "reflection_domains__growths", "growth_plans")
-        .order_by("-date_created")
-    )
+    teacher = get_object_or_404(Teacher.objects.select_related("department"), id=teacher_id)
+    if not request.access.can_view(teacher):
+        return HttpResponseForbidden("You do not have permission to view this page.")
 
-    # === Simple Analysis for HOD ===
-    total_reflections = reflections.count()
-    growth_components = (
-        Component.objects.filter(growth_reflections__reflection__teacher=teacher)
-        .values("name")
-        .annotate(total=Count("id"))
-        .order_by("-total")
-    )
-    strength_components = (
-        Component.objects.filter(strength_reflections__reflection__teacher=teacher)
-        .values("name")
-        .annotate(total=Count("id"))
-        .order_by("-total")
+    reflections = list(
+        with_reflection_graph(SelfReflection.objects.for_teacher(teacher)).order_by("-date_created")
     )
 
+    # === Simple Analysis for HOD ===
+    # Counts and top components come from the teacher's maintained summary row.
     context = {
         "teacher": teacher,
         "reflections": reflections,
-        "total_reflections": total_reflections,
-        "growth_components": growth_components[:5],  # top 5 growth areas
-        "strength_components": strength_components[:5],  # top 5 strengths
+        **analytics.teacher_profile(teacher),
     }
     return render(request, "reflections/teacher_reflections.html", context)
 
 
+# Which Observation field each commenting role writes.
+OBSERVATION_FIELDS = {
+    "hod": "hod_comment",
+    "coordinator": "coordinator_comment",
+    "principal": "prin_comment",
+}
+
+
+def save_comment(growth_plan, field, comment):
+    """Write one role's comment, creating the observation on the first real one.
+
+    A blank comment never creates the row: an observation marks the plan as
+    observed on every dashboard.
+    """
+    if not comment and not Observation.objects.filter(growth_plan=growth_plan).exists():
+        return
+    Observation.objects.update_or_create(growth_plan=growth_plan, defaults={field: comment})
 
 
 @login_required
 def growth_plan_detail(request, pk):
-    growth_plan = get_object_or_404(GrowthPlan, id=pk)
+    # One query for the plan and everything the page shows about it; the
+    # observation comes along through a LEFT JOIN and may not exist yet.
+    growth_plan = get_object_or_404(
+        GrowthPlan.objects.visible_to(request.access.staff).select_related(
+            "reflection__teacher__department", "academic_year", "observation"
+        ).prefetch_related(
+            Prefetch("components_addressed", queryset=Component.objects.select_related("domain"))
+        ),
+        id=pk,
+    )
     teacher = growth_plan.reflection.teacher
-    user_staff = getattr(request.user, "staff", None)
+    access = request.access
 
-    # Get or create observation record
-    observation, _ = Observation.objects.get_or_create(growth_plan=growth_plan)
+    # Viewing never writes: an unsaved placeholder stands in until the first comment.
+    observation = getattr(growth_plan, "observation", None) or Observation(growth_plan=growth_plan)
 
     # Determine if user can edit comments
     can_edit = False
     role = None
-    if user_staff:
-        if user_staff.is_hod and user_staff.department == teacher.department:
+    if access.is_staff:
+        if access.is_hod and access.department_id == teacher.department_id:
             can_edit = True
             role = "hod"
-        elif user_staff.is_pc:  # Program coordinator
+        elif access.is_pc:  # Program coordinator
             can_edit = True
             role = "coordinator"
-        elif user_staff.is_vp:  # Principal
+        elif access.is_vp:  # Principal
             can_edit = True
             role = "principal"
 
     if request.method == "POST" and can_edit:
         form = ObservationForm(request.POST, instance=observation)
         if form.is_valid():
-            # Save only the relevant field for this role
-            obs = form.save(commit=False)
-            if role == "hod":
-                obs.hod_comment = form.cleaned_data["hod_comment"]
-            elif role == "coordinator":
-                obs.coordinator_comment = form.cleaned_data["coordinator_comment"]
-            elif role == "principal":
-                obs.prin_comment = form.cleaned_data["prin_comment"]
-            obs.save()
+            # Save only the relevant field for this role. The row is created
+            # on the first non-blank comment; other roles' comments are left
+            # untouched.
+            field = OBSERVATION_FIELDS[role]
+            save_comment(growth_plan, field, form.cleaned_data[field])
             messages.success(request, "✅ Your comment has been saved.")
             return redirect("growth_plan_detail", pk=growth_plan.id)
     else:
@@ -0,0 +1,82 @@
+"""Process warm-up, called from ``config/wsgi.py`` and ``config/asgi.py``.
+
+Django builds the URL resolver, compiles templates and (here) loads the
+reflection catalog on first use, so the first request a fresh worker serves
+pays for all of it. ``warm_up`` does that work while the worker boots instead.
+
+The WSGI/ASGI module is imported in each worker after fork by default. With
+``gunicorn --preload`` it is imported once in the master; database
+connections are closed at the end either way so forked workers never share
+one. A database that is not reachable yet only skips the catalog step.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver
+
+logger = logging.getLogger("perf.warmup")
+
+
+def project_templates():
+    """(engine, name) for every template that lives inside the project."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for loader in engine.engine.template_loaders:
+            for directory in loader.get_dirs():
+                directory = Path(directory).resolve()
+                if not directory.is_relative_to(base_dir) or not directory.is_dir():
+                    continue
+                for path in directory.rglob("*.html"):
+                    yield engine, path.relative_to(directory).as_posix()
+
+
+def load_urls():
+    # reverse_dict populates the resolver, importing every view module.
+    get_resolver().reverse_dict
+
+
+def load_templates():
+    for engine, name in project_templates():
+        try:
+            engine.get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+            logger.warning("Template %s not preloaded: %s", name, exc)
+
+
+def load_catalog():
+    from .catalog import get_catalog
+
+    try:
+        get_catalog()
+    except DatabaseError as exc:
+        logger.warning("Catalog not preloaded, database unavailable: %s", exc)
+
+
+STEPS = (
+    ("urls", load_urls),
+    ("templates", load_templates),
+    ("catalog", load_catalog),
+)
+
+
+def warm_up(force=False):
+    """Run the warm-up steps; returns their timings in ms, or None if disabled."""
+    if not (force or getattr(settings, "PERF_WARMUP", False)):
+        return None
+    timings = {}
+    try:
+        for name, step in STEPS:
+            start = time.perf_counter()
+            step()
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    finally:
+        connections.close_all()
+    logger.info("Warm-up done: %s", timings)
+    return timings
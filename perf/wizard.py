@@ -0,0 +1,49 @@
+"""Cache-backed storage for ReflectionWizard.
+
+formtools' SessionStorage keeps each step's whole POST (CSRF token and
+management form included) inside the session, so every step rewrites the
+session row. ``CacheStorage`` keeps the wizard state in the
+``PERF_WIZARD_CACHE`` alias instead, under the session key, and only writes
+when a step actually changed it. Together with ``compact_step_data`` a step
+stores only its own fields: component primary keys and text.
+"""
+import copy
+
+from django.conf import settings
+from django.core.cache import caches
+from formtools.wizard.storage.base import BaseStorage
+
+
+def compact_step_data(form):
+    """The form's own submitted values, keyed by prefixed field name."""
+    data = {}
+    for name in form.fields:
+        key = form.add_prefix(name)
+        values = [value for value in form.data.getlist(key) if value != ""]
+        if values:
+            data[key] = values
+    return data
+
+
+class CacheStorage(BaseStorage):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = caches[settings.PERF_WIZARD_CACHE]
+        session = self.request.session
+        if session.session_key is None:
+            session.save()
+        self.key = f"perf:{self.prefix}:{session.session_key}"
+        self.data = self.cache.get(self.key)
+        if self.data is None:
+            self.init_data()
+        self.loaded = copy.deepcopy(self.data)
+
+    def update_response(self, response):
+        super().update_response(response)
+        if self.data == self.loaded:
+            return
+        if not any(self.data.values()):  # reset after done()
+            self.cache.delete(self.key)
+        else:
+            self.cache.set(self.key, self.data, settings.PERF_WIZARD_TIMEOUT)
+        self.loaded = copy.deepcopy(self.data)